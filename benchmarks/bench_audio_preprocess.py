@@ -0,0 +1,118 @@
+"""
+Benchmark: upload bytes and end-to-end STT latency with and without audio preprocessing.
+
+Builds a corpus of synthetic browser-style recordings (44.1 kHz stereo WAV with
+silence before and after the "speech") and transcribes each one through the
+GROQ client against a local stub server whose uplink is throttled, first as
+the raw file and then after trimming, downmixing, resampling and re-encoding.
+
+    python benchmarks/bench_audio_preprocess.py --bandwidth 500000
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_servers import start_groq_stub
+
+# (lead-in silence, speech, trailing silence) in seconds
+CORPUS_SHAPES = [
+    (1.0, 4.0, 1.5),
+    (2.0, 10.0, 2.0),
+    (1.5, 25.0, 3.0),
+    (3.0, 55.0, 2.0),
+]
+SOURCE_RATE = 44100
+
+
+def synthetic_recording(path, lead, speech, tail, seed):
+    """Stereo WAV: room-noise silence around syllable-like bursts of a voiced tone"""
+    rng = random.Random(seed)
+    frames = bytearray()
+    total = int((lead + speech + tail) * SOURCE_RATE)
+    speech_start, speech_end = int(lead * SOURCE_RATE), int((lead + speech) * SOURCE_RATE)
+    pitch = 120 + seed * 15
+    for i in range(total):
+        noise = rng.randint(-40, 40)
+        if speech_start <= i < speech_end:
+            t = i / SOURCE_RATE
+            # ~4 syllables per second
+            envelope = max(0.0, math.sin(math.pi * 4 * t)) ** 0.5
+            voice = math.sin(2 * math.pi * pitch * t) + 0.4 * math.sin(2 * math.pi * pitch * 2.1 * t)
+            sample = int(9000 * envelope * voice) + noise
+        else:
+            sample = noise
+        frames += struct.pack("<hh", sample, sample)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(SOURCE_RATE)
+        f.writeframes(bytes(frames))
+
+
+def build_corpus(directory):
+    corpus = []
+    for seed, (lead, speech, tail) in enumerate(CORPUS_SHAPES):
+        path = os.path.join(directory, f"recording_{int(lead + speech + tail)}s.wav")
+        synthetic_recording(path, lead, speech, tail, seed)
+        corpus.append(path)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bandwidth", type=float, default=500000, help="simulated uplink in bytes/s")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub transcription latency in seconds")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per clip")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="medical_bot_audio_")
+    corpus = build_corpus(workdir)
+
+    with start_groq_stub(latency=args.latency, upload_bandwidth=args.bandwidth) as server:
+        os.environ.update({"GROQ_API_KEY": "stub-key", "GROQ_BASE_URL": server.base_url, "STT_BACKEND": "groq"})
+        # Imported after the environment points the clients at the stub
+        from medical_bot.audio_preprocessing import preprocess_audio
+        from medical_bot.stt_backends import GroqTranscriber
+
+        transcriber = GroqTranscriber()
+        transcriber.transcribe(corpus[0])  # warm the pooled connection
+
+        print(f"uplink={args.bandwidth / 1000:.0f} kB/s  stub latency={args.latency * 1000:.0f} ms  runs={args.runs}")
+        print(f"{'clip':<20} {'raw bytes':>10} {'prep bytes':>10} {'saved':>6} "
+              f"{'prep ms':>8} {'raw e2e ms':>11} {'prep e2e ms':>12}")
+        raw_totals, prep_totals = [], []
+        for path in corpus:
+            raw_times, prep_times, prep_cost = [], [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                transcriber.transcribe(path)
+                raw_times.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                prepared = preprocess_audio(path)
+                prep_cost.append((time.perf_counter() - start) * 1000)
+                transcriber.transcribe(prepared.as_upload())
+                prep_times.append((time.perf_counter() - start) * 1000)
+
+            raw_bytes = os.path.getsize(path)
+            raw_ms, prep_ms = statistics.median(raw_times), statistics.median(prep_times)
+            raw_totals.append(raw_ms)
+            prep_totals.append(prep_ms)
+            print(f"{os.path.basename(path):<20} {raw_bytes:>10} {len(prepared.data):>10} "
+                  f"{1 - len(prepared.data) / raw_bytes:>6.0%} {statistics.median(prep_cost):>8.1f} "
+                  f"{raw_ms:>11.1f} {prep_ms:>12.1f}   ({prepared.filename})")
+        print(f"mean end-to-end: raw={statistics.mean(raw_totals):.1f} ms  "
+              f"preprocessed={statistics.mean(prep_totals):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
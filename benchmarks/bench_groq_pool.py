@@ -0,0 +1,70 @@
+"""
+Benchmark: per-request latency of the GROQ chat API with and without the pooled client.
+
+Runs against a local stub server, so the numbers isolate client-side overhead
+(client construction plus connection setup) from model latency.
+
+    python benchmarks/bench_groq_pool.py --requests 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from groq import Groq
+
+from benchmarks.stub_servers import start_groq_stub
+from medical_bot.groq_pool import close_groq_clients, get_groq_client
+
+MESSAGES = [{"role": "user", "content": "Is there something wrong with this skin condition?"}]
+MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+
+def run(make_client, base_url, requests):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = make_client(base_url)
+        client.chat.completions.create(messages=MESSAGES, model=MODEL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def unpooled(base_url):
+    # What the app did before: a brand new client (and connection) per call
+    return Groq(api_key="stub-key", base_url=base_url)
+
+
+def pooled(base_url):
+    return get_groq_client(api_key="stub-key", base_url=base_url)
+
+
+def report(name, timings, connections):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<10} mean={statistics.mean(timings):7.2f} ms  "
+          f"p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms  "
+          f"connections={connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub server latency in seconds")
+    args = parser.parse_args()
+
+    for name, factory in (("unpooled", unpooled), ("pooled", pooled)):
+        with start_groq_stub(latency=args.latency) as server:
+            # One warm-up call so both variants start from the same state
+            run(factory, server.base_url, 1)
+            server.connections = 0
+            timings = run(factory, server.base_url, args.requests)
+            report(name, timings, server.connections)
+        close_groq_clients()
+
+
+if __name__ == "__main__":
+    main()
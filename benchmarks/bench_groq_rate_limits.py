@@ -0,0 +1,105 @@
+"""
+Benchmark: GROQ calls under a rate limit, with and without the client-side scheduler.
+
+A stub GROQ server enforces a requests-per-minute quota the way GROQ does (429 with
+retry-after once the minute's budget is spent). A burst of diagnoses larger than
+the quota is sent through chat_completion_async twice, each in a fresh process:
+once with GROQ_RATE_LIMIT=false (the SDK's two quick retries, then an error) and
+once with the scheduler on (requests wait for the budget and are retried with
+backoff). It reports completed and failed calls, how many 429s the server sent, and
+the throughput against the quota ceiling.
+
+    python benchmarks/bench_groq_rate_limits.py --quota-rpm 300 --requests 400
+    python benchmarks/bench_groq_rate_limits.py --quota-rpm 120 --requests 160 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import percentile
+from benchmarks.stub_servers import start_groq_stub
+
+MODEL = "llama3-8b-8192"
+
+
+async def burst(requests, concurrency):
+    from medical_bot.brain_of_the_doctor import chat_completion_async
+
+    limit = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(index):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await chat_completion_async(f"I have had an itchy rash for {index} days.", MODEL)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(type(e).__name__)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def child(args):
+    """One configuration, in its own process so GROQ_RATE_LIMIT is read at import"""
+    with start_groq_stub(latency=args.latency, quota_rpm=args.quota_rpm) as groq:
+        os.environ.update({
+            "GROQ_API_KEY": "stub-key",
+            "GROQ_BASE_URL": groq.base_url,
+            "RESPONSE_CACHE_BACKEND": "none",
+            "TRACE_LOG": "false",
+            "GROQ_RATE_LIMITS": f"{MODEL}={args.quota_rpm}/0",
+            "GROQ_MAX_QUEUE_SECONDS": str(args.max_wait),
+        })
+        latencies, errors, elapsed = asyncio.run(burst(args.requests, args.concurrency))
+        print(json.dumps({"latencies": sorted(latencies), "errors": errors, "elapsed": elapsed,
+                          "server_calls": groq.requests + groq.rate_limited, "rate_limited": groq.rate_limited}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="diagnoses sent in the burst")
+    parser.add_argument("--concurrency", type=int, default=64, help="calls in flight at once")
+    parser.add_argument("--quota-rpm", type=int, default=300, help="stub GROQ requests per minute")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub GROQ response time")
+    parser.add_argument("--max-wait", type=float, default=120, help="GROQ_MAX_QUEUE_SECONDS for the scheduler run")
+    parser.add_argument("--child", choices=("off", "on"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    # Whatever goes over the burst is limited to quota_rpm / 60 per second
+    ceiling = max(0, args.requests - args.quota_rpm) / (args.quota_rpm / 60.0)
+    print(f"requests={args.requests} concurrency={args.concurrency} quota={args.quota_rpm} rpm "
+          f"(the last {max(0, args.requests - args.quota_rpm)} can finish {ceiling:.0f} s in at the earliest)")
+    print(f"{'scheduler':>9} {'ok':>5} {'failed':>6} {'429s':>5} {'calls':>6} {'elapsed s':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    for mode in ("off", "on"):
+        env = dict(os.environ, GROQ_RATE_LIMIT="false" if mode == "off" else "true")
+        with tempfile.TemporaryDirectory() as workdir:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode,
+                                     *sys.argv[1:]], env=dict(env, SCRATCH_DIR=workdir),
+                                    capture_output=True, text=True)
+        if output.returncode:
+            print(f"{mode:>9} failed:\n{output.stderr[-2000:]}")
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        latencies = result["latencies"]
+        print(f"{mode:>9} {len(latencies):>5} {len(result['errors']):>6} {result['rate_limited']:>5} "
+              f"{result['server_calls']:>6} {result['elapsed']:>9.1f} "
+              f"{percentile(latencies, 0.5) * 1000 if latencies else 0:>8.0f} "
+              f"{percentile(latencies, 0.99) * 1000 if latencies else 0:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
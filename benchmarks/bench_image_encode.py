@@ -0,0 +1,103 @@
+"""
+Benchmark: bytes-on-the-wire and encode time for uploaded images.
+
+Compares the old encoder (full resolution, JPEG quality 85) with the adaptive
+preprocessing stage over a corpus of synthetic phone-sized photos.
+
+    python benchmarks/bench_image_encode.py
+"""
+import argparse
+import base64
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from medical_bot.image_preprocessing import PreprocessConfig, preprocess_image_bytes
+
+# (width, height, source format) - typical phone camera and screenshot sizes
+CORPUS_SHAPES = [
+    (4032, 3024, "JPEG"),
+    (3264, 2448, "JPEG"),
+    (4000, 3000, "PNG"),
+    (2048, 1536, "PNG"),
+    (1080, 2400, "JPEG"),
+]
+
+
+def synthetic_photo(width, height, seed):
+    """Skin-toned gradient with blotches and sensor noise, so JPEG has real detail to encode"""
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    tint = Image.new("RGB", (width, height), (210, 150 + seed * 5, 120))
+    img = Image.blend(img, tint, 0.7)
+    draw = ImageDraw.Draw(img)
+    step = max(width, height) // 12
+    for i in range(20):
+        x = (i * 7919 * (seed + 1)) % width
+        y = (i * 104729 * (seed + 1)) % height
+        draw.ellipse((x, y, x + step, y + step), fill=(170, 60 + i * 3, 60))
+    img = img.filter(ImageFilter.GaussianBlur(2))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    return Image.blend(img, noise, 0.12)
+
+
+def build_corpus():
+    corpus = []
+    for seed, (width, height, fmt) in enumerate(CORPUS_SHAPES):
+        buffer = io.BytesIO()
+        synthetic_photo(width, height, seed).save(buffer, format=fmt, quality=95)
+        corpus.append((f"{width}x{height}.{fmt.lower()}", buffer.getvalue()))
+    return corpus
+
+
+def legacy_encode(image_bytes):
+    # The encoder used before preprocessing was added
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=85)
+        return buffer.getvalue()
+
+
+def measure(encoder, image_bytes, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        data = encoder(image_bytes)
+        timings.append((time.perf_counter() - start) * 1000)
+    wire_bytes = len(base64.b64encode(data))
+    return wire_bytes, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-edge", type=int, default=None)
+    parser.add_argument("--target-bytes", type=int, default=None)
+    args = parser.parse_args()
+
+    config = PreprocessConfig(max_edge=args.max_edge, target_bytes=args.target_bytes)
+    print(f"preprocess: max_edge={config.max_edge} target_bytes={config.target_bytes} "
+          f"quality={config.min_quality}-{config.max_quality}")
+    print(f"{'image':<18}{'source':>10}{'legacy wire':>14}{'legacy ms':>11}{'new wire':>12}{'new ms':>9}{'saved':>8}")
+
+    totals = [0, 0]
+    for name, image_bytes in build_corpus():
+        legacy_bytes, legacy_ms = measure(legacy_encode, image_bytes, args.repeats)
+        new_bytes, new_ms = measure(lambda data: preprocess_image_bytes(data, config), image_bytes, args.repeats)
+        totals[0] += legacy_bytes
+        totals[1] += new_bytes
+        print(f"{name:<18}{len(image_bytes):>10}{legacy_bytes:>14}{legacy_ms:>11.1f}{new_bytes:>12}{new_ms:>9.1f}"
+              f"{1 - new_bytes / legacy_bytes:>8.0%}")
+
+    print(f"total wire bytes: legacy={totals[0]} new={totals[1]} ({1 - totals[1] / totals[0]:.0%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: cold-start import cost of the app and its helper modules.
+
+Each target is imported in a fresh interpreter with `python -X importtime`; the
+report shows the total import time, the wall-clock time of the process, and the
+heaviest direct dependencies of the target (cumulative microseconds as printed
+by -X importtime). Importing an app module builds its Gradio UI, so its number
+is close to the time before `demo.launch()` can start serving.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --target voice_of_the_doctor --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPACES = os.path.join(ROOT, "hf_spaces_deployment")
+
+# (label, module, working directory)
+TARGETS = [
+    ("local app", "Medical_Bot_Enhanced", ROOT),
+    ("spaces app", "app", SPACES),
+    ("voice_of_the_doctor", "medical_bot.voice_of_the_doctor", ROOT),
+    ("voice_of_the_patient", "medical_bot.voice_of_the_patient", ROOT),
+    ("brain_of_the_doctor", "medical_bot.brain_of_the_doctor", ROOT),
+]
+
+
+def parse_importtime(stderr):
+    """[(self_us, cumulative_us, depth, module)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def target_imports(rows, module):
+    """
+    (cumulative us, [(cumulative us, name)] of direct dependencies) for module.
+    Importing a.b also imports the package a, so both top-level entries count. Rows
+    come in completion order: a module's dependencies are listed right before it.
+    """
+    total, children, pending = 0, [], []
+    for _, cumulative, depth, name in rows:
+        if depth > 0:
+            if depth == 1:
+                pending.append((cumulative, name))
+            continue
+        if name == module or module.startswith(name + "."):
+            total += cumulative
+            children += pending
+        pending = []
+    return total, children
+
+
+def profile(module, cwd, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return wall, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", help="only profile this module name")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=8, help="heaviest dependencies to list")
+    args = parser.parse_args()
+
+    # Keys are only read when a client is first used; placeholders keep the import path realistic
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "unused"),
+               ELEVENLABS_API_KEY=os.environ.get("ELEVENLABS_API_KEY", "unused"))
+
+    for label, module, cwd in TARGETS:
+        if args.target and args.target not in (label, module):
+            continue
+        walls, totals, children = [], [], []
+        for _ in range(args.runs):
+            wall, rows = profile(module, cwd, env)
+            walls.append(wall)
+            total, children = target_imports(rows, module)
+            totals.append(total)
+        print(f"{label:<22} import={statistics.median(totals) / 1000:8.1f} ms  "
+              f"process wall={statistics.median(walls) * 1000:8.1f} ms")
+
+        # Direct dependencies imported for the first time by the target itself
+        for cum, name in sorted(children, reverse=True)[:args.top]:
+            print(f"    {cum / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: bytes a browser downloads to load the interface, with the stylesheet
+inline in the page config (as before) versus the built, cached static asset.
+
+The app is launched twice on a local port. "inline" puts the unminified source
+CSS back into Blocks(css=...); "asset" is the current setup. A repeat visit
+reuses the cached stylesheet (immutable, content-hashed URL), so only the page
+(which embeds the app config) is downloaded again.
+
+    python benchmarks/bench_page_payload.py
+    python benchmarks/bench_page_payload.py --app spaces
+"""
+import argparse
+import os
+import sys
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.load_test import import_app
+
+
+def fetch(url):
+    """(bytes on the wire, Cache-Control) for url; bodies are gzipped only when the server chooses to"""
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+    with urllib.request.urlopen(request) as response:
+        body = response.read()
+        return len(body), response.headers.get("Cache-Control", "")
+
+
+def measure(demo, app_kwargs, stylesheet_url=None):
+    _, url, _ = demo.launch(prevent_thread_lock=True, quiet=True, app_kwargs=app_kwargs)
+    try:
+        # The page embeds the app config (and with it any inline CSS)
+        page, _ = fetch(url)
+        css, cache_control = fetch(url.rstrip("/") + "/" + stylesheet_url) if stylesheet_url else (0, "")
+    finally:
+        demo.close()
+    return page, css, cache_control
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=["local", "spaces"], default="local")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GROQ_API_KEY", "unused")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "unused")
+    os.environ["TTS_CACHE_PREWARM"] = "false"
+    module = import_app(args.app)
+    from medical_bot.css_assets import build_stylesheet
+
+    demo, asset = module.demo, module.stylesheet
+    source = os.path.join(os.path.dirname(module.__file__), "static", "medical_bot.css")
+    lite = build_stylesheet(source, "lightweight")
+
+    results = {"asset": measure(demo, dict(module.APP_KWARGS), asset.url)}
+
+    # Before: the whole source stylesheet inline in the config, no separate asset
+    with open(source, encoding="utf-8") as f:
+        demo.css = f.read()
+    demo.stylesheets = [s for s in demo.stylesheets if s != asset.url]
+    results["inline"] = measure(demo, {"title": module.APP_KWARGS["title"]})
+
+    print(f"app={args.app}  source css={os.path.getsize(source)} bytes  "
+          f"built={len(asset.content)} ({len(asset.gzipped)} gzipped)  "
+          f"lightweight={len(lite.content)} ({len(lite.gzipped)} gzipped)")
+    print(f"{'mode':<8} {'page':>8} {'css':>8} {'first visit':>12} {'repeat visit':>13}")
+    for mode in ("inline", "asset"):
+        page, css, _ = results[mode]
+        print(f"{mode:<8} {page:>8} {css:>8} {page + css:>12} {page:>13}")
+    print(f"stylesheet Cache-Control: {results['asset'][2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: the diagnosis pipeline driven in-process at increasing concurrency.
+
+Calls the app's event handlers from medical_bot.app_pipeline - process_inputs
+(transcription, image encoding, streamed diagnosis) and then generate_voice_response
+(speech synthesis) - directly, without the Gradio server or its queue, against
+local stub GROQ and ElevenLabs servers with configurable latency and jitter. For
+each concurrency level it reports throughput, latency percentiles of both stages
+and process memory, so pipeline regressions show up offline and without API keys.
+
+    python benchmarks/bench_pipeline.py --concurrency 1,4,16 --requests 32
+    python benchmarks/bench_pipeline.py --app spaces --llm-latency 0.8 --jitter 0.3
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import import_app, percentile, write_test_image, write_test_wav
+from benchmarks.stub_servers import start_elevenlabs_stub, start_groq_stub, stub_environment
+
+
+def rss_mb():
+    """Current resident set size in MB (Linux), else the peak"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+
+
+async def one_request(pipeline, audio_path, image_path):
+    """(analysis seconds, time to first response text, voice seconds) for one submission"""
+    start = time.perf_counter()
+    first_text = None
+    doctor_response = ""
+    async for _, doctor_response, _ in pipeline.process_inputs(audio_path, image_path):
+        if first_text is None and doctor_response:
+            first_text = time.perf_counter() - start
+    analysis = time.perf_counter() - start
+
+    # The voice event is a blocking function; Gradio runs it on a worker thread too
+    start = time.perf_counter()
+    audio = await asyncio.to_thread(pipeline.generate_voice_response, doctor_response)
+    voice = time.perf_counter() - start
+    if not audio:
+        raise RuntimeError(f"no audio for response {doctor_response[:60]!r}")
+    return analysis, first_text or analysis, voice
+
+
+async def run_level(pipeline, concurrency, requests, audio_path, image_path):
+    limit = asyncio.Semaphore(concurrency)
+    results, errors = [], []
+
+    async def worker():
+        async with limit:
+            try:
+                results.append(await one_request(pipeline, audio_path, image_path))
+            except Exception as e:
+                errors.append(repr(e))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(requests)))
+    return results, errors, time.perf_counter() - start
+
+
+def summarize(values):
+    values = sorted(values)
+    return (f"p50={percentile(values, 0.50) * 1000:7.0f}  p95={percentile(values, 0.95) * 1000:7.0f}  "
+            f"p99={percentile(values, 0.99) * 1000:7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=("local", "spaces"), default="local")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=32, help="submissions per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub GROQ time to first byte in seconds")
+    parser.add_argument("--token-interval", type=float, default=0.005, help="delay between streamed tokens")
+    parser.add_argument("--tts-latency", type=float, default=0.2, help="stub ElevenLabs time to first byte")
+    parser.add_argument("--jitter", type=float, default=0.1, help="+/- random seconds added to stub latencies")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    workdir = tempfile.mkdtemp(prefix="medical_bot_pipeline_")
+    audio_path = os.path.join(workdir, "symptoms.wav")
+    image_path = os.path.join(workdir, "photo.jpg")
+    write_test_wav(audio_path)
+    write_test_image(image_path)
+
+    with start_groq_stub(latency=args.llm_latency, token_interval=args.token_interval, unique_replies=True,
+                         jitter=args.jitter) as groq, \
+            start_elevenlabs_stub(latency=args.tts_latency, jitter=args.jitter) as elevenlabs:
+        os.environ.update(stub_environment(groq, elevenlabs, workdir))
+        module = import_app(args.app)
+        # The event handlers the app binds (from the medical_bot copy the app imported)
+        from medical_bot import app_pipeline as pipeline
+        # No speakers here: skip server-side playback in the local profile
+        module.profile.play_audio = False
+        # Untimed warm-up: first-use SDK imports and connection setup
+        asyncio.run(run_level(pipeline, 1, 1, audio_path, image_path))
+        baseline = rss_mb()
+
+        print(f"app={args.app} requests/level={args.requests} llm_latency={args.llm_latency}s "
+              f"tts_latency={args.tts_latency}s jitter=+/-{args.jitter}s")
+        print(f"rss after warm-up={baseline:.1f} MB")
+        for concurrency in levels:
+            groq_calls, tts_calls = groq.requests, elevenlabs.requests
+            results, errors, elapsed = asyncio.run(
+                run_level(pipeline, concurrency, args.requests, audio_path, image_path))
+            print(f"\nconcurrency={concurrency} completed={len(results)} errors={len(errors)} "
+                  f"elapsed={elapsed:.2f} s throughput={len(results) / elapsed:.2f} req/s")
+            if results:
+                analysis, first_text, voice = zip(*results)
+                print(f"  analysis     {summarize(analysis)}")
+                print(f"  first text   {summarize(first_text)}")
+                print(f"  voice        {summarize(voice)}")
+                print(f"  end to end   {summarize([a + v for a, _, v in results])}")
+            print(f"  rss={rss_mb():.1f} MB peak={peak_rss_mb():.1f} MB  "
+                  f"stub calls: groq chat={groq.requests - groq_calls} elevenlabs={elevenlabs.requests - tts_calls}")
+            for error in errors[:3]:
+                print("  error:", error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: CPU time and latency of turning a microphone recording into an STT upload.
+
+Compares the old record_audio path (WAV -> AudioSegment -> 128k MP3 file via
+ffmpeg, then upload the file) with the in-memory encodings used now: 16 kHz
+WAV, FLAC from speech_recognition's bundled encoder, and the size-based "auto"
+choice. Uploads go to a local stub GROQ server with a throttled uplink.
+
+    python benchmarks/bench_record_encode.py --bandwidth 250000
+"""
+import argparse
+import math
+import os
+import random
+import resource
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import speech_recognition as sr
+from pydub import AudioSegment
+
+from benchmarks.stub_servers import start_groq_stub
+
+MIC_RATE = 44100
+DURATIONS = [5, 15, 30]
+
+
+def synthetic_audio_data(seconds, seed=0):
+    """AudioData as recognizer.listen() returns it: 44.1 kHz mono 16-bit voiced tone plus noise"""
+    rng = random.Random(seed)
+    pcm = bytearray()
+    for i in range(int(seconds * MIC_RATE)):
+        t = i / MIC_RATE
+        envelope = 0.3 + 0.7 * abs(math.sin(math.pi * 3 * t))
+        pcm += struct.pack("<h", int(9000 * envelope * math.sin(2 * math.pi * 160 * t)) + rng.randint(-40, 40))
+    return sr.AudioData(bytes(pcm), MIC_RATE, 2)
+
+
+def cpu_seconds():
+    """CPU used by this process and any encoder subprocesses it has waited for"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def legacy_upload(audio_data, workdir):
+    # What record_audio did before: decode the WAV, export an MP3 file, upload the file
+    path = os.path.join(workdir, "patient_voice_test.mp3")
+    segment = AudioSegment.from_wav(BytesIO(audio_data.get_wav_data()))
+    segment.export(path, format="mp3", bitrate="128k")
+    return path
+
+
+def measure(encode, transcriber, runs):
+    cpu, wall, size = [], [], 0
+    for _ in range(runs):
+        cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+        audio = encode()
+        cpu.append((cpu_seconds() - cpu_start) * 1000)
+        transcriber.transcribe(audio)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        size = len(audio[1]) if isinstance(audio, tuple) else os.path.getsize(audio)
+    return statistics.median(cpu), statistics.median(wall), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bandwidth", type=float, default=250000, help="simulated uplink in bytes/s")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub transcription latency in seconds")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="medical_bot_record_")
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+
+    with start_groq_stub(latency=args.latency, upload_bandwidth=args.bandwidth) as server:
+        os.environ.update({"GROQ_API_KEY": "stub-key", "GROQ_BASE_URL": server.base_url})
+        # Imported after the environment points the clients at the stub
+        from medical_bot.stt_backends import GroqTranscriber
+        from medical_bot.voice_of_the_patient import encode_recording
+
+        transcriber = GroqTranscriber()
+        print(f"uplink={args.bandwidth / 1000:.0f} kB/s  stub latency={args.latency * 1000:.0f} ms  runs={args.runs}")
+        print(f"{'clip':<6} {'path':<12} {'bytes':>9} {'encode cpu ms':>14} {'e2e ms':>9}")
+        for seconds in DURATIONS:
+            audio_data = synthetic_audio_data(seconds)
+            # Bind this clip as a default argument; a bare closure would see the last loop value
+            variants = [
+                ("wav", lambda audio_data=audio_data: encode_recording(audio_data, "wav")),
+                ("flac", lambda audio_data=audio_data: encode_recording(audio_data, "flac")),
+                ("auto", lambda audio_data=audio_data: encode_recording(audio_data, "auto")),
+            ]
+            if has_ffmpeg:
+                variants.insert(0, ("legacy mp3", lambda audio_data=audio_data: legacy_upload(audio_data, workdir)))
+            transcriber.transcribe(encode_recording(audio_data, "wav"))  # warm the connection
+            for name, encode in variants:
+                cpu, wall, size = measure(encode, transcriber, args.runs)
+                print(f"{seconds:>4} s {name:<12} {size:>9} {cpu:>14.1f} {wall:>9.0f}")
+        if not has_ffmpeg:
+            print("legacy mp3 path skipped: ffmpeg not found (the old record_audio could not run here either)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: how long after the patient stops talking the transcript is ready.
+
+Replays a synthetic dictation (utterances separated by short pauses) in real
+time through the streaming capture pipeline, and compares it with the batch
+path that waits for the whole recording and then transcribes it in one go.
+Transcription goes to a local stub GROQ server with a throttled uplink.
+
+    python benchmarks/bench_streaming_capture.py --utterances 6
+"""
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_servers import start_groq_stub
+
+RATE = 44100
+
+
+def synthetic_dictation(path, utterances, seconds, pause, seed=0):
+    """Stereo WAV of voiced bursts (one per utterance) separated by room-noise pauses"""
+    rng = random.Random(seed)
+    frames = bytearray()
+
+    def add(duration, voiced, pitch=150):
+        for i in range(int(duration * RATE)):
+            noise = rng.randint(-40, 40)
+            sample = noise
+            if voiced:
+                t = i / RATE
+                envelope = 0.3 + 0.7 * abs(math.sin(math.pi * 3 * t))
+                sample += int(9000 * envelope * math.sin(2 * math.pi * pitch * t))
+            frames.extend(struct.pack("<hh", sample, sample))
+
+    add(0.8, False)
+    for index in range(utterances):
+        add(seconds, True, pitch=130 + index * 10)
+        add(pause, False)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(bytes(frames))
+    return 0.8 + utterances * (seconds + pause)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--utterances", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=4.0, help="length of each utterance")
+    parser.add_argument("--pause", type=float, default=0.7, help="pause between utterances")
+    parser.add_argument("--bandwidth", type=float, default=250000, help="simulated uplink in bytes/s")
+    parser.add_argument("--latency", type=float, default=0.4, help="stub transcription latency in seconds")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="medical_bot_stream_"), "dictation.wav")
+    total = synthetic_dictation(path, args.utterances, args.seconds, args.pause)
+
+    with start_groq_stub(latency=args.latency, upload_bandwidth=args.bandwidth) as server:
+        os.environ.update({"GROQ_API_KEY": "stub-key", "GROQ_BASE_URL": server.base_url, "STT_BACKEND": "groq"})
+        # Imported after the environment points the clients at the stub
+        from medical_bot.streaming_capture import replay_file
+        from medical_bot.stt_backends import transcribe_audio
+
+        transcribe_audio(path)  # warm the pooled connection
+
+        # Batch: the recording only exists once the patient stops, then it is transcribed
+        start = time.perf_counter()
+        transcribe_audio(path)
+        batch_wait = time.perf_counter() - start
+
+        # Streaming: replay in real time; count only the wait after the audio ends
+        done = []
+        start = time.perf_counter()
+        replay_file(path, realtime=True, on_text=lambda index, text: done.append(index))
+        streaming_wait = time.perf_counter() - start - total
+
+    print(f"dictation={total:.1f} s  utterances={args.utterances}  uplink={args.bandwidth / 1000:.0f} kB/s  "
+          f"stub latency={args.latency * 1000:.0f} ms")
+    print(f"batch      transcript ready {batch_wait * 1000:7.0f} ms after the recording ends")
+    print(f"streaming  transcript ready {max(0.0, streaming_wait) * 1000:7.0f} ms after the recording ends "
+          f"({len(done)} utterances transcribed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: real-time factor of the text-to-speech engines.
+
+Synthesizes short, medium and long doctor replies with every engine and reports
+latency and real-time factor (synthesis time / audio duration; below 1.0 is
+faster than playback). ElevenLabs and gTTS run against local stub servers with
+the given latency, so their numbers show how round trips and gTTS's one request
+per sentence add up rather than how fast the real services are. The local Piper
+engine runs for real when piper-tts is installed and PIPER_VOICE points at a voice.
+Afterwards it shows which engine TTS_BACKEND=auto picks for each reply within
+the latency budget, based on the measured times.
+
+    python benchmarks/bench_tts_engines.py --runs 5
+    PIPER_VOICE=voices/en_US-lessac-medium.onnx python benchmarks/bench_tts_engines.py --budget-ms 800
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import percentile
+from benchmarks.stub_servers import start_elevenlabs_stub, start_gtts_stub, use_gtts_stub
+
+REPLIES = {
+    "short": "With what I see, I think you have mild contact dermatitis.",
+    "medium": ("With what I see, I think you have mild contact dermatitis, probably from a new soap or detergent. "
+               "Keep the area clean and dry, avoid scratching, and use a fragrance free moisturizer twice a day."),
+    "long": ("With what I see, I think you have mild contact dermatitis, probably from a new soap or detergent. "
+             "Keep the area clean and dry, avoid scratching, and use a fragrance free moisturizer twice a day. "
+             "A thin layer of over the counter hydrocortisone cream for up to a week should calm the itching. "
+             "If the rash spreads, blisters, starts to ooze or you develop a fever, please see a doctor in person "
+             "soon, because that can mean an infection that needs prescription treatment."),
+}
+
+# MPEG audio: bitrate (kbps) by index for MPEG-1 and MPEG-2/2.5 Layer III, sample rates by version
+_MP3_BITRATES = {1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+                 2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]}
+_MP3_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def mp3_duration(data):
+    """Seconds of audio in a Layer III MP3 byte string, by walking its frame headers"""
+    seconds, offset = 0.0, 0
+    if data[:3] == b"ID3":
+        offset = 10 + ((data[6] & 0x7f) << 21 | (data[7] & 0x7f) << 14 | (data[8] & 0x7f) << 7 | (data[9] & 0x7f))
+    while offset + 4 <= len(data):
+        header = int.from_bytes(data[offset:offset + 4], "big")
+        version = (header >> 19) & 3
+        bitrate_index, rate_index = (header >> 12) & 15, (header >> 10) & 3
+        if header >> 21 != 0x7ff or version == 1 or bitrate_index in (0, 15) or rate_index == 3:
+            offset += 1  # not a frame header: resync
+            continue
+        rate = _MP3_RATES[version][rate_index]
+        bitrate = _MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+        samples = 1152 if version == 3 else 576
+        padding = (header >> 9) & 1
+        offset += samples // 8 * bitrate // rate + padding
+        seconds += samples / rate
+    return seconds
+
+
+def audio_duration(data):
+    if data[:4] == b"RIFF":
+        with wave.open(io.BytesIO(data)) as f:
+            return f.getnframes() / f.getframerate()
+    return mp3_duration(data)
+
+
+def measure(engine, text, runs):
+    """Latencies of runs syntheses of text and the audio length"""
+    latencies, duration = [], 0.0
+    for _ in range(runs):
+        start = time.perf_counter()
+        audio = engine.synthesize(text)
+        latencies.append(time.perf_counter() - start)
+        engine.observe(len(text), latencies[-1])
+        duration = audio_duration(audio)
+    return latencies, duration
+
+
+def measure_concurrent(engine, text, concurrency, runs):
+    """Audio seconds produced per wall-clock second with concurrency syntheses in flight"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outputs = list(pool.map(lambda _: engine.synthesize(text), range(concurrency * runs)))
+    elapsed = time.perf_counter() - start
+    return sum(audio_duration(audio) for audio in outputs) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="syntheses per engine and reply")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel syntheses for the throughput row")
+    parser.add_argument("--elevenlabs-latency", type=float, default=0.35, help="stub ElevenLabs time to first byte")
+    parser.add_argument("--gtts-latency", type=float, default=0.25, help="stub gTTS latency per request")
+    parser.add_argument("--chunk-interval", type=float, default=0.002, help="delay between streamed MP3 chunks")
+    parser.add_argument("--jitter", type=float, default=0.05, help="+/- random seconds added to stub latencies")
+    parser.add_argument("--budget-ms", type=float, default=None, help="latency budget for the selection table")
+    args = parser.parse_args()
+
+    with start_elevenlabs_stub(latency=args.elevenlabs_latency, chunk_interval=args.chunk_interval,
+                               jitter=args.jitter) as elevenlabs, \
+            start_gtts_stub(latency=args.gtts_latency, jitter=args.jitter) as gtts_server:
+        os.environ.update({"ELEVENLABS_API_KEY": "stub-key", "ELEVENLABS_BASE_URL": elevenlabs.base_url})
+        use_gtts_stub(gtts_server)
+        from medical_bot.tts_backends import ENGINE_ORDER, TTS_LATENCY_BUDGET_MS, get_tts_engine, select_tts_engines
+
+        print(f"{'engine':<11} {'reply':<7} {'chars':>5} {'p50 ms':>8} {'p95 ms':>8} {'audio s':>8} {'RTF':>7}")
+        throughput = {}
+        for name in ENGINE_ORDER:
+            engine = get_tts_engine(name)
+            if not engine.available():
+                print(f"{name:<11} skipped (not configured; the local engine needs piper-tts and PIPER_VOICE)")
+                continue
+            try:
+                engine.synthesize("Warm up.")
+            except Exception as e:
+                print(f"{name:<11} skipped ({e})")
+                continue
+            for label, text in REPLIES.items():
+                latencies, duration = measure(engine, text, args.runs)
+                latencies.sort()
+                rtf = statistics.mean(latencies) / duration if duration else float("nan")
+                print(f"{name:<11} {label:<7} {len(text):>5} {percentile(latencies, 0.5) * 1000:>8.0f} "
+                      f"{percentile(latencies, 0.95) * 1000:>8.0f} {duration:>8.1f} {rtf:>7.3f}")
+            throughput[name] = measure_concurrent(engine, REPLIES["medium"], args.concurrency, 2)
+
+        print(f"\naudio seconds synthesized per second, {args.concurrency} medium replies in parallel:")
+        for name, rate in throughput.items():
+            print(f"  {name:<11} {rate:6.1f}")
+
+        budget = TTS_LATENCY_BUDGET_MS if args.budget_ms is None else args.budget_ms
+        print(f"\nauto selection within {budget:.0f} ms (expected latency of each engine):")
+        for label, text in REPLIES.items():
+            engines = select_tts_engines(text, backend="auto", budget_ms=budget)
+            expected = "  ".join(f"{e.name}={e.expected_seconds(len(text)) * 1000:.0f}ms" for e in engines)
+            print(f"  {label:<7} -> {engines[0].name if engines else 'none':<11} {expected}")
+
+
+if __name__ == "__main__":
+    main()
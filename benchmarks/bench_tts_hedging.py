@@ -0,0 +1,76 @@
+"""
+Benchmark: tail latency of voice replies with and without hedged TTS requests.
+
+A stub ElevenLabs server answers most requests quickly but stalls on a fraction
+of them (--slow-fraction, --slow-latency); a stub gTTS server is the secondary
+engine. Each reply is synthesized once with hedging off (gTTS is only tried if
+ElevenLabs fails) and once per --hedge-after-ms value, and the latency
+percentiles and the engine that delivered each reply are compared.
+
+    python benchmarks/bench_tts_hedging.py --requests 100 --slow-fraction 0.1
+    python benchmarks/bench_tts_hedging.py --hedge-after-ms 500,1000,2000
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import percentile
+from benchmarks.stub_servers import start_elevenlabs_stub, start_gtts_stub, use_gtts_stub
+
+
+def run(texts, engines, hedge_after_ms, concurrency):
+    from medical_bot.tts_backends import synthesize_hedged
+
+    def one(text):
+        start = time.perf_counter()
+        engine, _, hedged = synthesize_hedged(text, engines, hedge_after_ms=hedge_after_ms)
+        return time.perf_counter() - start, engine.name, hedged
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="replies per configuration")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hedge-after-ms", default="500,1000", help="comma-separated hedge deadlines to compare")
+    parser.add_argument("--elevenlabs-latency", type=float, default=0.35, help="usual stub ElevenLabs time to first byte")
+    parser.add_argument("--slow-fraction", type=float, default=0.1, help="share of ElevenLabs requests that stall")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="time to first byte of a stalled request")
+    parser.add_argument("--gtts-latency", type=float, default=0.25, help="stub gTTS latency per request")
+    parser.add_argument("--jitter", type=float, default=0.05, help="+/- random seconds added to stub latencies")
+    args = parser.parse_args()
+
+    with start_elevenlabs_stub(latency=args.elevenlabs_latency, chunk_interval=0.002, jitter=args.jitter,
+                               slow_fraction=args.slow_fraction, slow_latency=args.slow_latency) as elevenlabs, \
+            start_gtts_stub(latency=args.gtts_latency, jitter=args.jitter) as gtts_server:
+        os.environ.update({"ELEVENLABS_API_KEY": "stub-key", "ELEVENLABS_BASE_URL": elevenlabs.base_url})
+        use_gtts_stub(gtts_server)
+        from medical_bot.tts_backends import get_tts_engine
+
+        engines = [get_tts_engine("elevenlabs"), get_tts_engine("gtts")]
+        get_tts_engine("elevenlabs").synthesize("Warm up.")  # SDK import and connection setup
+        print(f"requests={args.requests} concurrency={args.concurrency} elevenlabs={args.elevenlabs_latency}s "
+              f"({args.slow_fraction:.0%} stall {args.slow_latency}s) gtts={args.gtts_latency}s")
+        print(f"{'hedge after':>12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  {'hedged':>6}  winners")
+        for hedge_after in [0.0] + [float(value) for value in args.hedge_after_ms.split(",") if value.strip()]:
+            texts = [f"With what I see, I think you have mild contact dermatitis. Case {hedge_after:g}-{i}."
+                     for i in range(args.requests)]
+            results = run(texts, engines, hedge_after, args.concurrency)
+            latencies = sorted(latency for latency, _, _ in results)
+            winners = Counter(name for _, name, _ in results)
+            label = "off" if not hedge_after else f"{hedge_after:.0f} ms"
+            print(f"{label:>12} {percentile(latencies, 0.5) * 1000:>8.0f} {percentile(latencies, 0.95) * 1000:>8.0f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.0f} {latencies[-1] * 1000:>8.0f}  "
+                  f"{sum(hedged for _, _, hedged in results):>6}  "
+                  + " ".join(f"{name}={count}" for name, count in winners.most_common()))
+
+
+if __name__ == "__main__":
+    main()
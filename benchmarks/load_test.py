@@ -0,0 +1,154 @@
+"""
+Load test: many simulated users submitting voice + image requests to the Gradio app at once.
+
+The app runs in-process against local stub GROQ and ElevenLabs servers, so the
+numbers show how the queue and concurrency limits shape throughput and tail
+latency rather than how fast the real APIs are. Each user has its own
+gradio_client session and submits requests one after another. With
+STREAM_VOICE=false only the /analyze stage is timed (the chained voice event is
+triggered by the browser, not by API clients). The mean time per pipeline stage
+is read back from the app's /metrics route at the end.
+
+    python benchmarks/load_test.py --users 16 --requests 4 --llm-latency 0.5
+    LLM_CONCURRENCY=2 python benchmarks/load_test.py --users 16
+"""
+import argparse
+import math
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_servers import start_elevenlabs_stub, start_groq_stub, stub_environment
+
+
+def write_test_wav(path, seconds=1.0, rate=16000):
+    """A short sine tone; the stub transcription endpoint ignores the content"""
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+        for i in range(int(seconds * rate))
+    )
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(frames)
+
+
+def write_test_image(path):
+    from PIL import Image
+    Image.new("RGB", (640, 480), (200, 120, 110)).save(path, format="JPEG")
+
+
+def import_app(which):
+    """Import the root or Spaces app module (env vars must already be set)"""
+    if which == "spaces":
+        sys.path.insert(0, os.path.join(ROOT, "hf_spaces_deployment"))
+        import app as module
+    else:
+        import Medical_Bot_Enhanced as module
+    return module
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, math.ceil(len(sorted_values) * fraction) - 1))
+    return sorted_values[index]
+
+
+def stage_means(url):
+    """{stage: (mean seconds, count)} from the app's Prometheus /metrics route, empty if disabled"""
+    import re
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(url.rstrip("/") + os.environ.get("METRICS_ROUTE", "/metrics"), timeout=5) as response:
+            text = response.read().decode()
+    except Exception:
+        return {}
+    sums, counts = {}, {}
+    for name, stage, value in re.findall(r'^medical_bot_stage_seconds_(sum|count)\{stage="([^"]+)"\} (\S+)$', text, re.M):
+        (sums if name == "sum" else counts)[stage] = float(value)
+    return {stage: (sums[stage] / counts[stage], int(counts[stage])) for stage in counts if counts[stage]}
+
+
+def run_user(url, audio_path, image_path, requests, timings, errors, lock):
+    from gradio_client import Client, handle_file
+
+    # Only latency matters here, so outputs are not downloaded
+    client = Client(url, verbose=False, download_files=False)
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            client.predict(handle_file(audio_path), handle_file(image_path), api_name="/analyze")
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            continue
+        with lock:
+            timings.append(time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=("local", "spaces"), default="local")
+    parser.add_argument("--users", type=int, default=16, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=4, help="requests per user")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub GROQ time to first byte in seconds")
+    parser.add_argument("--token-interval", type=float, default=0.005, help="delay between streamed tokens")
+    parser.add_argument("--tts-latency", type=float, default=0.2, help="stub ElevenLabs time to first byte")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random seconds added to stub latencies")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="medical_bot_load_")
+    audio_path = os.path.join(workdir, "symptoms.wav")
+    image_path = os.path.join(workdir, "photo.jpg")
+    write_test_wav(audio_path)
+    write_test_image(image_path)
+
+    with start_groq_stub(latency=args.llm_latency, token_interval=args.token_interval, unique_replies=True,
+                         jitter=args.jitter) as groq, \
+            start_elevenlabs_stub(latency=args.tts_latency, jitter=args.jitter) as elevenlabs:
+        os.environ.update(stub_environment(groq, elevenlabs, workdir))
+        module = import_app(args.app)
+        _, url, _ = module.demo.launch(prevent_thread_lock=True, quiet=True, app_kwargs=dict(module.APP_KWARGS))
+
+        timings, errors = [], []
+        lock = threading.Lock()
+        users = [
+            threading.Thread(target=run_user, args=(url, audio_path, image_path, args.requests, timings, errors, lock))
+            for _ in range(args.users)
+        ]
+        start = time.perf_counter()
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - start
+        stages = stage_means(url)
+        module.demo.close()
+
+    timings.sort()
+    print(f"app={args.app} users={args.users} requests/user={args.requests} "
+          f"llm_concurrency={os.environ.get('LLM_CONCURRENCY', '8')} tts_concurrency={os.environ.get('TTS_CONCURRENCY', '4')}")
+    print(f"completed={len(timings)} errors={len(errors)} elapsed={elapsed:.2f} s "
+          f"throughput={len(timings) / elapsed:.2f} req/s")
+    if timings:
+        print(f"latency p50={percentile(timings, 0.50):.3f} s  p95={percentile(timings, 0.95):.3f} s  "
+              f"p99={percentile(timings, 0.99):.3f} s  max={timings[-1]:.3f} s")
+    print(f"stub calls: groq chat={groq.requests} elevenlabs={elevenlabs.requests}")
+    for stage, (mean, count) in sorted(stages.items()):
+        print(f"stage {stage:<16} mean={mean * 1000:8.1f} ms  n={count}")
+    for error in errors[:5]:
+        print("error:", error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Local stand-ins for the remote services used by the medical bot.
+They speak just enough of the GROQ (OpenAI-compatible) and ElevenLabs HTTP APIs
+to drive the real SDK clients, so benchmarks can run offline without API keys.
+"""
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length and self.server.upload_bandwidth:
+            # Simulate a slow client uplink (bytes per second)
+            time.sleep(length / self.server.upload_bandwidth)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self._send_rate_limit_headers(headers)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_rate_limit_headers(self, extra=None):
+        for name, value in {**self.server.rate_limit_headers(), **(extra or {})}.items():
+            self.send_header(name, value)
+
+    def _send_rate_limited(self, retry_after):
+        self.server.rate_limited += 1
+        self._send_json({"error": {"message": "Rate limit reached, please try again later",
+                                   "type": "requests", "code": "rate_limit_exceeded"}},
+                        status=429, headers={"retry-after": f"{retry_after:.2f}"})
+
+    def _send_stream(self, text):
+        # Server-sent events in the OpenAI streaming format, one word per chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._send_rate_limit_headers()
+        self.end_headers()
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == 0 else " " + word
+            event = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": "stub",
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            time.sleep(self.server.token_interval)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    def do_POST(self):
+        body = self._read_body()
+        # Roughly what GROQ would count: ~4 characters per prompt token plus a short answer
+        retry_after = self.server.take_quota(len(body) // 4 + 50 if self.path.endswith("/chat/completions") else 0)
+        if retry_after:
+            self._send_rate_limited(retry_after)
+            return
+        time.sleep(self.server.response_delay())
+
+        if self.path.endswith("/chat/completions"):
+            if b'"stream": true' in body or b'"stream":true' in body:
+                self._send_stream(self.server.next_reply())
+                return
+            self._send_json({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "stub",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": self.server.next_reply()},
+                }],
+            })
+        elif self.path.endswith("/audio/transcriptions"):
+            self._send_json({"text": self.server.transcript_text})
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+# One silent MPEG-2 Layer III frame (22.05 kHz, 32 kbps) - about 26 ms of audio
+_MP3_FRAME = b"\xff\xf3\x48\xc4" + b"\x00" * 140
+# Roughly how much speech one character of text turns into
+_FRAMES_PER_CHAR = 3
+
+
+class StubElevenLabsHandler(StubGroqHandler):
+    """Answers POST /v1/text-to-speech/<voice_id>[/stream] with chunked MP3 frames"""
+
+    def do_POST(self):
+        body = json.loads(self._read_body() or b"{}")
+        time.sleep(self.server.response_delay())
+
+        if "/v1/text-to-speech/" not in self.path:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.server.record_request()
+        frames = max(1, len(body.get("text", "")) * _FRAMES_PER_CHAR)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # Send audio in ~1 KB pieces the way the real service streams it
+        per_chunk = 8
+        for start in range(0, frames, per_chunk):
+            self._write_chunk(_MP3_FRAME * min(per_chunk, frames - start))
+            time.sleep(self.server.token_interval)
+        self._write_chunk(b"")
+
+
+class StubGTTSHandler(StubGroqHandler):
+    """Answers gTTS's POST .../batchexecute with one base64 MP3 per text part, as Google Translate does"""
+
+    def do_POST(self):
+        form = parse_qs(self._read_body().decode("utf-8"))
+        time.sleep(self.server.response_delay())
+        try:
+            rpc = json.loads(form["f.req"][0])
+            text = json.loads(rpc[0][0][1])[0]
+        except (KeyError, IndexError, ValueError):
+            self.send_response(400)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.server.record_request()
+        audio = base64.b64encode(_MP3_FRAME * max(1, len(text) * _FRAMES_PER_CHAR)).decode("ascii")
+        body = (")]}'\n\n" + json.dumps([["wrb.fr", "jQ1olc", json.dumps([audio]), None, None, None, "generic"]],
+                                          separators=(",", ":"))
+                + "\n").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler, latency=0.0, token_interval=0.0, unique_replies=False, upload_bandwidth=None,
+                 jitter=0.0, seed=0, slow_fraction=0.0, slow_latency=0.0, quota_rpm=0, quota_tpm=0):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.jitter = jitter
+        # Tail latency: this fraction of responses waits slow_latency instead
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self.upload_bandwidth = upload_bandwidth
+        self.token_interval = token_interval
+        self.unique_replies = unique_replies
+        self.reply_text = "With what I see, I think you have mild contact dermatitis."
+        self.transcript_text = "I have had an itchy rash on my arm for three days."
+        self.connections = 0
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        # Per-minute request/token quotas enforced like GROQ does (0 = unlimited)
+        self.quota = {"requests": [quota_rpm, float(quota_rpm)], "tokens": [quota_tpm, float(quota_tpm)]}
+        self._quota_updated = time.monotonic()
+        self.rate_limited = 0
+
+    def record_connection(self):
+        with self._count_lock:
+            self.connections += 1
+
+    def record_request(self):
+        with self._count_lock:
+            self.requests += 1
+            return self.requests
+
+    def handle_error(self, request, client_address):
+        # Clients hang up mid-response on purpose (e.g. the loser of a hedged TTS request)
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def _refill_quota(self):
+        now = time.monotonic()
+        for budget in self.quota.values():
+            limit = budget[0]
+            budget[1] = min(limit, budget[1] + (now - self._quota_updated) * limit / 60.0)
+        self._quota_updated = now
+
+    def take_quota(self, tokens):
+        """Charge one request and tokens; 0 if within quota, else seconds until it would fit"""
+        with self._count_lock:
+            self._refill_quota()
+            needed = {"requests": 1, "tokens": tokens}
+            waits = [(needed[name] - level) * 60.0 / limit
+                     for name, (limit, level) in self.quota.items() if limit and level < needed[name]]
+            if waits:
+                return max(waits)
+            for name, budget in self.quota.items():
+                if budget[0]:
+                    budget[1] -= needed[name]
+            return 0
+
+    def rate_limit_headers(self):
+        """x-ratelimit-* headers for the quotas in force"""
+        headers = {}
+        with self._count_lock:
+            self._refill_quota()
+            for name, (limit, level) in self.quota.items():
+                if limit:
+                    headers[f"x-ratelimit-limit-{name}"] = str(limit)
+                    headers[f"x-ratelimit-remaining-{name}"] = str(int(level))
+                    headers[f"x-ratelimit-reset-{name}"] = f"{(limit - level) * 60.0 / limit:.2f}s"
+        return headers
+
+    def response_delay(self):
+        """Seconds before responding: latency (or slow_latency for the slow fraction) +/- jitter"""
+        latency = self.latency
+        if self.slow_fraction and self._random.random() < self.slow_fraction:
+            latency = self.slow_latency
+        if not self.jitter:
+            return latency
+        return max(0.0, latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def next_reply(self):
+        """The chat reply; with unique_replies each one differs so downstream caches miss"""
+        count = self.record_request()
+        if self.unique_replies:
+            return f"{self.reply_text} Case number {count}."
+        return self.reply_text
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def start_groq_stub(latency=0.0, token_interval=0.0, unique_replies=False, upload_bandwidth=None, jitter=0.0,
+                    quota_rpm=0, quota_tpm=0):
+    """
+    Start a stub GROQ server in a background thread (use as a context manager).
+    latency is the delay before responding (+/- jitter); token_interval spaces out streamed
+    tokens; upload_bandwidth (bytes/s) charges request bodies for a slow uplink.
+    quota_rpm / quota_tpm answer 429 with retry-after once the per-minute budget is spent.
+    """
+    return StubServer(StubGroqHandler, latency=latency, token_interval=token_interval,
+                      unique_replies=unique_replies, upload_bandwidth=upload_bandwidth, jitter=jitter,
+                      quota_rpm=quota_rpm, quota_tpm=quota_tpm)
+
+
+def start_elevenlabs_stub(latency=0.0, chunk_interval=0.0, jitter=0.0, slow_fraction=0.0, slow_latency=0.0):
+    """
+    Start a stub ElevenLabs TTS server; latency is time to first byte (+/- jitter),
+    except for slow_fraction of the requests which wait slow_latency
+    """
+    return StubServer(StubElevenLabsHandler, latency=latency, token_interval=chunk_interval, jitter=jitter, seed=1,
+                      slow_fraction=slow_fraction, slow_latency=slow_latency)
+
+
+def start_gtts_stub(latency=0.0, jitter=0.0):
+    """
+    Start a stub Google Translate TTS server. gTTS has no endpoint setting, so point it
+    here with use_gtts_stub() (benchmarks only).
+    """
+    return StubServer(StubGTTSHandler, latency=latency, jitter=jitter, seed=2)
+
+
+def use_gtts_stub(server):
+    """Send gTTS requests in this process to server instead of translate.google.com"""
+    import gtts.tts
+    gtts.tts._translate_url = lambda tld="com", path="": f"{server.base_url}/{path}"
+
+
+def stub_environment(groq, elevenlabs, workdir):
+    """
+    Environment variables that point the app at the stubs, with the response and
+    TTS caches isolated in workdir so every request reaches the stubs.
+    Set them before importing the app.
+    """
+    return {
+        "GROQ_API_KEY": "stub-key",
+        "GROQ_BASE_URL": groq.base_url,
+        "ELEVENLABS_API_KEY": "stub-key",
+        "ELEVENLABS_BASE_URL": elevenlabs.base_url,
+        "RESPONSE_CACHE_BACKEND": "none",
+        "TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+        "SCRATCH_DIR": os.path.join(workdir, "scratch"),
+        "TTS_CACHE_PREWARM": "false",
+        # Transcribe through the GROQ stub unless a local Whisper run is asked for
+        "STT_BACKEND": os.environ.get("STT_BACKEND", "groq"),
+        # The stub has no quota unless asked; free-tier GROQ budgets would throttle the runs
+        "GROQ_RATE_LIMITS": os.environ.get("GROQ_RATE_LIMITS", "*=100000/0"),
+        # One JSON trace line per request would drown the report
+        "TRACE_LOG": os.environ.get("TRACE_LOG", "false"),
+    }
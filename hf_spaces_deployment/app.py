@@ -6,668 +6,31 @@ import os
 import gradio as gr
 import tempfile
 
-# Spaces-specific imports (no dotenv needed)
-from brain_of_the_doctor import get_medical_response
-from voice_of_the_patient import get_audio_text
-from voice_of_the_doctor import generate_audio
-
-system_prompt="""You have to act as a professional doctor, i know you are not but this is for learning purpose. 
-            What's in this image?. Do you find anything wrong with it medically? 
-            If you make a differential, suggest some remedies for them. Donot add any numbers or special characters in 
-            your response. Your response should be in one long paragraph. Also always answer as if you are answering to a real person.
-            Donot say 'In the image I see' but say 'With what I see, I think you have ....'
-            Dont respond as an AI model in markdown, your answer should mimic that of an actual doctor not an AI bot, 
-            Keep your answer concise (max 2 sentences). No preamble, start your answer right away please"""
-
-
-def process_inputs(audio_filepath, image_file):
-    # Spaces-optimized audio transcription
-    speech_to_text_output = get_audio_text(audio_filepath) if audio_filepath else ""
-
-    # Handle the image input with enhanced error handling (same as local)
-    if image_file:
-        try:
-            # Check if it's a supported format first
-            image_filepath = image_file.name if hasattr(image_file, 'name') else str(image_file)
-            
-            if image_filepath.lower().endswith('.avif'):
-                doctor_response = "I apologize, but AVIF image format is not currently supported. Please upload your medical image in JPG, PNG, GIF, or WebP format for analysis."
-                image_display = None
-            else:
-                # Spaces-optimized image processing
-                full_query = system_prompt + " " + speech_to_text_output if speech_to_text_output else system_prompt
-                doctor_response = get_medical_response(full_query, image_file)
-                image_display = image_file  # Display the uploaded image
-        except Exception as e:
-            # Handle any other image processing errors gracefully
-            print(f"Image processing error: {e}")  # For debugging
-            if "UnidentifiedImageError" in str(e) or "cannot identify image file" in str(e):
-                doctor_response = "I'm unable to process this image format. Please upload a medical image in JPG, PNG, GIF, or WebP format for analysis."
-            elif "avif" in str(e).lower():
-                doctor_response = "AVIF format is not supported. Please convert your image to JPG, PNG, GIF, or WebP format and try again."
-            else:
-                doctor_response = "I encountered an issue analyzing the image. Please try uploading a different image in a standard format (JPG, PNG, GIF, or WebP)."
-            image_display = None
-    else:
-        # No image provided - analyze text/speech only
-        if speech_to_text_output and speech_to_text_output.strip():
-            # We have speech input, analyze it
-            full_query = system_prompt + " " + speech_to_text_output
-            doctor_response = get_medical_response(full_query, None)
-        else:
-            # No input at all
-            doctor_response = "Please provide either voice input describing your symptoms or upload a medical image for analysis."
-        image_display = None
-
-    # Return text response first (voice will be generated separately)
-    return speech_to_text_output, doctor_response, image_display
-
-def generate_voice_response(doctor_response):
-    """Generate voice response after text is displayed - Spaces optimized"""
-    if doctor_response and doctor_response.strip() and len(doctor_response.strip()) > 10:
-        try:
-            print(f"Generating audio for: {doctor_response[:50]}...")  # Debug log
-            voice_of_doctor = generate_audio(doctor_response)
-            if voice_of_doctor:
-                print("Audio generation successful!")
-                return voice_of_doctor
-            else:
-                print("Audio generation returned None")
-                return None
-        except Exception as e:
-            print(f"Audio generation failed: {e}")
-            # Fallback if voice synthesis fails
-            return None
-    else:
-        print("No valid doctor response for audio generation")
-        return None
-
-def display_uploaded_image(image_file):
-    """Function to show uploaded image in the interface - Spaces compatible"""
-    if image_file:
-        return image_file, gr.update(visible=True)
-    else:
-        return None, gr.update(visible=False)
+# Same backend package as the local app (copied here by sync_spaces.py); the
+# "spaces" profile unless DEPLOYMENT_PROFILE says otherwise
+from medical_bot.config import select_profile
+profile = select_profile("spaces")
+
+# Event handlers (transcription, streamed answer, voice, per-session limit, tracing)
+# are shared with the other app; the interface below only lays out the components
+from medical_bot.app_pipeline import (
+    STREAM_VOICE, bind_analysis, display_uploaded_image, start_prewarm,
+)
+from medical_bot.session_limits import LLM_CONCURRENCY, QUEUE_MAX_SIZE
+from medical_bot.css_assets import attach_stylesheet, build_stylesheet, stylesheet_middleware
+from medical_bot.tracing import metrics_middleware
 
 # -------------------------------------------
 # EXACT SAME CSS AS LOCAL VERSION - Professional Medical Interface
 # -------------------------------------------
-custom_css = """
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-
-/* Interactive Professional Medical Interface with Animations */
-:root {
-    --bg-primary: linear-gradient(135deg, #f0f8ff 0%, #e6f3ff 25%, #ddeeff 75%, #d4e9ff 100%);
-    --bg-primary-light: linear-gradient(135deg, #f0f8ff 0%, #e6f3ff 25%, #ddeeff 75%, #d4e9ff 100%);
-    --card-bg: rgba(255, 255, 255, 0.95);
-    --card-bg-hover: rgba(255, 255, 255, 1);
-    --primary-blue: #1565c0;
-    --secondary-blue: #1976d2;
-    --accent-blue: #42a5f5;
-    --light-blue: #e3f2fd;
-    --text-primary: #0d47a1;
-    --text-secondary: #1565c0;
-    --text-light: #1976d2;
-    --text-muted: #64748b;
-    --border-color: rgba(21, 101, 192, 0.15);
-    --shadow-color: rgba(21, 101, 192, 0.1);
-    --hover-shadow: rgba(21, 101, 192, 0.2);
-    --white: #ffffff;
-    --light-gray: #f8fafc;
-}
-
-/* Medical Animation Keyframes */
-@keyframes pulse {
-    0%, 100% { transform: scale(1); opacity: 0.7; }
-    50% { transform: scale(1.05); opacity: 1; }
-}
-
-@keyframes float {
-    0%, 100% { transform: translateY(0px) rotate(0deg); }
-    33% { transform: translateY(-10px) rotate(1deg); }
-    66% { transform: translateY(-5px) rotate(-1deg); }
-}
-
-@keyframes heartbeat {
-    0%, 100% { transform: scale(1); }
-    25% { transform: scale(1.1); }
-    50% { transform: scale(1); }
-    75% { transform: scale(1.05); }
-}
-
-@keyframes fadeInUp {
-    from { opacity: 0; transform: translateY(30px); }
-    to { opacity: 1; transform: translateY(0); }
-}
-
-@keyframes slideInLeft {
-    from { opacity: 0; transform: translateX(-30px); }
-    to { opacity: 1; transform: translateX(0); }
-}
-
-@keyframes slideInRight {
-    from { opacity: 0; transform: translateX(30px); }
-    to { opacity: 1; transform: translateX(0); }
-}
-
-@keyframes shimmer {
-    0% { background-position: -200px 0; }
-    100% { background-position: calc(200px + 100%) 0; }
-}
-
-@keyframes medicalWave {
-    0% { transform: translateX(-100%); }
-    100% { transform: translateX(100%); }
-}
-
-/* Clean Professional Background */
-.gradio-container {
-    position: relative;
-}
-
-@keyframes medicalFloat {
-    0%, 100% { transform: translate(0px, 0px) rotate(0deg); }
-    33% { transform: translate(30px, -30px) rotate(1deg); }
-    66% { transform: translate(-20px, 20px) rotate(-1deg); }
-}
-
-@keyframes medicalGrid {
-    0% { transform: translate(0, 0); }
-    100% { transform: translate(50px, 50px); }
-}
-
-/* Floating Medical Icons Background */
-.medical-background {
-    position: fixed;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    pointer-events: none;
-    z-index: -1;
-    overflow: hidden;
-}
-
-.medical-icon-float {
-    position: absolute;
-    font-size: 2em;
-    color: rgba(33, 150, 243, 0.08);
-    animation: float 15s infinite ease-in-out;
-}
-
-.medical-icon-float:nth-child(1) { top: 10%; left: 10%; animation-delay: 0s; }
-.medical-icon-float:nth-child(2) { top: 20%; left: 80%; animation-delay: 2s; }
-.medical-icon-float:nth-child(3) { top: 60%; left: 15%; animation-delay: 4s; }
-.medical-icon-float:nth-child(4) { top: 80%; left: 70%; animation-delay: 6s; }
-.medical-icon-float:nth-child(5) { top: 40%; left: 60%; animation-delay: 8s; }
-.medical-icon-float:nth-child(6) { top: 70%; left: 30%; animation-delay: 10s; }
-
-@keyframes float {
-    0%, 100% { transform: translateY(0px) rotate(0deg); opacity: 0.05; }
-    25% { transform: translateY(-20px) rotate(2deg); opacity: 0.1; }
-    50% { transform: translateY(0px) rotate(0deg); opacity: 0.08; }
-    75% { transform: translateY(-10px) rotate(-1deg); opacity: 0.06; }
-}
-
-/* Pulse Animation for Cards */
-.medical-card::after {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    bottom: 0;
-    background: radial-gradient(circle at center, rgba(33, 150, 243, 0.02) 0%, transparent 70%);
-    border-radius: 12px;
-    opacity: 0;
-    animation: cardPulse 4s ease-in-out infinite;
-    pointer-events: none;
-}
-
-@keyframes cardPulse {
-    0%, 100% { opacity: 0; transform: scale(1); }
-    50% { opacity: 1; transform: scale(1.02); }
-}
-
-/* Global Theme Detection */
-@media (prefers-color-scheme: dark) {
-    .gradio-container {
-        background: var(--bg-primary-dark) !important;
-        color: var(--text-primary-dark) !important;
-    }
-    
-    .gradio-container::before {
-        background-image: 
-            radial-gradient(circle at 20% 80%, rgba(148, 163, 184, 0.08) 0%, transparent 30%),
-            radial-gradient(circle at 80% 20%, rgba(71, 85, 105, 0.06) 0%, transparent 30%),
-            radial-gradient(circle at 40% 40%, rgba(148, 163, 184, 0.04) 0%, transparent 40%);
-    }
-    
-    .medical-icon-float {
-        color: rgba(148, 163, 184, 0.12);
-    }
-}
-
-/* Global Theme */
-.gradio-container {
-    background: var(--bg-primary-light) !important;
-    font-family: 'Inter', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif !important;
-    color: var(--text-primary-light) !important;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    position: relative;
-    overflow-x: hidden;
-}
-
-/* Dark theme styles */
-.dark .gradio-container {
-    background: var(--bg-primary-dark) !important;
-    color: var(--text-primary-dark) !important;
-}
-
-/* Modern Professional Header */
-.header-container {
-    background: linear-gradient(135deg, var(--primary-blue) 0%, var(--secondary-blue) 100%) !important;
-    padding: 32px 40px !important;
-    border-radius: 20px !important;
-    margin-bottom: 32px !important;
-    box-shadow: 0 8px 40px rgba(0, 102, 204, 0.15) !important;
-    border: none !important;
-    position: relative !important;
-    overflow: hidden !important;
-}
-
-.header-container::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: -100%;
-    width: 100%;
-    height: 100%;
-    background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.1), transparent);
-    transition: left 0.8s ease-in-out;
-}
-
-.header-container::after {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    bottom: 0;
-    background: 
-        radial-gradient(circle at 10% 20%, rgba(255, 255, 255, 0.1) 0%, transparent 20%),
-        radial-gradient(circle at 90% 80%, rgba(255, 255, 255, 0.05) 0%, transparent 25%);
-    animation: headerPulse 6s ease-in-out infinite;
-    pointer-events: none;
-}
-
-@keyframes headerPulse {
-    0%, 100% { opacity: 0.5; }
-    50% { opacity: 1; }
-}
-
-.header-container:hover::before {
-    left: 100%;
-}
-
-.header-container:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 12px 40px rgba(21, 101, 192, 0.3);
-}
-
-.dark .header-container {
-    background: linear-gradient(135deg, rgba(30, 41, 59, 0.95) 0%, rgba(51, 65, 85, 0.9) 100%);
-    border: 1px solid rgba(148, 163, 184, 0.2);
-    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.6);
-}
-
-.dark .header-container:hover {
-    box-shadow: 0 12px 40px rgba(30, 41, 59, 0.8);
-}
-
-.dark .header-container::after {
-    background: 
-        radial-gradient(circle at 10% 20%, rgba(148, 163, 184, 0.1) 0%, transparent 20%),
-        radial-gradient(circle at 90% 80%, rgba(148, 163, 184, 0.05) 0%, transparent 25%);
-}
-
-/* Interactive Card Styling with Enhanced Backgrounds */
-.medical-card,
-.gradio-group {
-    background: var(--card-bg) !important;
-    border-radius: 20px !important;
-    padding: 20px !important;
-    margin: 15px 0 !important;
-    border: 1px solid var(--border-color) !important;
-    box-shadow: 0 8px 32px var(--shadow-color) !important;
-    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    backdrop-filter: blur(12px) !important;
-    width: 100% !important;
-    box-sizing: border-box !important;
-    position: relative !important;
-    overflow: hidden !important;
-    animation: slideInUp 0.6s ease-out !important;
-}
-
-/* Medical Card Accent Border Animation */
-.gr-group::before,
-.gradio-group::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 3px;
-    background: linear-gradient(90deg, 
-        var(--primary-blue) 0%, 
-        var(--accent-blue) 50%, 
-        var(--primary-blue) 100%);
-    border-radius: 20px 20px 0 0;
-    opacity: 0;
-    transition: opacity 0.3s ease;
-}
-
-/* Shimmer Effect on Hover */
-.gr-group::after,
-.gradio-group::after {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: -200px;
-    width: 200px;
-    height: 100%;
-    background: linear-gradient(90deg, 
-        transparent, 
-        rgba(255, 255, 255, 0.4), 
-        transparent);
-    transition: all 0.6s ease;
-    z-index: 1;
-}
-
-/* Interactive Card Hover Effects */
-.gr-group:hover,
-.gradio-group:hover {
-    transform: translateY(-6px) scale(1.02) !important;
-    box-shadow: 0 15px 50px var(--hover-shadow) !important;
-    background: var(--card-bg-hover) !important;
-    border-color: var(--accent-blue) !important;
-}
-
-.gr-group:hover::before,
-.gradio-group:hover::before {
-    opacity: 1 !important;
-}
-
-.gr-group:hover::after,
-.gradio-group:hover::after {
-    left: 100% !important;
-}
-
-/* Interactive Medical Buttons with Animations */
-.gradio-button {
-    background: linear-gradient(135deg, var(--primary-blue) 0%, var(--secondary-blue) 100%) !important;
-    color: var(--white) !important;
-    border: none !important;
-    border-radius: 14px !important;
-    padding: 14px 28px !important;
-    font-weight: 600 !important;
-    font-size: 15px !important;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    box-shadow: 0 6px 24px rgba(21, 101, 192, 0.25) !important;
-    cursor: pointer !important;
-    width: 100% !important;
-    box-sizing: border-box !important;
-    min-height: 48px !important;
-    position: relative !important;
-    overflow: hidden !important;
-    animation: fadeInUp 0.8s ease-out !important;
-}
-
-.gradio-button:hover {
-    transform: translateY(-4px) scale(1.02) !important;
-    box-shadow: 0 12px 40px rgba(21, 101, 192, 0.4) !important;
-    background: linear-gradient(135deg, var(--secondary-blue) 0%, var(--accent-blue) 100%) !important;
-}
-
-/* Clear Button with Different Color */
-.clear-btn {
-    background: linear-gradient(135deg, #ef4444 0%, #f87171 100%) !important;
-}
-
-.clear-btn:hover {
-    box-shadow: 0 8px 30px rgba(239, 68, 68, 0.4) !important;
-}
-
-/* Modern Section Headers */
-.section-header {
-    color: var(--primary-blue) !important;
-    font-weight: 600 !important;
-    font-size: 18px !important;
-    margin-bottom: 16px !important;
-    display: flex !important;
-    align-items: center !important;
-    gap: 12px !important;
-}
-
-.section-header .medical-icon {
-    background: var(--accent-blue) !important;
-    color: var(--primary-blue) !important;
-    width: 40px !important;
-    height: 40px !important;
-    border-radius: 10px !important;
-    display: flex !important;
-    align-items: center !important;
-    justify-content: center !important;
-    font-size: 20px !important;
-}
-
-/* Animated Medical Icons */
-.medical-icon {
-    color: var(--accent-primary) !important;
-    margin-right: 10px;
-    font-size: 1.3em;
-    transition: all 0.3s ease;
-    display: inline-block;
-}
-
-.medical-card:hover .medical-icon,
-.gradio-group:hover .medical-icon {
-    transform: scale(1.2) rotate(5deg);
-    filter: drop-shadow(0 4px 8px var(--glow-color));
-}
-
-/* Enhanced Audio Component */
-.gr-audio {
-    border: 2px solid var(--border-color) !important;
-    border-radius: 16px !important;
-    background: var(--white) !important;
-    color: var(--text-primary) !important;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    box-shadow: 0 4px 16px rgba(21, 101, 192, 0.08) !important;
-    width: 100% !important;
-    box-sizing: border-box !important;
-}
-
-/* Professional Responsive Input Fields */
-.gr-textbox,
-.gr-image {
-    background: var(--white) !important;
-    border: 2px solid var(--border-color) !important;
-    border-radius: 16px !important;
-    color: var(--text-primary) !important;
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    box-shadow: 0 4px 16px rgba(21, 101, 192, 0.08) !important;
-    width: 100% !important;
-    box-sizing: border-box !important;
-}
-
-.gr-textbox:focus-within,
-.gr-audio:focus-within,
-.gr-image:focus-within {
-    border-color: var(--primary-blue) !important;
-    box-shadow: 0 0 0 4px rgba(21, 101, 192, 0.15), 0 8px 24px rgba(21, 101, 192, 0.12) !important;
-    transform: translateY(-2px) !important;
-}
-
-/* Professional Responsive Typography */
-.gr-textbox label,
-.gr-audio label,
-.gr-image label {
-    color: var(--text-secondary) !important;
-    font-weight: 600 !important;
-    font-size: 15px !important;
-    margin-bottom: 10px !important;
-    line-height: 1.4 !important;
-}
-
-/* Responsive Typography */
-@media (min-width: 768px) {
-    .gr-textbox label,
-    .gr-audio label,
-    .gr-image label {
-        font-size: 14px !important;
-        margin-bottom: 8px !important;
-    }
-}
-
-/* Interactive Footer */
-.footer {
-    text-align: center;
-    margin-top: 30px;
-    padding: 24px;
-    background: var(--card-bg);
-    border-radius: 12px;
-    border-top: 3px solid var(--accent-blue);
-    box-shadow: 0 -4px 20px var(--shadow-color);
-    transition: all 0.3s ease;
-}
-
-.footer:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 -6px 25px var(--shadow-color);
-}
-
-.footer p {
-    color: var(--text-secondary) !important;
-    font-weight: 500 !important;
-    margin: 6px 0 !important;
-    font-size: 0.9em !important;
-    transition: color 0.3s ease !important;
-}
-
-.footer strong {
-    color: #ef4444 !important;
-    font-weight: 600 !important;
-}
-
-/* Responsive Container */
-.gradio-container {
-    background: transparent !important;
-    max-width: 100% !important;
-    width: 100% !important;
-    margin: 0 !important;
-    padding: 15px !important;
-    box-sizing: border-box !important;
-    position: relative !important;
-    z-index: 10 !important;
-    animation: fadeInUp 0.8s ease-out !important;
-}
-
-@media (min-width: 768px) {
-    .gradio-container {
-        padding: 25px !important;
-        max-width: 1200px !important;
-        margin: 0 auto !important;
-    }
-}
-
-@media (min-width: 1200px) {
-    .gradio-container {
-        max-width: 1400px !important;
-        padding: 30px !important;
-    }
-}
-
-/* Interactive Full-Screen Layout with Medical Background */
-body {
-    background: var(--bg-primary) !important;
-    margin: 0 !important;
-    padding: 0 !important;
-    min-height: 100vh !important;
-    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif !important;
-    overflow-x: hidden !important;
-    position: relative !important;
-}
-
-/* Animated Medical Background Elements */
-body::before {
-    content: '';
-    position: fixed;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    pointer-events: none;
-    z-index: 0;
-    background: 
-        radial-gradient(circle at 15% 20%, rgba(33, 150, 243, 0.03) 0%, transparent 50%),
-        radial-gradient(circle at 85% 80%, rgba(21, 101, 192, 0.02) 0%, transparent 50%),
-        radial-gradient(circle at 50% 50%, rgba(66, 165, 245, 0.015) 0%, transparent 70%);
-    animation: pulse 8s ease-in-out infinite;
-}
-
-/* Floating Medical Icons */
-body::after {
-    content: '🏥 💊 🩺 ❤️ 🧬 💉 🔬 📋';
-    position: fixed;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    font-size: 1.5em;
-    color: rgba(21, 101, 192, 0.05);
-    display: flex;
-    flex-wrap: wrap;
-    justify-content: space-around;
-    align-items: center;
-    pointer-events: none;
-    z-index: 1;
-    animation: float 12s ease-in-out infinite;
-}
-
-/* Mobile Touch Optimizations */
-@media (max-width: 767px) {
-    .gradio-container {
-        padding: 12px !important;
-    }
-    
-    .gr-group,
-    .gradio-group {
-        padding: 16px !important;
-        margin: 12px 0 !important;
-    }
-    
-    input, textarea {
-        font-size: 16px !important; /* Prevents zoom on iOS */
-        padding: 12px !important;
-    }
-    
-    /* Disable complex animations on mobile for performance */
-    .medical-icons, .wave-effect, .pattern-bg {
-        animation: none !important;
-    }
-}
-
-/* Modern Clean Layout */
-* {
-    font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-}
-"""
+# Built from static/medical_bot.css (minified, content-hashed, cached by browsers);
+# UI_THEME=lightweight serves the variant without costly effects
+stylesheet = build_stylesheet(os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "medical_bot.css"))
 
 # -------------------------------------------
 # EXACT SAME INTERFACE AS LOCAL VERSION
 # -------------------------------------------
-with gr.Blocks(css=custom_css, theme=gr.themes.Default(primary_hue="blue", secondary_hue="blue"), title="🏥 Medical AI Assistant") as demo:
+with gr.Blocks(theme=gr.themes.Default(primary_hue="blue", secondary_hue="blue"), title="🏥 Medical AI Assistant") as demo:
     
     # Interactive Medical Header with Animations (SAME AS LOCAL)
     header_html = gr.HTML("""
@@ -1007,7 +370,9 @@ with gr.Blocks(css=custom_css, theme=gr.themes.Default(primary_hue="blue", secon
                 voice_output = gr.Audio(
                     label="🎵 AI Doctor's Voice Response",
                     interactive=False,
-                    show_download_button=True
+                    show_download_button=True,
+                    streaming=STREAM_VOICE,
+                    autoplay=STREAM_VOICE
                 )
 
     # Enhanced Professional Footer with Additional Information (SAME AS LOCAL)
@@ -1023,17 +388,10 @@ with gr.Blocks(css=custom_css, theme=gr.themes.Default(primary_hue="blue", secon
         </div>
     """)
 
-    # Bind logic - Process text first, then voice (SAME AS LOCAL)
-    submit_btn.click(
-        fn=process_inputs,
-        inputs=[audio_input, image_input],
-        outputs=[symptoms_text, doctor_response, uploaded_image_display]
-    ).then(
-        fn=generate_voice_response,
-        inputs=[doctor_response],
-        outputs=[voice_output]
-    )
-    
+    # Bind logic - stream text and voice together, or process text first, then voice
+    bind_analysis(submit_btn, audio_input, image_input, symptoms_text, doctor_response, uploaded_image_display,
+                  voice_output)
+
     # Display uploaded image when file is selected
     image_input.change(
         fn=display_uploaded_image,
@@ -1047,14 +405,20 @@ with gr.Blocks(css=custom_css, theme=gr.themes.Default(primary_hue="blue", secon
         outputs=[audio_input, image_input, symptoms_text, doctor_response, voice_output, uploaded_image_display]
     )
     
+attach_stylesheet(demo, stylesheet)
+
+# FastAPI app settings for demo.launch(); the middleware serves the built stylesheet
+APP_KWARGS = {
+    "title": "AI Medical Assistant - Professional Healthcare Chatbot",
+    "middleware": stylesheet_middleware(stylesheet) + metrics_middleware(),
+}
+
+# Queue settings: bounded queue, LLM_CONCURRENCY as the default per-event limit
+demo.queue(default_concurrency_limit=LLM_CONCURRENCY, max_size=QUEUE_MAX_SIZE)
+
 # Run the app - Hugging Face Spaces Configuration
 if __name__ == "__main__":
-    demo.launch(
-        server_name="0.0.0.0",
-        server_port=7860,  # Default port for Hugging Face Spaces
-        share=False,  # Not needed on Spaces
-        debug=False,
-        show_error=True,
-        favicon_path=None,
-        app_kwargs={"title": "AI Medical Assistant - Professional Healthcare Chatbot"}
-    )
\ No newline at end of file
+    # Warm the TTS cache and local models in the background so startup is not delayed
+    start_prewarm()
+
+    demo.launch(**profile.launch_kwargs(), app_kwargs=dict(APP_KWARGS))
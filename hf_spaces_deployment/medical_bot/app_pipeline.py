@@ -0,0 +1,296 @@
+import asyncio
+import os
+import threading
+
+import gradio as gr
+
+from medical_bot.brain_of_the_doctor import encode_image_async, get_medical_response_async, stream_medical_response_async
+from medical_bot.config import get_profile
+from medical_bot.voice_of_the_patient import get_audio_text_async
+from medical_bot.voice_of_the_doctor import generate_audio, play_audio, prewarm_audio_cache, SentenceAudioPipeline
+from medical_bot.stt_backends import prewarm_local_model
+from medical_bot.tts_backends import prewarm_local_tts
+from medical_bot.session_limits import LLM_CONCURRENCY, TTS_CONCURRENCY, SessionLimiter, session_key
+from medical_bot.tracing import activate, start_trace
+
+# Diagnosis pipeline shared by both apps.
+# Medical_Bot_Enhanced.py and hf_spaces_deployment/app.py build the same interface
+# around the same event handlers: transcription and image encoding, the streamed
+# doctor response, the spoken answer, the per-session limit and the trace of each
+# analysis. The handlers live here; what differs between the deployments comes from
+# the deployment profile (medical_bot.config).
+
+# Stream LLM tokens into the doctor_response box as they arrive (set STREAM_RESPONSES=false to disable)
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "true").lower() not in ("0", "false", "no")
+# Speak the answer sentence by sentence while it streams (set STREAM_VOICE=false to synthesize it once at the end)
+STREAM_VOICE = os.environ.get("STREAM_VOICE", "true").lower() not in ("0", "false", "no")
+TTS_CACHE_PREWARM = os.environ.get("TTS_CACHE_PREWARM", "true").lower() not in ("0", "false", "no")
+
+# Fixed replies; their audio is pre-synthesized into the TTS cache at startup
+AVIF_NOT_SUPPORTED_RESPONSE = "I apologize, but AVIF image format is not currently supported. Please upload your medical image in JPG, PNG, GIF, or WebP format for analysis."
+UNREADABLE_IMAGE_RESPONSE = "I'm unable to process this image format. Please upload a medical image in JPG, PNG, GIF, or WebP format for analysis."
+AVIF_CONVERT_RESPONSE = "AVIF format is not supported. Please convert your image to JPG, PNG, GIF, or WebP format and try again."
+IMAGE_ERROR_RESPONSE = "I encountered an issue analyzing the image. Please try uploading a different image in a standard format (JPG, PNG, GIF, or WebP)."
+NO_IMAGE_RESPONSE = "No image provided for me to analyze. Please upload a medical image for visual diagnosis."
+NO_INPUT_RESPONSE = "Please provide either voice input describing your symptoms or upload a medical image for analysis."
+TEXT_ONLY_ERROR_RESPONSE = "I'm currently unable to process your request due to API limitations. Please try again in a moment or consult a healthcare professional for medical advice."
+# Appended when the answer stream breaks after part of it was shown
+STREAM_INTERRUPTED_NOTICE = " I'm sorry, my answer was cut short. Please try again or consult a healthcare professional for medical advice."
+CANNED_RESPONSES = [AVIF_NOT_SUPPORTED_RESPONSE, UNREADABLE_IMAGE_RESPONSE, AVIF_CONVERT_RESPONSE, IMAGE_ERROR_RESPONSE,
+                    NO_IMAGE_RESPONSE, NO_INPUT_RESPONSE, TEXT_ONLY_ERROR_RESPONSE]
+
+# In-flight analyses per browser session (MAX_REQUESTS_PER_USER)
+_session_limiter = SessionLimiter()
+
+system_prompt="""You have to act as a professional doctor, i know you are not but this is for learning purpose. 
+            What's in this image?. Do you find anything wrong with it medically? 
+            If you make a differential, suggest some remedies for them. Donot add any numbers or special characters in 
+            your response. Your response should be in one long paragraph. Also always answer as if you are answering to a real person.
+            Donot say 'In the image I see' but say 'With what I see, I think you have ....'
+            Dont respond as an AI model in markdown, your answer should mimic that of an actual doctor not an AI bot, 
+            Keep your answer concise (max 2 sentences). No preamble, start your answer right away please"""
+
+
+def build_query(speech_to_text_output):
+    return system_prompt + " " + speech_to_text_output if speech_to_text_output else system_prompt
+
+
+async def transcribe_patient_audio(audio_filepath):
+    # Short clips go to the local Whisper engine (STT_BACKEND), the rest to GROQ
+    if audio_filepath:
+        return await get_audio_text_async(audio_filepath)
+    return ""
+
+
+async def stream_doctor_response(query, encoded_image=None, image_file=None):
+    """
+    Yield the doctor response as it grows token by token.
+    Falls back to a single blocking call when streaming is disabled or fails before the first token.
+    """
+    response_text = ""
+    if STREAM_RESPONSES:
+        try:
+            async for delta in stream_medical_response_async(query, encoded_image):
+                response_text += delta
+                yield response_text
+        except Exception as e:
+            # Once text is on screen a retry would restart the answer, so only fall back before that;
+            # after that keep what was said and note that it was cut short
+            if response_text:
+                print(f"Streaming response interrupted: {e}")  # For debugging
+                yield response_text + STREAM_INTERRUPTED_NOTICE
+                return
+            print(f"Streaming unavailable, using blocking request: {e}")  # For debugging
+        if response_text:
+            return
+
+    yield await get_medical_response_async(
+        query, None if encoded_image is None else image_file, encoded_image=encoded_image
+    )
+
+
+async def process_inputs(audio_filepath, image_file):
+    """
+    Async diagnosis pipeline: transcription and image encoding run concurrently,
+    so a submission costs roughly max(STT, encode) + LLM instead of their sum.
+    Yields (transcript, doctor response so far, image) so the UI fills in as tokens arrive.
+    """
+    profile = get_profile()
+    image_filepath = None
+    encode_task = None
+    if image_file:
+        # Gradio hands over a path or a tempfile wrapper depending on the version
+        image_filepath = str(getattr(image_file, "name", image_file))
+        # Image encoding does not depend on the transcript, so start it right away
+        if not image_filepath.lower().endswith('.avif'):
+            encode_task = asyncio.ensure_future(encode_image_async(image_filepath))
+
+    try:
+        speech_to_text_output = await transcribe_patient_audio(audio_filepath)
+    except Exception:
+        if encode_task:
+            encode_task.cancel()
+        raise
+
+    # Handle the image input with enhanced error handling
+    if image_file:
+        try:
+            # Check if it's a supported format
+            if encode_task is None:
+                doctor_response = AVIF_NOT_SUPPORTED_RESPONSE
+                image_display = None
+            else:
+                try:
+                    encoded_image = await encode_task
+                except Exception as encode_error:
+                    if profile.image_required:
+                        raise
+                    # Fall back to text-only analysis
+                    print(f"Image encoding error: {encode_error}")  # For debugging
+                    encoded_image = None
+                image_display = image_filepath
+                # Show the transcript while the model is still thinking
+                yield speech_to_text_output, "", image_display
+                doctor_response = ""
+                async for doctor_response in stream_doctor_response(build_query(speech_to_text_output),
+                                                                    encoded_image, image_file):
+                    yield speech_to_text_output, doctor_response, image_display
+        except Exception as e:
+            # Handle any other image processing errors gracefully
+            print(f"Image processing error: {e}")  # For debugging
+            if "UnidentifiedImageError" in str(e) or "cannot identify image file" in str(e):
+                doctor_response = UNREADABLE_IMAGE_RESPONSE
+            elif "avif" in str(e).lower():
+                doctor_response = AVIF_CONVERT_RESPONSE
+            else:
+                doctor_response = IMAGE_ERROR_RESPONSE
+            image_display = None
+    elif profile.image_required:
+        doctor_response = NO_IMAGE_RESPONSE
+        image_display = None
+    elif speech_to_text_output and speech_to_text_output.strip():
+        # No image provided - analyze the speech only
+        image_display = None
+        yield speech_to_text_output, "", image_display
+        doctor_response = ""
+        try:
+            async for doctor_response in stream_doctor_response(build_query(speech_to_text_output)):
+                yield speech_to_text_output, doctor_response, image_display
+        except Exception as e:
+            print(f"Streaming response failed: {e}")  # For debugging
+            doctor_response = TEXT_ONLY_ERROR_RESPONSE
+    else:
+        # No input at all
+        doctor_response = NO_INPUT_RESPONSE
+        image_display = None
+
+    # Final state (voice will be generated separately)
+    yield speech_to_text_output, doctor_response, image_display
+
+
+async def process_inputs_with_voice(audio_filepath, image_file):
+    """
+    process_inputs plus pipelined speech: every completed sentence is synthesized while the
+    rest of the answer is still streaming, and its audio is pushed to the streaming voice_output
+    """
+    speaker = SentenceAudioPipeline()
+    outputs = ("", "", None)
+    try:
+        async for outputs in process_inputs(audio_filepath, image_file):
+            speaker.feed(outputs[1] or "")
+            yield (*outputs, None)
+            for audio_chunk in speaker.ready_chunks():
+                yield (*outputs, audio_chunk)
+
+        speaker.finish(outputs[1] or "")
+        async for audio_chunk in speaker.remaining_chunks():
+            yield (*outputs, audio_chunk)
+
+        if get_profile().play_audio:
+            # Also play the whole answer on this machine (queued, does not wait for playback)
+            try:
+                play_audio(await asyncio.to_thread(speaker.save_clip))
+            except Exception as e:
+                print(f"Server-side playback failed: {e}")  # For debugging
+    finally:
+        # Closed early (client gone, error, new submission): free the shared TTS workers
+        speaker.close()
+
+def limit_per_session(event_fn):
+    """Wrap an async-generator event so each session has at most MAX_REQUESTS_PER_USER in flight"""
+    async def analyze(audio_filepath, image_file, request: gr.Request):
+        key = session_key(request)
+        if not _session_limiter.try_acquire(key):
+            raise gr.Error("You already have an analysis in progress. Please wait for it to finish.")
+        # One trace per analysis: STT, image encode, LLM and TTS spans are logged together
+        trace = start_trace("diagnosis")
+        status = "abandoned"
+        try:
+            async for outputs in event_fn(audio_filepath, image_file):
+                yield outputs
+                # Gradio may resume the generator in another context
+                activate(trace)
+            status = "ok"
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            _session_limiter.release(key)
+            trace.finish(status=status, audio=bool(audio_filepath), image=bool(image_file))
+    return analyze
+
+
+def generate_voice_response(doctor_response):
+    """Generate voice response after text is displayed"""
+    if doctor_response and doctor_response.strip():
+        trace = start_trace("voice")
+        try:
+            # No output path: each request gets its own scratch file
+            voice_of_doctor = generate_audio(doctor_response)
+            if voice_of_doctor:
+                # Also play the answer on this machine when the profile asks for it (queued, does not wait)
+                play_audio(voice_of_doctor)
+            return voice_of_doctor
+        except Exception as e:
+            # Fallback if voice synthesis fails
+            print(f"Audio generation failed: {e}")  # For debugging
+            return None
+        finally:
+            trace.finish(chars=len(doctor_response))
+    return None
+
+
+def display_uploaded_image(image_file):
+    """Function to show uploaded image in the interface"""
+    if image_file:
+        # Gradio hands over a path or a tempfile wrapper depending on the version
+        return getattr(image_file, "name", image_file), gr.update(visible=True)
+    else:
+        return None, gr.update(visible=False)
+
+
+def bind_analysis(submit_btn, audio_input, image_input, symptoms_text, doctor_response, uploaded_image_display,
+                  voice_output):
+    """
+    Bind the analyze button - stream text and voice together, or process text first, then voice.
+    The LLM stage and the TTS stage run under separate concurrency limits;
+    trigger_mode="once" ignores repeat clicks while a submission is still running
+    """
+    if STREAM_VOICE:
+        submit_btn.click(
+            fn=limit_per_session(process_inputs_with_voice),
+            inputs=[audio_input, image_input],
+            outputs=[symptoms_text, doctor_response, uploaded_image_display, voice_output],
+            api_name="analyze",
+            concurrency_limit=LLM_CONCURRENCY,
+            concurrency_id="llm",
+            trigger_mode="once"
+        )
+    else:
+        submit_btn.click(
+            fn=limit_per_session(process_inputs),
+            inputs=[audio_input, image_input],
+            outputs=[symptoms_text, doctor_response, uploaded_image_display],
+            api_name="analyze",
+            concurrency_limit=LLM_CONCURRENCY,
+            concurrency_id="llm",
+            trigger_mode="once"
+        ).then(
+            fn=generate_voice_response,
+            inputs=[doctor_response],
+            outputs=[voice_output],
+            api_name="speak",
+            concurrency_limit=TTS_CONCURRENCY,
+            concurrency_id="tts"
+        )
+
+
+def start_prewarm():
+    """Warm caches and local models in the background so startup is not delayed"""
+    # Pre-synthesize the fixed replies into the TTS cache
+    if TTS_CACHE_PREWARM:
+        threading.Thread(target=prewarm_audio_cache, args=(CANNED_RESPONSES,), daemon=True).start()
+    # Load the local Whisper model (if installed) before the first recording arrives
+    threading.Thread(target=prewarm_local_model, daemon=True).start()
+    # Same for the Piper voice when the local TTS engine is configured
+    threading.Thread(target=prewarm_local_tts, daemon=True).start()
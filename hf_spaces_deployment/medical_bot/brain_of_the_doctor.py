@@ -0,0 +1,306 @@
+from dotenv import load_dotenv
+from medical_bot.groq_pool import get_async_groq_client, get_groq_client
+from concurrent.futures import ThreadPoolExecutor
+from medical_bot.byte_cache import ByteLRUCache
+from medical_bot.config import VISION_MODEL, get_profile
+from medical_bot.image_preprocessing import DEFAULT_CONFIG, preprocess_image_bytes
+from medical_bot.rate_limits import call_with_rate_limit, call_with_rate_limit_async, estimate_chat_tokens
+from medical_bot.response_cache import get_response_cache, response_cache_key
+from medical_bot.tracing import STAGE_ERRORS, bind, current_trace, record_span, span
+import asyncio
+import base64
+import hashlib
+import os
+import time
+
+#Step1: Setup GROQ API
+load_dotenv()
+GROQ_API_KEY=os.environ.get("GROQ_API_KEY")
+
+#Step2: Convert image to required format with better error handling
+# Encodings are cached by a hash of the file bytes, so resubmitting the same photo
+# with a new voice question skips all PIL work
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_image_cache = ByteLRUCache(IMAGE_CACHE_MAX_BYTES)
+
+def image_cache_stats():
+    """Hit/miss counters and size of the encoded image cache"""
+    return _image_cache.stats()
+
+def encode_image(image_path):
+    try:
+        with open(image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+    except Exception as e:
+        raise Exception(f"Cannot process image: {str(e)}")
+
+    # Include the preprocessing settings so changing them never serves stale encodings
+    cache_key = hashlib.sha256(image_bytes).hexdigest() + DEFAULT_CONFIG.cache_tag()
+    with span("image_encode", input_bytes=len(image_bytes)) as stage:
+        encoded_image = _image_cache.get(cache_key)
+        stage.set(cached=encoded_image is not None)
+        if encoded_image is None:
+            encoded_image = _encode_image_bytes(image_bytes)
+            _image_cache.put(cache_key, encoded_image)
+    return encoded_image
+
+def _encode_image_bytes(image_bytes):
+    try:
+        # Orient, downscale and re-encode as JPEG within the upload byte budget
+        return base64.b64encode(preprocess_image_bytes(image_bytes)).decode("utf-8")
+    except Exception:
+        # Fallback: send the file bytes as-is if PIL fails
+        return base64.b64encode(image_bytes).decode("utf-8")
+
+# Image decoding/re-encoding is CPU bound, so async callers run it on a small worker pool
+IMAGE_ENCODE_WORKERS = int(os.environ.get("IMAGE_ENCODE_WORKERS", "4"))
+_encode_executor = ThreadPoolExecutor(max_workers=IMAGE_ENCODE_WORKERS, thread_name_prefix="encode_image")
+
+async def encode_image_async(image_path):
+    """Run encode_image on the encode worker pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_encode_executor, bind(encode_image), image_path)
+
+#step3: Setup Multimodal API
+
+# The deployment profile picks the models used per request (vision, and text for questions without an image)
+model = VISION_MODEL
+query = "Is there something wrong with this skin condition?"
+
+def build_image_messages(query, encoded_image):
+    """Build the multimodal chat message for a text query plus a base64 JPEG"""
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text", 
+                    "text": query
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{encoded_image}",
+                    },
+                },
+            ],
+        }
+    ]
+
+def build_messages(query, encoded_image=None):
+    """Text-only message when there is no image, multimodal message otherwise"""
+    if encoded_image is None:
+        return [
+            {
+                "role": "user",
+                "content": query
+            }
+        ]
+    return build_image_messages(query, encoded_image)
+
+# Identical prompt + image + model returns the earlier answer without another LLM round trip
+_response_cache = get_response_cache()
+
+def response_cache_stats():
+    """Hit/miss counters of the diagnosis response cache"""
+    return _response_cache.stats()
+
+def _require_api_key():
+    groq_api_key = os.environ.get("GROQ_API_KEY")
+    if not groq_api_key:
+        raise Exception("GROQ API key not found")
+    return groq_api_key
+
+def chat_completion(query, model, encoded_image=None):
+    """Blocking GROQ chat completion served from the response cache when possible"""
+    cache_key = response_cache_key(query, model, encoded_image)
+    response = _response_cache.get(cache_key)
+    if response is None:
+        client = get_groq_client(api_key=_require_api_key())
+        messages = build_messages(query, encoded_image)
+        with span("llm", model=model, image=encoded_image is not None):
+            # Waits for the model's rate-limit budget and retries 429/5xx answers
+            completion = call_with_rate_limit(
+                model,
+                lambda: client.chat.completions.with_raw_response.create(messages=messages, model=model),
+                tokens=estimate_chat_tokens(messages)
+            )
+        response = completion.choices[0].message.content
+        _response_cache.put(cache_key, response)
+    else:
+        record_span("llm_cached", 0.0, model=model)
+    return response
+
+async def chat_completion_async(query, model, encoded_image=None):
+    """Async version of chat_completion"""
+    cache_key = response_cache_key(query, model, encoded_image)
+    response = _response_cache.get(cache_key)
+    if response is None:
+        client = get_async_groq_client(api_key=_require_api_key())
+        messages = build_messages(query, encoded_image)
+        with span("llm", model=model, image=encoded_image is not None):
+            completion = await call_with_rate_limit_async(
+                model,
+                lambda: client.chat.completions.with_raw_response.create(messages=messages, model=model),
+                tokens=estimate_chat_tokens(messages)
+            )
+        response = completion.choices[0].message.content
+        _response_cache.put(cache_key, response)
+    else:
+        record_span("llm_cached", 0.0, model=model)
+    return response
+
+async def stream_chat_completion_async(query, model, encoded_image=None):
+    """Yield response text as GROQ streams tokens back (a cached answer is yielded in one piece)"""
+    cache_key = response_cache_key(query, model, encoded_image)
+    response = _response_cache.get(cache_key)
+    if response is not None:
+        record_span("llm_cached", 0.0, model=model)
+        yield response
+        return
+
+    client = get_async_groq_client(api_key=_require_api_key())
+    messages = build_messages(query, encoded_image)
+    # Timed by hand rather than with span(): the consumer may stop iterating early,
+    # and the generator resumes in whatever context the consumer awaits from
+    trace = current_trace()
+    start = time.perf_counter()
+    pieces = []
+    # Stays set if the consumer stops iterating before the stream ends
+    outcome = {"abandoned": True}
+    try:
+        # Only opening the stream is rate limited and retried; a stream that breaks midway is not resent
+        stream = await call_with_rate_limit_async(
+            model,
+            lambda: client.chat.completions.with_raw_response.create(messages=messages, model=model, stream=True),
+            tokens=estimate_chat_tokens(messages)
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if not pieces:
+                        record_span("llm_first_token", time.perf_counter() - start, start, trace, model=model)
+                    pieces.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        finally:
+            # A consumer that stops early leaves the HTTP response open; closing it
+            # hands the connection back to the shared pool
+            await stream.close()
+    except Exception as e:
+        STAGE_ERRORS.inc("llm")
+        outcome = {"error": type(e).__name__}
+        raise
+    else:
+        outcome = {}
+    finally:
+        record_span("llm", time.perf_counter() - start, start, trace, model=model,
+                    image=encoded_image is not None, stream=True, chars=sum(map(len, pieces)),
+                    **outcome)
+    # Only complete answers are cached
+    if pieces:
+        _response_cache.put(cache_key, "".join(pieces))
+
+def analyze_image_with_query(query, model, encoded_image):
+    """Analyze image with query using GROQ multimodal API"""
+    try:
+        return chat_completion(query, model, encoded_image)
+    except Exception as e:
+        print(f"Image analysis error: {e}")
+        raise e
+
+async def analyze_image_with_query_async(query, model, encoded_image):
+    """Async version of analyze_image_with_query"""
+    try:
+        return await chat_completion_async(query, model, encoded_image)
+    except Exception as e:
+        print(f"Image analysis error: {e}")
+        raise e
+
+async def stream_image_analysis_async(query, model, encoded_image):
+    """Yield the multimodal response text piece by piece as GROQ streams tokens back"""
+    async for delta in stream_chat_completion_async(query, model, encoded_image):
+        yield delta
+
+def get_medical_response(query, image_file=None):
+    """
+    Main function to get medical analysis from symptoms and optional image
+    Falls back to a text-only answer when the image cannot be analyzed
+    """
+    try:
+        # Check if GROQ API key is available
+        groq_api_key = os.environ.get("GROQ_API_KEY")
+        if not groq_api_key:
+            return "API configuration error. Please contact support for assistance."
+        
+        if image_file:
+            # If image is provided, use multimodal analysis
+            try:
+                # Handle both local file paths and Gradio file objects
+                image_path = image_file.name if hasattr(image_file, 'name') else image_file
+                encoded_image = encode_image(image_path)
+                response = analyze_image_with_query(query, get_profile().vision_model, encoded_image)
+                return response
+            except Exception as img_error:
+                print(f"Image processing error: {img_error}")
+                # Fall back to text-only analysis if image fails
+                pass
+        
+        # Text-only analysis
+        try:
+            return chat_completion(query, get_profile().text_model)
+            
+        except Exception as api_error:
+            print(f"GROQ API error: {api_error}")
+            return f"I'm currently unable to process your request due to API limitations. Please try again in a moment or consult a healthcare professional for medical advice."
+        
+    except Exception as e:
+        error_msg = f"Error in medical analysis: {str(e)}"
+        print(error_msg)  # For debugging in Spaces logs
+        return "I apologize, but I'm experiencing technical difficulties. Please try again or consult a healthcare professional for medical advice."
+
+async def get_medical_response_async(query, image_file=None, encoded_image=None):
+    """
+    Async version of get_medical_response
+    Pass encoded_image when the image was already encoded concurrently with transcription
+    """
+    try:
+        groq_api_key = os.environ.get("GROQ_API_KEY")
+        if not groq_api_key:
+            return "API configuration error. Please contact support for assistance."
+
+        if image_file or encoded_image is not None:
+            try:
+                if encoded_image is None:
+                    image_path = image_file.name if hasattr(image_file, 'name') else image_file
+                    encoded_image = await encode_image_async(image_path)
+                return await analyze_image_with_query_async(query, get_profile().vision_model, encoded_image)
+            except Exception as img_error:
+                print(f"Image processing error: {img_error}")
+                # Fall back to text-only analysis if image fails
+                pass
+
+        # Text-only analysis
+        try:
+            return await chat_completion_async(query, get_profile().text_model)
+
+        except Exception as api_error:
+            print(f"GROQ API error: {api_error}")
+            return f"I'm currently unable to process your request due to API limitations. Please try again in a moment or consult a healthcare professional for medical advice."
+
+    except Exception as e:
+        error_msg = f"Error in medical analysis: {str(e)}"
+        print(error_msg)  # For debugging in Spaces logs
+        return "I apologize, but I'm experiencing technical difficulties. Please try again or consult a healthcare professional for medical advice."
+
+async def stream_medical_response_async(query, encoded_image=None):
+    """
+    Streaming version of get_medical_response_async
+    Errors propagate so the caller can fall back to the blocking path
+    """
+    if encoded_image is not None:
+        async for delta in stream_image_analysis_async(query, get_profile().vision_model, encoded_image):
+            yield delta
+        return
+
+    async for delta in stream_chat_completion_async(query, get_profile().text_model):
+        yield delta
\ No newline at end of file
@@ -0,0 +1,78 @@
+import os
+
+# Deployment profiles.
+# One backend serves both the local app (Medical_Bot_Enhanced.py) and the Hugging
+# Face Spaces app (hf_spaces_deployment/app.py). What differs between the two
+# deployments lives here instead of in two diverging copies of every module.
+#
+# DEPLOYMENT_PROFILE selects the profile ("local", "spaces" or "auto"); "auto" picks
+# "spaces" when running on Spaces (SPACE_ID is set there) and "local" otherwise.
+
+DEPLOYMENT_PROFILE = os.environ.get("DEPLOYMENT_PROFILE", "").lower()
+# Speak answers on the server's own speakers: "auto" follows the profile (on locally,
+# off on Spaces), "true"/"false" override it
+SERVER_PLAYBACK = os.environ.get("SERVER_PLAYBACK", "auto").lower()
+
+VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+
+class DeploymentProfile:
+    """Settings that differ between the local and the Spaces deployment"""
+
+    def __init__(self, name, text_model, vision_model=VISION_MODEL, microphone=False, play_audio=False,
+                 image_required=False, share=False, server_port=None):
+        self.name = name
+        # Model for questions without an image; GROQ_TEXT_MODEL / GROQ_VISION_MODEL override both profiles
+        self.text_model = os.environ.get("GROQ_TEXT_MODEL", text_model)
+        self.vision_model = os.environ.get("GROQ_VISION_MODEL", vision_model)
+        # A PyAudio microphone is attached (record_audio); on Spaces the browser records instead
+        self.microphone = microphone
+        # Also play the doctor's answer on the machine running the app
+        self.play_audio = play_audio if SERVER_PLAYBACK == "auto" else SERVER_PLAYBACK not in ("0", "false", "no")
+        # Only diagnose with an image; otherwise answer from the speech alone when there is none
+        # (or when it cannot be encoded)
+        self.image_required = image_required
+        self.share = share
+        self.server_port = server_port
+
+    def launch_kwargs(self):
+        """demo.launch() arguments for this deployment"""
+        return {
+            "server_name": "0.0.0.0",  # Accept connections from any IP
+            "server_port": self.server_port,
+            "share": self.share,
+            "debug": False,
+            "show_error": True,
+            "favicon_path": None,
+        }
+
+
+PROFILES = {
+    # Local development: public share link, auto-selected port
+    "local": lambda: DeploymentProfile("local", text_model=VISION_MODEL, microphone=True, play_audio=True,
+                                       image_required=True, share=True),
+    # Hugging Face Spaces: fixed port, text-only answers from a smaller model when there is no image
+    "spaces": lambda: DeploymentProfile("spaces", text_model="llama3-8b-8192", server_port=7860),
+}
+
+_active_profile = None
+
+
+def select_profile(default="auto"):
+    """
+    Activate the deployment profile (DEPLOYMENT_PROFILE, else default) and return it.
+    Apps call this before handling requests; the backend modules read it with get_profile().
+    """
+    global _active_profile
+    name = DEPLOYMENT_PROFILE or default
+    if name == "auto":
+        name = "spaces" if os.environ.get("SPACE_ID") else "local"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DEPLOYMENT_PROFILE {name!r}, expected one of: auto, {', '.join(PROFILES)}")
+    _active_profile = PROFILES[name]()
+    return _active_profile
+
+
+def get_profile():
+    """The active deployment profile (selected automatically on first use)"""
+    return _active_profile or select_profile()
@@ -0,0 +1,345 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+
+# Build step for the interface stylesheet.
+# The CSS lives in static/medical_bot.css instead of an inline Python string. At
+# startup it is deduplicated and minified once, named by a hash of its content and
+# served from memory with long-lived cache headers, so browsers download it once
+# and the page config no longer carries the whole stylesheet on every load.
+#
+# Gradio fetches theme stylesheets and scopes them exactly like Blocks(css=...),
+# so the asset is attached through demo.stylesheets rather than a <link> tag.
+#
+#     python -m medical_bot.css_assets static/medical_bot.css --out static/build
+
+# "full" keeps every effect; "lightweight" drops infinite animations, blur filters
+# and hover transforms for low-power clients
+UI_THEME = os.environ.get("UI_THEME", "full").lower()
+
+ASSET_PREFIX = "medical-assets/"
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# At-rules whose block holds rules rather than declarations
+_NESTED_AT_RULES = ("@media", "@supports", "@keyframes", "@-webkit-keyframes", "@document")
+_KEYFRAMES = ("@keyframes", "@-webkit-keyframes")
+
+# Clients that ask for less motion get the animations switched off even in the full theme
+_REDUCED_MOTION = ("@media (prefers-reduced-motion:reduce){*,*::before,*::after"
+                   "{animation:none!important;transition:none!important}}")
+
+
+class StylesheetAsset:
+    """A built stylesheet: minified text, content hash and the URL path it is served under"""
+
+    def __init__(self, name, content):
+        self.content = content.encode("utf-8")
+        self.gzipped = gzip.compress(self.content, compresslevel=9, mtime=0)
+        self.hash = hashlib.sha256(self.content).hexdigest()[:12]
+        self.filename = f"{name}.{self.hash}.css"
+        self.url = ASSET_PREFIX + self.filename
+
+
+def _split_top_level(text, separator):
+    """Split on separator outside parentheses and quotes (keeps url(data:...;...) intact)"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_css(css):
+    """
+    Parse CSS into a list of nodes:
+    ("statement", text) for @import/@charset, ("rule", selector, [declarations])
+    and ("block", prelude, [nodes]) for @media/@supports/@keyframes.
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    nodes, stack, buffer = [], [], ""
+    current = nodes
+    i = 0
+    while i < len(css):
+        ch = css[i]
+        if ch in "'\"":
+            end = css.index(ch, i + 1) + 1
+            buffer += css[i:end]
+            i = end
+            continue
+        if ch == ";" and buffer.strip().startswith("@"):
+            current.append(("statement", _squash(buffer) + ";"))
+            buffer = ""
+        elif ch == "{":
+            prelude = _squash(buffer)
+            buffer = ""
+            if prelude.startswith(_NESTED_AT_RULES):
+                children = []
+                current.append(("block", prelude, children))
+                stack.append(current)
+                current = children
+            else:
+                end, depth = i + 1, 1
+                while depth:
+                    if css[end] == "{":
+                        depth += 1
+                    elif css[end] == "}":
+                        depth -= 1
+                    end += 1
+                current.append(("rule", prelude, _parse_declarations(css[i + 1:end - 1])))
+                i = end
+                continue
+        elif ch == "}":
+            if stack:
+                current = stack.pop()
+            else:
+                # The browser treats a stray "}" as the start of the next rule's selector,
+                # which makes that rule invalid; drop it the same way
+                logging.warning("Stray '}' in stylesheet; the rule after it is ignored by browsers")
+                end = css.find("{", i)
+                if end == -1:
+                    break
+                i = _block_end(css, end)
+                buffer = ""
+                continue
+            buffer = ""
+        else:
+            buffer += ch
+        i += 1
+    return nodes
+
+
+def _block_end(css, start):
+    depth = 0
+    for i in range(start, len(css)):
+        if css[i] == "{":
+            depth += 1
+        elif css[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(css)
+
+
+def _squash(text):
+    """Collapse whitespace in a selector or at-rule prelude"""
+    text = re.sub(r"\s+", " ", text).strip()
+    if text.startswith("@"):
+        # "@media ( max-width: 768px )" -> "@media (max-width:768px)"
+        text = re.sub(r"\s*\)", ")", re.sub(r"\s*,\s*", ",", text))
+        return re.sub(r"\(\s*([\w-]+)\s*:\s*", r"(\1:", text)
+    # Spaces are significant around ":" (descendant vs pseudo-class), so only "," and ">" are tightened
+    return re.sub(r"\s*([,>])\s*", r"\1", text)
+
+
+def _parse_declarations(body):
+    declarations = []
+    for part in _split_top_level(body, ";"):
+        if ":" not in part:
+            continue
+        prop, value = part.split(":", 1)
+        prop = prop.strip()
+        if not prop.startswith("--"):
+            # Custom properties are case-sensitive, everything else is not
+            prop = prop.lower()
+        # Tighten the value, leaving quoted strings (e.g. content: 'a, b') untouched
+        value = "".join(piece if piece[:1] in "'\"" else re.sub(r"\s*,\s*", ",", re.sub(r"\s+", " ", piece))
+                        for piece in re.split(r"""('[^']*'|"[^"]*")""", value)).strip()
+        value = re.sub(r"\s*!\s*important$", "!important", value, flags=re.I)
+        declarations.append((prop, value))
+    # An identical repeat only restates the last one
+    return [d for i, d in enumerate(declarations) if d not in declarations[i + 1:]]
+
+
+def dedupe(nodes):
+    """
+    Remove rules that cannot affect the result: exact repeats of a later rule, keyframes
+    redefined later under the same name, and empty rules. Adjacent rules with the same
+    selector are merged.
+    """
+    for node in nodes:
+        if node[0] == "block":
+            node[2][:] = dedupe(node[2])
+    nodes = [n for n in nodes if not (n[0] == "rule" and not n[2]) and not (n[0] == "block" and not n[2])]
+
+    keep = []
+    for index, node in enumerate(nodes):
+        later = nodes[index + 1:]
+        if node[0] == "rule" and node in later:
+            continue
+        if node[0] == "block" and node[1].startswith(_KEYFRAMES) and any(
+                other[0] == "block" and other[1] == node[1] for other in later):
+            continue
+        keep.append(node)
+
+    merged = []
+    for node in keep:
+        if merged and node[0] == "rule" and merged[-1][0] == "rule" and merged[-1][1] == node[1]:
+            merged[-1] = ("rule", node[1], _parse_declarations(
+                ";".join(f"{p}:{v}" for p, v in merged[-1][2] + node[2])))
+        else:
+            merged.append(node)
+    return merged
+
+
+def _is_costly(selector, prop, value):
+    if prop in ("backdrop-filter", "-webkit-backdrop-filter"):
+        return True
+    if prop == "filter" and "blur(" in value:
+        return True
+    if prop in ("animation", "animation-iteration-count") and "infinite" in value:
+        return True
+    return prop == "transform" and ":hover" in selector
+
+
+def lighten(nodes):
+    """Lightweight theme: strip infinite animations, blur filters and hover transforms"""
+    def strip(nodes):
+        result = []
+        for node in nodes:
+            if node[0] == "rule":
+                declarations = [(p, v) for p, v in node[2] if not _is_costly(node[1], p, v)]
+                if declarations:
+                    result.append(("rule", node[1], declarations))
+            elif node[0] == "block" and not node[1].startswith(_KEYFRAMES):
+                children = strip(node[2])
+                if children:
+                    result.append(("block", node[1], children))
+            else:
+                result.append(node)
+        return result
+
+    nodes = strip(nodes)
+    used = " ".join(v for p, v in _declarations(nodes) if p in ("animation", "animation-name"))
+    used_names = set(re.findall(r"[\w-]+", used))
+    # Keyframes nothing animates any more are dead weight
+    return _drop_keyframes(nodes, used_names)
+
+
+def _declarations(nodes):
+    for node in nodes:
+        if node[0] == "rule":
+            yield from node[2]
+        elif node[0] == "block" and not node[1].startswith(_KEYFRAMES):
+            yield from _declarations(node[2])
+
+
+def _drop_keyframes(nodes, used_names):
+    result = []
+    for node in nodes:
+        if node[0] == "block" and node[1].startswith(_KEYFRAMES):
+            if node[1].split(" ", 1)[-1] not in used_names:
+                continue
+        elif node[0] == "block":
+            node = ("block", node[1], _drop_keyframes(node[2], used_names))
+        result.append(node)
+    return result
+
+
+def serialize(nodes):
+    out = []
+    for node in nodes:
+        if node[0] == "statement":
+            out.append(node[1])
+        elif node[0] == "rule":
+            out.append(node[1] + "{" + ";".join(f"{p}:{v}" for p, v in node[2]) + "}")
+        else:
+            out.append(node[1] + "{" + serialize(node[2]) + "}")
+    return "".join(out)
+
+
+def minify_css(css, lightweight=False):
+    nodes = dedupe(parse_css(css))
+    if lightweight:
+        nodes = lighten(nodes)
+    # @import has to stay ahead of every other rule
+    statements = [n for n in nodes if n[0] == "statement"]
+    return serialize(statements + [n for n in nodes if n[0] != "statement"])
+
+
+def build_stylesheet(source_path, theme=None):
+    """Minified, content-hashed StylesheetAsset for the CSS file at source_path"""
+    theme = (theme or UI_THEME).lower()
+    with open(source_path, encoding="utf-8") as f:
+        css = minify_css(f.read(), lightweight=theme == "lightweight")
+    if theme != "lightweight":
+        css += _REDUCED_MOTION
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    if theme == "lightweight":
+        name += ".lite"
+    return StylesheetAsset(name, css)
+
+
+def attach_stylesheet(demo, asset):
+    """Load the asset with the theme's stylesheets (Gradio scopes it like Blocks(css=...))"""
+    demo.stylesheets = list(demo.stylesheets) + [asset.url]
+
+
+class StylesheetMiddleware:
+    """ASGI middleware serving built stylesheets from memory with immutable cache headers"""
+
+    def __init__(self, app, assets):
+        self.app = app
+        self.assets = {"/" + asset.url: asset for asset in assets}
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        root = scope.get("root_path", "")
+        if root and path.startswith(root):
+            path = path[len(root):]
+        asset = self.assets.get(path) if scope["type"] == "http" else None
+        if asset is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = dict(scope.get("headers", []))
+        etag = f'"{asset.hash}"'.encode()
+        headers = [(b"content-type", b"text/css; charset=utf-8"), (b"cache-control", _CACHE_CONTROL.encode()),
+                   (b"etag", etag), (b"vary", b"accept-encoding")]
+        if request_headers.get(b"if-none-match") == etag:
+            status, body = 304, b""
+        else:
+            status, body = 200, asset.content
+            if b"gzip" in request_headers.get(b"accept-encoding", b""):
+                body = asset.gzipped
+                headers.append((b"content-encoding", b"gzip"))
+            headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope.get("method") == "HEAD" else body})
+
+
+def stylesheet_middleware(*assets):
+    """Value for demo.launch(app_kwargs={"middleware": ...})"""
+    from starlette.middleware import Middleware
+    return [Middleware(StylesheetMiddleware, assets=assets)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build minified, content-hashed stylesheets")
+    parser.add_argument("source", help="CSS source file, e.g. static/medical_bot.css")
+    parser.add_argument("--out", help="directory to write the built files to")
+    args = parser.parse_args()
+
+    source_bytes = os.path.getsize(args.source)
+    for theme in ("full", "lightweight"):
+        asset = build_stylesheet(args.source, theme)
+        print(f"{theme:<12} {asset.filename:<40} {source_bytes:>7} -> {len(asset.content):>7} bytes "
+              f"({len(asset.gzipped)} gzipped)")
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            with open(os.path.join(args.out, asset.filename), "wb") as f:
+                f.write(asset.content)
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Cache of model responses keyed on (normalized prompt, image content hash, model id).
+# Re-submitting the same question with the same image returns the earlier diagnosis
+# instead of paying for another LLM round trip.
+#
+# RESPONSE_CACHE_BACKEND selects the store: "memory" (default), "sqlite" or "none".
+
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", "response_cache.sqlite3")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace and case so cosmetic differences still hit the cache"""
+    return _WHITESPACE.sub(" ", prompt or "").strip().casefold()
+
+
+def response_cache_key(prompt, model, encoded_image=None):
+    """Cache key for a prompt, model id and optional base64 image"""
+    image_hash = hashlib.sha256(encoded_image.encode("utf-8")).hexdigest() if encoded_image else "-"
+    raw = "\x1f".join((normalize_prompt(prompt), image_hash, model))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.expired = 0
+
+    def as_dict(self, backend, entries):
+        lookups = self.hits + self.misses
+        return {
+            "backend": backend,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "expired": self.expired,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MemoryResponseCache:
+    """In-process LRU cache with a per-entry time to live"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.time():
+                del self._entries[key]
+                self._stats.expired += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            self._stats.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return self._stats.as_dict("memory", len(self._entries))
+
+
+class SQLiteResponseCache:
+    """On-disk cache that survives restarts; entries expire after ttl seconds"""
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._stats.expired += 1
+                row = None
+            if row is None:
+                self._stats.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._stats.hits += 1
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            # Drop expired rows, then the least recently used ones beyond the limit
+            self._db.execute("DELETE FROM responses WHERE expires < ?", (now,))
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+            self._stats.stores += 1
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return self._stats.as_dict("sqlite", entries)
+
+
+class NullResponseCache:
+    """Cache that never stores anything (RESPONSE_CACHE_BACKEND=none)"""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        pass
+
+    def stats(self):
+        return {"backend": "none"}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The process-wide response cache selected by RESPONSE_CACHE_BACKEND"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if RESPONSE_CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteResponseCache()
+                elif RESPONSE_CACHE_BACKEND in ("none", "off", "false"):
+                    _cache = NullResponseCache()
+                else:
+                    _cache = MemoryResponseCache()
+    return _cache
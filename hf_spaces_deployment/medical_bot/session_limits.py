@@ -0,0 +1,52 @@
+import os
+import threading
+
+# Concurrency settings for the Gradio queue.
+# The LLM stage (transcription + diagnosis) and the TTS stage get separate limits
+# so slow speech synthesis cannot starve diagnoses, and each browser session may
+# only have a bounded number of requests in flight so one user cannot fill the queue.
+
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+TTS_CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "4"))
+QUEUE_MAX_SIZE = int(os.environ.get("QUEUE_MAX_SIZE", "64"))
+MAX_REQUESTS_PER_USER = int(os.environ.get("MAX_REQUESTS_PER_USER", "1"))
+
+
+class SessionLimiter:
+    """Counts in-flight requests per session and refuses new ones beyond the limit"""
+
+    def __init__(self, max_per_session=MAX_REQUESTS_PER_USER):
+        self.max_per_session = max_per_session
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, session_key):
+        if self.max_per_session <= 0:
+            return True
+        with self._lock:
+            count = self._active.get(session_key, 0)
+            if count >= self.max_per_session:
+                return False
+            self._active[session_key] = count + 1
+            return True
+
+    def release(self, session_key):
+        if self.max_per_session <= 0:
+            return
+        with self._lock:
+            count = self._active.get(session_key, 0) - 1
+            if count > 0:
+                self._active[session_key] = count
+            else:
+                self._active.pop(session_key, None)
+
+
+def session_key(request):
+    """Identify the caller of a Gradio event (browser session, else client address)"""
+    if request is None:
+        return "anonymous"
+    session_hash = getattr(request, "session_hash", None)
+    if session_hash:
+        return session_hash
+    client = getattr(request, "client", None)
+    return getattr(client, "host", None) or "anonymous"
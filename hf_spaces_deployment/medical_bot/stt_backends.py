@@ -0,0 +1,435 @@
+import asyncio
+import io
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from medical_bot.audio_preprocessing import preprocess_audio, split_for_transcription
+
+from medical_bot.groq_pool import get_async_groq_client, get_groq_client
+from medical_bot.rate_limits import call_with_rate_limit, call_with_rate_limit_async
+from medical_bot.tracing import bind, span
+
+# Speech-to-text backends.
+# GroqTranscriber sends the recording to the hosted whisper-large-v3 endpoint.
+# LocalWhisperTranscriber runs a quantized faster-whisper (CTranslate2) model on the
+# CPU: the model is loaded once per process, and requests that arrive together are
+# stacked into one batch so concurrent users share a single encoder/decoder pass.
+#
+# STT_BACKEND selects the engine: "groq", "local" or "auto" (default). In auto mode
+# clips up to STT_LOCAL_MAX_SECONDS go to the local model when faster-whisper is
+# installed, everything else goes to GROQ.
+#
+# Transcribers accept either a file path or a (filename, bytes) pair, the form
+# preprocessed recordings are uploaded in.
+
+STT_BACKEND = os.environ.get("STT_BACKEND", "auto").lower()
+STT_LOCAL_MAX_SECONDS = float(os.environ.get("STT_LOCAL_MAX_SECONDS", "30"))
+GROQ_STT_MODEL = os.environ.get("GROQ_STT_MODEL", "whisper-large-v3")
+LOCAL_WHISPER_MODEL = os.environ.get("LOCAL_WHISPER_MODEL", "base.en")
+LOCAL_WHISPER_COMPUTE_TYPE = os.environ.get("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_CPU_THREADS = int(os.environ.get("LOCAL_WHISPER_CPU_THREADS", "0"))
+STT_BATCH_SIZE = int(os.environ.get("STT_BATCH_SIZE", "8"))
+STT_BATCH_WAIT_MS = float(os.environ.get("STT_BATCH_WAIT_MS", "10"))
+# Recordings longer than this are split at silences and the chunks transcribed concurrently
+STT_LONG_AUDIO_SECONDS = float(os.environ.get("STT_LONG_AUDIO_SECONDS", "45"))
+STT_CHUNK_WORKERS = int(os.environ.get("STT_CHUNK_WORKERS", "4"))
+# Longest run of words that can be repeated across a chunk boundary
+STT_MAX_OVERLAP_WORDS = int(os.environ.get("STT_MAX_OVERLAP_WORDS", "12"))
+
+
+def audio_duration(audio_filepath):
+    """Length of a recording in seconds without decoding it, or None if unknown"""
+    try:
+        if audio_filepath.lower().endswith(".wav"):
+            with wave.open(audio_filepath, "rb") as f:
+                return f.getnframes() / float(f.getframerate())
+        import av
+        with av.open(audio_filepath) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+    except Exception:
+        pass
+    return None
+
+
+@contextmanager
+def _upload_file(audio):
+    """File argument for the GROQ SDK: a (filename, bytes) pair as-is, a path opened for reading"""
+    if isinstance(audio, tuple):
+        yield audio
+    else:
+        with open(audio, "rb") as audio_file:
+            yield audio_file
+
+
+class GroqTranscriber:
+    """Transcription through the GROQ Whisper API"""
+
+    name = "groq"
+
+    def __init__(self, model=GROQ_STT_MODEL, api_key=None):
+        self.model = model
+        self.api_key = api_key
+
+    def _request(self, client, audio_file):
+        if hasattr(audio_file, "seek"):
+            # A retry uploads the whole file again
+            audio_file.seek(0)
+        return client.audio.transcriptions.with_raw_response.create(
+            model=self.model,
+            file=audio_file,
+            language="en"
+        )
+
+    def transcribe(self, audio):
+        client = get_groq_client(api_key=self.api_key)
+        with _upload_file(audio) as audio_file:
+            # Waits for the model's rate-limit budget and retries 429/5xx answers
+            transcription = call_with_rate_limit(self.model, lambda: self._request(client, audio_file))
+        return transcription.text
+
+    async def transcribe_async(self, audio):
+        client = get_async_groq_client(api_key=self.api_key)
+        with _upload_file(audio) as audio_file:
+            transcription = await call_with_rate_limit_async(self.model, lambda: self._request(client, audio_file))
+        return transcription.text
+
+
+class LocalWhisperTranscriber:
+    """
+    CPU transcription with a shared faster-whisper model and micro-batching.
+    transcribe() queues the clip; one worker thread collects up to batch_size clips
+    (waiting at most batch_wait_ms for more to arrive) and decodes them together.
+    """
+
+    name = "local"
+
+    def __init__(self, model_name=LOCAL_WHISPER_MODEL, compute_type=LOCAL_WHISPER_COMPUTE_TYPE,
+                 cpu_threads=LOCAL_WHISPER_CPU_THREADS, batch_size=STT_BATCH_SIZE, batch_wait_ms=STT_BATCH_WAIT_MS):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.load_error = None
+        self.batches = 0
+        self.clips = 0
+        self._model = None
+        self._tokenizer = None
+        self._load_lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+
+    @staticmethod
+    def installed():
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def available(self):
+        """True if faster-whisper is installed and the model has not failed to load"""
+        return self.load_error is None and self.installed()
+
+    def load(self):
+        """Load the model once (downloads it on first use); safe to call from several threads"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    try:
+                        from faster_whisper import WhisperModel
+                        from faster_whisper.tokenizer import Tokenizer
+                        model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type,
+                                             cpu_threads=self.cpu_threads)
+                        self._tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual,
+                                                    task="transcribe", language="en")
+                        self._model = model
+                        logging.info(f"Loaded local Whisper model {self.model_name} ({self.compute_type})")
+                    except Exception as e:
+                        self.load_error = e
+                        raise
+        return self._model
+
+    def submit(self, audio):
+        """Queue one clip for the batch worker and return a Future with its text"""
+        future = Future()
+        self._ensure_worker()
+        self._requests.put((audio, future))
+        return future
+
+    def transcribe(self, audio):
+        return self.submit(audio).result()
+
+    async def transcribe_async(self, audio):
+        return await asyncio.wrap_future(self.submit(audio))
+
+    def _ensure_worker(self):
+        with self._load_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._batch_loop, name="local_whisper", daemon=True)
+                self._worker.start()
+
+    def _take(self, timeout=None):
+        """Next clip whose caller is still waiting, or None once timeout has passed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                audio, future = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            # Marks the future running, so a caller cancelled from now on cannot
+            # invalidate it; clips whose caller already gave up are dropped here
+            if future.set_running_or_notify_cancel():
+                return audio, future
+
+    def _batch_loop(self):
+        while True:
+            try:
+                self._run_batch()
+            except Exception as e:
+                # The worker serves every later transcription, so it must not die
+                logging.exception(f"Local Whisper batch worker error: {e}")
+
+    def _run_batch(self):
+        batch = [self._take()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            item = self._take(timeout=deadline - time.monotonic())
+            if item is None:
+                break
+            batch.append(item)
+        try:
+            texts = self._transcribe_batch([audio for audio, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        # A clip that failed on its own only fails its own request
+        for (_, future), text in zip(batch, texts):
+            if isinstance(text, Exception):
+                future.set_exception(text)
+            else:
+                future.set_result(text)
+
+    def _transcribe_batch(self, clips):
+        """Text per clip, or the exception for a clip that could not be decoded"""
+        import numpy as np
+        from faster_whisper.audio import decode_audio, pad_or_trim
+
+        model = self.load()
+        extractor = model.feature_extractor
+        texts = [None] * len(clips)
+        short_clips, features = [], []
+        for i, clip in enumerate(clips):
+            try:
+                source = io.BytesIO(clip[1]) if isinstance(clip, tuple) else clip
+                audio = decode_audio(source, sampling_rate=extractor.sampling_rate)
+                if len(audio) > extractor.n_samples:
+                    # Longer than one 30 s Whisper window: let faster-whisper segment it on its own
+                    segments, _ = model.transcribe(audio, language="en", beam_size=1, vad_filter=True)
+                    texts[i] = " ".join(segment.text.strip() for segment in segments)
+                    continue
+                features.append(pad_or_trim(extractor(audio)))
+            except Exception as e:
+                # Leave this clip out of the batch; the others are still decoded together
+                texts[i] = e
+                continue
+            short_clips.append(i)
+
+        if short_clips:
+            # One encoder pass and one greedy decode for every short clip in the batch
+            encoder_output = model.encode(np.stack(features))
+            prompt = self._tokenizer.sot_sequence + [self._tokenizer.no_timestamps]
+            results = model.model.generate(
+                encoder_output,
+                [prompt] * len(short_clips),
+                beam_size=1,
+                max_length=model.max_length,
+                suppress_blank=True,
+            )
+            for i, result in zip(short_clips, results):
+                texts[i] = self._tokenizer.decode(result.sequences_ids[0]).strip()
+
+        self.batches += 1
+        self.clips += len(clips)
+        return texts
+
+    def stats(self):
+        return {
+            "model": self.model_name,
+            "loaded": self._model is not None,
+            "batches": self.batches,
+            "clips": self.clips,
+            "mean_batch_size": self.clips / self.batches if self.batches else 0.0,
+        }
+
+
+_groq_transcriber = GroqTranscriber()
+_local_transcriber = None
+_local_lock = threading.Lock()
+
+
+def get_local_transcriber():
+    """The process-wide local Whisper engine (the model itself loads on first use)"""
+    global _local_transcriber
+    if _local_transcriber is None:
+        with _local_lock:
+            if _local_transcriber is None:
+                _local_transcriber = LocalWhisperTranscriber()
+    return _local_transcriber
+
+
+def select_transcriber(audio_filepath, backend=None, duration=None):
+    """Pick the engine for one recording according to STT_BACKEND and the clip length"""
+    backend = (backend or STT_BACKEND).lower()
+    if backend == "groq":
+        return _groq_transcriber
+
+    local = get_local_transcriber()
+    if not local.available():
+        return _groq_transcriber
+    if backend == "local":
+        return local
+
+    if duration is None:
+        duration = audio_duration(audio_filepath)
+    if duration is not None and duration <= STT_LOCAL_MAX_SECONDS:
+        return local
+    return _groq_transcriber
+
+
+def _prepared_input(audio_filepath, prepared):
+    """What to hand the transcriber, and the clip length if preprocessing measured it"""
+    if prepared is None:
+        return audio_filepath, None
+    return prepared.as_upload(), prepared.duration
+
+
+def _is_long(prepared):
+    return prepared is not None and prepared.segment is not None and prepared.duration > STT_LONG_AUDIO_SECONDS
+
+
+_WORD_KEY = re.compile(r"[^\w']+")
+
+
+def merge_transcripts(texts, max_overlap_words=STT_MAX_OVERLAP_WORDS):
+    """
+    Join chunk transcripts in order, dropping words a chunk repeats from the end of the
+    previous one (chunks overlap in time, so the boundary words are heard twice).
+    Words are compared case- and punctuation-insensitively; the longest match wins.
+    """
+    merged = []
+    for text in texts:
+        words = (text or "").split()
+        if merged and words:
+            tail = [_WORD_KEY.sub("", w.lower()) for w in merged[-max_overlap_words:]]
+            head = [_WORD_KEY.sub("", w.lower()) for w in words[:max_overlap_words]]
+            for size in range(min(len(tail), len(head)), 0, -1):
+                if tail[-size:] == head[:size]:
+                    words = words[size:]
+                    break
+        merged.extend(words)
+    return " ".join(merged)
+
+
+def _transcribe_with_fallback(transcriber, audio):
+    with span("stt", backend=transcriber.name) as stage:
+        try:
+            return transcriber.transcribe(audio)
+        except Exception as e:
+            if transcriber is _groq_transcriber:
+                raise
+            logging.warning(f"Local transcription failed ({e}), using GROQ instead")
+            stage.set(backend=_groq_transcriber.name, fallback_from=transcriber.name)
+            return _groq_transcriber.transcribe(audio)
+
+
+async def _transcribe_with_fallback_async(transcriber, audio):
+    with span("stt", backend=transcriber.name) as stage:
+        try:
+            return await transcriber.transcribe_async(audio)
+        except Exception as e:
+            if transcriber is _groq_transcriber:
+                raise
+            logging.warning(f"Local transcription failed ({e}), using GROQ instead")
+            stage.set(backend=_groq_transcriber.name, fallback_from=transcriber.name)
+            return await _groq_transcriber.transcribe_async(audio)
+
+
+def transcribe_clip(audio, duration=None, backend=None):
+    """Transcribe an in-memory (filename, bytes) clip that needs no preprocessing"""
+    return _transcribe_with_fallback(select_transcriber(None, backend, duration), audio)
+
+
+# Shared by synchronous callers of the long-audio path
+_chunk_executor = ThreadPoolExecutor(max_workers=STT_CHUNK_WORKERS, thread_name_prefix="stt_chunk")
+
+
+def transcribe_long_audio(prepared, backend=None):
+    """Split a long recording at silences, transcribe the chunks in parallel and stitch the text"""
+    chunks = split_for_transcription(prepared)
+    futures = [
+        _chunk_executor.submit(bind(_transcribe_with_fallback),
+                               select_transcriber(None, backend, chunk.duration), chunk.as_upload())
+        for chunk in chunks
+    ]
+    return merge_transcripts([future.result() for future in futures])
+
+
+async def transcribe_long_audio_async(prepared, backend=None):
+    """Async version of transcribe_long_audio; at most STT_CHUNK_WORKERS chunks are in flight"""
+    chunks = await asyncio.to_thread(split_for_transcription, prepared)
+    limit = asyncio.Semaphore(STT_CHUNK_WORKERS)
+
+    async def transcribe_chunk(chunk):
+        async with limit:
+            transcriber = select_transcriber(None, backend, chunk.duration)
+            return await _transcribe_with_fallback_async(transcriber, chunk.as_upload())
+
+    texts = await asyncio.gather(*(transcribe_chunk(chunk) for chunk in chunks))
+    return merge_transcripts(texts)
+
+
+def transcribe_audio(audio_filepath, backend=None):
+    """
+    Preprocess the recording (trim, mono, 16 kHz, compact codec) and transcribe it with
+    the selected engine, falling back to GROQ if the local one fails.
+    Recordings longer than STT_LONG_AUDIO_SECONDS are transcribed in parallel chunks.
+    """
+    with span("audio_preprocess"):
+        prepared = preprocess_audio(audio_filepath)
+    if _is_long(prepared):
+        return transcribe_long_audio(prepared, backend)
+    audio, duration = _prepared_input(audio_filepath, prepared)
+    return _transcribe_with_fallback(select_transcriber(audio_filepath, backend, duration), audio)
+
+
+async def transcribe_audio_async(audio_filepath, backend=None):
+    """Async version of transcribe_audio"""
+    # Decoding and resampling are CPU work; keep them off the event loop
+    with span("audio_preprocess"):
+        prepared = await asyncio.to_thread(preprocess_audio, audio_filepath)
+    if _is_long(prepared):
+        return await transcribe_long_audio_async(prepared, backend)
+    audio, duration = _prepared_input(audio_filepath, prepared)
+    return await _transcribe_with_fallback_async(select_transcriber(audio_filepath, backend, duration), audio)
+
+
+def prewarm_local_model():
+    """Load the local model ahead of the first request when the local engine may be used"""
+    if STT_BACKEND in ("local", "auto") and LocalWhisperTranscriber.installed():
+        try:
+            get_local_transcriber().load()
+        except Exception as e:
+            logging.warning(f"Local Whisper model unavailable, transcribing with GROQ: {e}")
@@ -0,0 +1,484 @@
+import importlib.util
+import io
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import wave
+
+from medical_bot.tracing import Counter, bind, register
+
+# Text-to-speech engines.
+# ElevenLabsSynthesizer and GTTSSynthesizer call the hosted services and return MP3.
+# PiperSynthesizer runs a Piper ONNX voice on the CPU and returns WAV: voices are
+# loaded once per process into a pool of PIPER_WORKERS, so concurrent replies are
+# synthesized in parallel without reloading the model and without outbound calls.
+#
+# TTS_BACKEND selects the engine: "elevenlabs", "gtts", "local" or "auto" (default).
+# In auto mode the engines are tried in the order ElevenLabs, local, gTTS, and the
+# first one whose expected latency for the text fits TTS_LATENCY_BUDGET_MS is used
+# (the fastest one if none fits). Expected latency starts from per-engine priors and
+# is refitted from measured synthesis times. Engines that are not configured are
+# skipped, and a failed synthesis falls back to the next engine.
+#
+# synthesize_hedged() caps tail latency: if the chosen engine has not produced its
+# first bytes within TTS_HEDGE_AFTER_MS, the next engine is started as well, the
+# first one to finish wins and the other is cancelled.
+
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "auto").lower()
+# 0 disables budget-based selection (plain preference order)
+TTS_LATENCY_BUDGET_MS = float(os.environ.get("TTS_LATENCY_BUDGET_MS", "2000"))
+# Weight of the newest measurement in the latency model
+TTS_LATENCY_EWMA = float(os.environ.get("TTS_LATENCY_EWMA", "0.2"))
+# Path to a Piper .onnx voice (its .onnx.json config next to it); unset disables the local engine
+PIPER_VOICE = os.environ.get("PIPER_VOICE", "")
+PIPER_WORKERS = int(os.environ.get("PIPER_WORKERS", "2"))
+# 0 disables hedging (engines are only tried one after another on failure)
+TTS_HEDGE_AFTER_MS = float(os.environ.get("TTS_HEDGE_AFTER_MS", "1000"))
+
+# Voice settings shared by every ElevenLabs call (they are part of the TTS cache key)
+VOICE_ID = "O7p2vmz2iEYgMXxkbsif"
+OUTPUT_FORMAT = "mp3_22050_32"
+TTS_MODEL_ID = "eleven_turbo_v2"
+
+
+def elevenlabs_environment():
+    """API endpoint; ELEVENLABS_BASE_URL points the client at a proxy or a local stand-in (benchmarks)"""
+    from elevenlabs.environment import ElevenLabsEnvironment
+    base_url = os.environ.get("ELEVENLABS_BASE_URL")
+    if not base_url:
+        return ElevenLabsEnvironment.PRODUCTION
+    # Passed as an environment because the client's base_url argument always forces https
+    base_url = base_url.rstrip("/")
+    return ElevenLabsEnvironment(base=base_url, wss=re.sub(r"^http", "ws", base_url))
+
+
+# The ElevenLabs SDK takes over a second to import, so it is loaded on the first
+# synthesis instead of at startup; clients are shared per API key after that
+_elevenlabs_clients = {}
+_elevenlabs_lock = threading.Lock()
+
+
+def get_elevenlabs_client(api_key=None):
+    """Shared ElevenLabs client for api_key (default ELEVENLABS_API_KEY), created on first use"""
+    api_key = api_key or os.environ.get("ELEVENLABS_API_KEY")
+    client = _elevenlabs_clients.get(api_key)
+    if client is None:
+        with _elevenlabs_lock:
+            client = _elevenlabs_clients.get(api_key)
+            if client is None:
+                from elevenlabs import ElevenLabs
+                client = ElevenLabs(api_key=api_key, environment=elevenlabs_environment())
+                _elevenlabs_clients[api_key] = client
+    return client
+
+
+class SpeechEngine:
+    """
+    Base class of the TTS engines: synthesize(text) returns audio bytes in `extension` format.
+    Keeps a latency model, seconds = overhead + per_char * len(text), fitted by exponentially
+    weighted least squares over measured synthesis times and seeded with the class priors.
+    """
+
+    name = None
+    extension = "mp3"
+    # Priors until enough measurements arrive
+    prior_overhead = 0.0
+    prior_per_char = 0.0
+
+    def __init__(self):
+        self.samples = 0
+        # Exponentially weighted means of chars, seconds, chars^2 and chars*seconds
+        self._moments = None
+        self._stats_lock = threading.Lock()
+
+    def available(self):
+        return True
+
+    def cache_tag(self):
+        """(voice, model, format) part of the TTS cache key"""
+        raise NotImplementedError
+
+    def synthesize(self, text):
+        return b''.join(self.stream(text))
+
+    def stream(self, text):
+        """Yield the audio as it arrives (engines without streaming yield it in one piece)"""
+        yield self.synthesize(text)
+
+    def observe(self, chars, seconds):
+        """Feed one measured synthesis time into the latency model"""
+        point = (chars, seconds, chars * chars, chars * seconds)
+        with self._stats_lock:
+            if self._moments is None:
+                self._moments = list(point)
+            else:
+                self._moments = [m + TTS_LATENCY_EWMA * (v - m) for m, v in zip(self._moments, point)]
+            self.samples += 1
+
+    def expected_seconds(self, chars):
+        with self._stats_lock:
+            if self._moments is None:
+                return self.prior_overhead + self.prior_per_char * chars
+            mean_x, mean_y, mean_xx, mean_xy = self._moments
+        variance = mean_xx - mean_x * mean_x
+        if variance < 1.0:
+            # Every measurement had about the same length: keep the prior slope through the mean
+            slope = self.prior_per_char
+        else:
+            slope = max(0.0, (mean_xy - mean_x * mean_y) / variance)
+        return max(0.0, mean_y + slope * (chars - mean_x))
+
+    def stats(self):
+        return {"engine": self.name, "samples": self.samples,
+                "expected_ms_100_chars": round(self.expected_seconds(100) * 1000, 1)}
+
+
+class ElevenLabsSynthesizer(SpeechEngine):
+    """Synthesis through the ElevenLabs API"""
+
+    name = "elevenlabs"
+    prior_overhead = 0.4
+    prior_per_char = 0.004
+
+    def __init__(self, api_key=None):
+        super().__init__()
+        self.api_key = api_key
+
+    def available(self):
+        return bool(self.api_key or os.environ.get("ELEVENLABS_API_KEY"))
+
+    def cache_tag(self):
+        return VOICE_ID, TTS_MODEL_ID, OUTPUT_FORMAT
+
+    def stream(self, text):
+        yield from get_elevenlabs_client(self.api_key).text_to_speech.convert(
+            text=text,
+            voice_id=VOICE_ID,
+            output_format=OUTPUT_FORMAT,
+            model_id=TTS_MODEL_ID
+        )
+
+
+class GTTSSynthesizer(SpeechEngine):
+    """Synthesis through Google Translate's TTS endpoint (gTTS); one request per ~100 characters"""
+
+    name = "gtts"
+    prior_overhead = 0.6
+    prior_per_char = 0.01
+
+    def available(self):
+        return importlib.util.find_spec("gtts") is not None
+
+    def cache_tag(self):
+        return "en", "gtts", "mp3"
+
+    def stream(self, text):
+        from gtts import gTTS
+        # One MP3 piece per text part, as each request returns
+        yield from gTTS(text=text, lang='en', slow=False).stream()
+
+
+class PiperSynthesizer(SpeechEngine):
+    """
+    CPU synthesis with Piper ONNX voices.
+    Up to `workers` copies of the voice are loaded on demand and checked out one per
+    request, so each ONNX session serves one synthesis at a time.
+    """
+
+    name = "local"
+    extension = "wav"
+    prior_overhead = 0.02
+    prior_per_char = 0.004
+
+    def __init__(self, voice_path=PIPER_VOICE, workers=PIPER_WORKERS):
+        super().__init__()
+        self.voice_path = voice_path
+        self.workers = max(1, workers)
+        self.load_error = None
+        self._idle = queue.Queue()
+        self._loaded = 0
+        self._load_lock = threading.Lock()
+
+    @staticmethod
+    def installed():
+        return importlib.util.find_spec("piper") is not None
+
+    def available(self):
+        """True if a voice is configured, piper-tts is installed and loading has not failed"""
+        return (self.load_error is None and bool(self.voice_path) and os.path.exists(self.voice_path)
+                and self.installed())
+
+    def cache_tag(self):
+        return os.path.basename(self.voice_path), "piper", "wav"
+
+    def _load_voice(self):
+        from piper import PiperVoice
+        voice = PiperVoice.load(self.voice_path)
+        logging.info(f"Loaded Piper voice {self.voice_path} ({self._loaded}/{self.workers})")
+        return voice
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._load_lock:
+            grow = self._loaded < self.workers
+            if grow:
+                self._loaded += 1
+        if not grow:
+            # Every voice is busy: wait for one to be returned
+            return self._idle.get()
+        try:
+            return self._load_voice()
+        except Exception as e:
+            with self._load_lock:
+                self._loaded -= 1
+            self.load_error = e
+            raise
+
+    def load(self):
+        """Load one voice ahead of the first request"""
+        self._idle.put(self._checkout())
+
+    def synthesize(self, text):
+        voice = self._checkout()
+        try:
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as wav_file:
+                if hasattr(voice, "synthesize_wav"):
+                    voice.synthesize_wav(text, wav_file)  # piper-tts 1.3+
+                else:
+                    voice.synthesize(text, wav_file)
+            return buffer.getvalue()
+        finally:
+            self._idle.put(voice)
+
+    def stats(self):
+        return {**super().stats(), "voice": self.voice_path, "loaded": self._loaded}
+
+
+_engines = {
+    "elevenlabs": ElevenLabsSynthesizer(),
+    "local": PiperSynthesizer(),
+    "gtts": GTTSSynthesizer(),
+}
+# Auto-mode preference: best voice quality first
+ENGINE_ORDER = ("elevenlabs", "local", "gtts")
+
+
+def get_tts_engine(name):
+    """The process-wide engine called name ("elevenlabs", "local" or "gtts")"""
+    return _engines[name]
+
+
+def select_tts_engines(text, backend=None, budget_ms=None):
+    """
+    Engines to try for text, best first, according to TTS_BACKEND and the latency budget.
+    The rest of the available engines follow as fallbacks.
+    """
+    backend = (backend or TTS_BACKEND).lower()
+    budget_ms = TTS_LATENCY_BUDGET_MS if budget_ms is None else budget_ms
+    engines = [_engines[name] for name in ENGINE_ORDER if _engines[name].available()]
+    if not engines:
+        return []
+
+    chosen = _engines.get(backend)
+    if chosen not in engines:
+        chars = len(text)
+        within = [engine for engine in engines
+                  if not budget_ms or engine.expected_seconds(chars) * 1000 <= budget_ms]
+        chosen = within[0] if within else min(engines, key=lambda engine: engine.expected_seconds(chars))
+    return [chosen] + [engine for engine in engines if engine is not chosen]
+
+
+TTS_WINS = register(Counter("medical_bot_tts_wins_total", "Syntheses completed, by the engine that delivered them",
+                            "engine"))
+TTS_HEDGES = register(Counter("medical_bot_tts_hedges_total",
+                              "Syntheses hedged because this engine was slow to start", "engine"))
+
+
+class _Attempt:
+    """One engine synthesizing the text on its own thread; cancel() stops it between chunks"""
+
+    def __init__(self, engine, text, changed):
+        self.engine = engine
+        self.text = text
+        self.changed = changed
+        self.chunks = []
+        self.error = None
+        self.finished = False
+        self.cancelled = False
+        self.start = time.perf_counter()
+        threading.Thread(target=bind(self._run), name=f"tts_{engine.name}", daemon=True).start()
+
+    @property
+    def started_audio(self):
+        return bool(self.chunks)
+
+    @property
+    def succeeded(self):
+        return self.finished and self.error is None and not self.cancelled and bool(self.chunks)
+
+    def _run(self):
+        stream = self.engine.stream(self.text)
+        try:
+            for chunk in stream:
+                if self.cancelled:
+                    break
+                if chunk:
+                    with self.changed:
+                        self.chunks.append(chunk)
+                        self.changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            # Closing the generator also closes the engine's HTTP response
+            stream.close()
+            with self.changed:
+                self.finished = True
+                self.changed.notify_all()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+class HedgedSynthesis:
+    """
+    Races the engines for one text. engines[0] starts right away; if no engine has produced
+    audio within hedge_after_ms the next one is started as well, and a failed engine is
+    replaced by the next one. Losers are cancelled; an elapsed time longer than their latency
+    model expects is fed to it, so budget-based selection learns to avoid slow engines.
+
+    result() waits for the first engine to finish; stream() commits to the first engine
+    that produces audio and yields its chunks as they arrive.
+    """
+
+    def __init__(self, text, engines, hedge_after_ms=None):
+        if not engines:
+            raise RuntimeError("No text-to-speech engine available")
+        self.text = text
+        self.hedge_after = (TTS_HEDGE_AFTER_MS if hedge_after_ms is None else hedge_after_ms) / 1000.0
+        self.remaining = list(engines)
+        self.changed = threading.Condition()
+        self.attempts = []
+        self.hedged = False
+        self.winner = None
+        with self.changed:
+            self._launch()
+
+    @property
+    def engine(self):
+        return self.winner.engine if self.winner else None
+
+    def _launch(self):
+        self.attempts.append(_Attempt(self.remaining.pop(0), self.text, self.changed))
+        self.deadline = time.monotonic() + self.hedge_after
+
+    def _wait_for(self, is_winner):
+        """Wait (holding self.changed) until an attempt satisfies is_winner, hedging and falling back meanwhile"""
+        while True:
+            winner = next((a for a in self.attempts if is_winner(a)), None)
+            if winner is not None:
+                return winner
+            running = [a for a in self.attempts if not a.finished]
+            if not running:
+                failed = self.attempts[-1]
+                if not self.remaining:
+                    raise failed.error or RuntimeError(f"{failed.engine.name} returned no audio")
+                logging.warning(f"{failed.engine.name} synthesis failed ({failed.error}), "
+                                f"trying {self.remaining[0].name}")
+                self._launch()
+                continue
+            can_hedge = self.hedge_after > 0 and self.remaining and not self.hedged
+            if can_hedge and not any(a.started_audio for a in running):
+                timeout = self.deadline - time.monotonic()
+                if timeout <= 0:
+                    self.hedged = True
+                    TTS_HEDGES.inc(running[0].engine.name)
+                    self._launch()
+                    continue
+                self.changed.wait(timeout)
+            else:
+                self.changed.wait()
+
+    def _settle(self, winner):
+        self.winner = winner
+        chars = len(self.text)
+        TTS_WINS.inc(winner.engine.name)
+        for attempt in self.attempts:
+            if attempt is not winner and not attempt.finished:
+                attempt.cancelled = True
+                # A loser's elapsed time only says it would have taken at least that long
+                # (a hedge cut short right after launch says almost nothing), so it is
+                # recorded only when it exceeds what the model already expects
+                elapsed = attempt.elapsed()
+                if elapsed > attempt.engine.expected_seconds(chars):
+                    attempt.engine.observe(chars, elapsed)
+
+    def result(self):
+        """(engine, audio bytes) of the first engine to finish"""
+        with self.changed:
+            winner = self._wait_for(lambda a: a.succeeded)
+            self._settle(winner)
+        winner.engine.observe(len(self.text), winner.elapsed())
+        return winner.engine, b''.join(winner.chunks)
+
+    def stream(self):
+        """Yield audio chunks of the first engine to produce any, as they arrive"""
+        with self.changed:
+            winner = self._wait_for(lambda a: a.started_audio)
+            self._settle(winner)
+        sent = 0
+        try:
+            while True:
+                with self.changed:
+                    while sent == len(winner.chunks) and not winner.finished:
+                        self.changed.wait()
+                    chunks = winner.chunks[sent:]
+                    sent += len(chunks)
+                    done = winner.finished and sent == len(winner.chunks)
+                for chunk in chunks:
+                    yield chunk
+                if done:
+                    break
+        except GeneratorExit:
+            # The consumer no longer wants this audio (e.g. the text was replaced)
+            winner.cancelled = True
+            raise
+        if winner.error is not None:
+            # Part of the audio is already out, so another engine cannot take over
+            raise winner.error
+        winner.engine.observe(len(self.text), winner.elapsed())
+
+    def audio(self):
+        """Complete audio of the winner once stream() is exhausted"""
+        return b''.join(self.winner.chunks)
+
+
+def synthesize_hedged(text, engines, hedge_after_ms=None):
+    """
+    Synthesize text with engines[0], hedged with the next engine after hedge_after_ms
+    (see HedgedSynthesis). Returns (engine, audio, hedged) or raises the last engine's error.
+    """
+    synthesis = HedgedSynthesis(text, engines, hedge_after_ms)
+    engine, audio = synthesis.result()
+    return engine, audio, synthesis.hedged
+
+
+def prewarm_local_tts():
+    """Load the Piper voice ahead of the first reply when the local engine may be used"""
+    engine = _engines["local"]
+    if TTS_BACKEND in ("local", "auto") and engine.available():
+        try:
+            engine.load()
+        except Exception as e:
+            logging.warning(f"Piper voice unavailable, using the hosted TTS engines: {e}")
+
+
+def tts_engine_stats():
+    """Latency model state of every engine"""
+    return [engine.stats() for engine in _engines.values()]
@@ -0,0 +1,457 @@
+import asyncio
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from medical_bot.config import get_profile
+from medical_bot.playback import get_audio_player
+from medical_bot.tts_cache import get_tts_cache, tts_cache_key
+from medical_bot.scratch_files import get_scratch_manager
+from medical_bot.session_limits import TTS_CONCURRENCY
+from medical_bot.tracing import bind, record_span, span
+from medical_bot.tts_backends import (ElevenLabsSynthesizer, HedgedSynthesis, get_elevenlabs_client, get_tts_engine,
+                                      select_tts_engines, synthesize_hedged)
+
+load_dotenv()
+
+#Step1a: Setup Text to Speech–TTS–model with gTTS
+
+def text_to_speech_with_gtts_old(input_text, output_filepath):
+    from gtts import gTTS
+    language="en"
+
+    audioobj= gTTS(
+        text=input_text,
+        lang=language,
+        slow=False
+    )
+    audioobj.save(output_filepath)
+
+
+input_text="Hi this is Ai with Hassan!"
+#text_to_speech_with_gtts_old(input_text=input_text, output_filepath="gtts_testing.mp3")
+
+#Step1b: Setup Text to Speech–TTS–model with ElevenLabs
+
+ELEVENLABS_API_KEY=os.environ.get("ELEVENLABS_API_KEY")
+
+def __getattr__(name):
+    # Keeps voice_of_the_doctor.client working without building it at import time
+    if name == "client":
+        return get_elevenlabs_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def text_to_speech_with_elevenlabs_old(input_text, output_filepath):
+ 
+    audio=get_elevenlabs_client().text_to_speech.convert(
+        text= input_text,
+        voice_id = "O7p2vmz2iEYgMXxkbsif",
+        output_format= "mp3_22050_32",
+        model_id = "eleven_turbo_v2"
+    )
+    with open(output_filepath, "wb") as f:
+        for chunk in audio:
+            f.write(chunk)
+
+#text_to_speech_with_elevenlabs_old(input_text, output_filepath="elevenlabs_testing.mp3") 
+
+#Step2: Use Model for Text output to Voice
+
+
+# Synthesized audio is cached on disk by (text, voice, model, format, engine)
+_tts_cache = get_tts_cache()
+
+def _cache_lookup(engine, input_text):
+    """(cache key, cached path or None) of input_text spoken by engine"""
+    key = tts_cache_key(input_text, *engine.cache_tag(), engine.name)
+    path = _tts_cache.get_path(key, engine.extension)
+    if path is not None:
+        record_span("tts_cached", 0.0, engine=engine.name)
+    return key, path
+
+def _cache_store(engine, key, audio):
+    with span("file_write", target="tts_cache", bytes=len(audio)):
+        return _tts_cache.put_bytes(key, audio, engine.extension)
+
+def engine_audio_path(engine, input_text):
+    """Synthesize with engine (or reuse the cached file) and return the cached file path"""
+    key, path = _cache_lookup(engine, input_text)
+    if path is None:
+        start = time.perf_counter()
+        with span("tts", engine=engine.name, chars=len(input_text)):
+            audio = engine.synthesize(input_text)
+        engine.observe(len(input_text), time.perf_counter() - start)
+        path = _cache_store(engine, key, audio)
+    return path
+
+def elevenlabs_audio_path(input_text, api_key=None):
+    """Synthesize with ElevenLabs (or reuse the cached MP3) and return the cached file path"""
+    engine = get_tts_engine("elevenlabs")
+    if api_key and api_key != os.environ.get("ELEVENLABS_API_KEY"):
+        engine = ElevenLabsSynthesizer(api_key)
+    return engine_audio_path(engine, input_text)
+
+def gtts_audio_path(input_text):
+    """Synthesize with gTTS (or reuse the cached MP3) and return the cached file path"""
+    return engine_audio_path(get_tts_engine("gtts"), input_text)
+
+# Unique per-request output files, so concurrent users never overwrite each other's audio
+_scratch = get_scratch_manager()
+
+def request_audio_file(cached_path, output_filepath=None):
+    """Give the caller its own copy of a cached audio file: output_filepath if given, else a unique scratch file"""
+    if output_filepath:
+        with span("file_write", target="output"):
+            shutil.copyfile(cached_path, output_filepath)
+        return output_filepath
+    with span("file_write", target="scratch"):
+        path = _scratch.adopt(cached_path, suffix=os.path.splitext(cached_path)[1] or ".mp3")
+    # Released once the caller has the path; the sweeper still leaves it alone for
+    # SCRATCH_MIN_AGE, long enough for Gradio to serve it, and removes it after SCRATCH_MAX_AGE
+    _scratch.release(path)
+    return path
+
+def play_audio(output_filepath):
+    """
+    Queue output_filepath for playback on this machine and return right away.
+    Only when the deployment profile plays audio (not on Spaces, see SERVER_PLAYBACK).
+    """
+    if not output_filepath or not get_profile().play_audio:
+        return False
+    get_audio_player().play(output_filepath)
+    return True
+
+
+def text_to_speech_with_gtts(input_text, output_filepath=None):
+    output_filepath = request_audio_file(gtts_audio_path(input_text), output_filepath)
+    play_audio(output_filepath)
+    return output_filepath
+
+
+input_text="Hi this is Ai with Hassan, autoplay testing!"
+#text_to_speech_with_gtts(input_text=input_text, output_filepath="gtts_testing_autoplay.mp3")
+
+
+def text_to_speech_with_elevenlabs(input_text, output_filepath=None):
+    output_filepath = request_audio_file(elevenlabs_audio_path(input_text), output_filepath)
+    play_audio(output_filepath)
+    return output_filepath
+
+def cached_audio_path(text_response, engines=None):
+    """
+    Path of the cached audio file (MP3, or WAV from the local engine) for text_response, or None
+    Uses the engine picked by TTS_BACKEND and the latency budget; a slow engine is hedged
+    with the next one after TTS_HEDGE_AFTER_MS and a failed one falls back to the next
+    """
+    if not text_response or text_response.strip() == "":
+        return None
+    if engines is None:
+        engines = select_tts_engines(text_response)
+    if not engines:
+        print("No text-to-speech engine available (set ELEVENLABS_API_KEY or PIPER_VOICE, or install gTTS)")
+        return None
+    key, path = _cache_lookup(engines[0], text_response)
+    if path is not None:
+        return path
+    try:
+        # No autoplay; callers play it if they want to
+        with span("tts", engine=engines[0].name, chars=len(text_response)) as stage:
+            engine, audio, hedged = synthesize_hedged(text_response, engines)
+            stage.set(engine=engine.name, hedged=hedged)
+    except Exception as e:
+        print(f"Audio generation error: {e}")  # Shows up in the app / Spaces logs
+        return None
+    if engine is not engines[0]:
+        key = tts_cache_key(text_response, *engine.cache_tag(), engine.name)
+    return _cache_store(engine, key, audio)
+
+def generate_audio(text_response):
+    """
+    Main function to generate audio from text response
+    Returns a per-request audio file path for Gradio to serve, or None
+    """
+    path = cached_audio_path(text_response)
+    # Each request gets its own scratch file for Gradio to serve
+    return request_audio_file(path) if path else None
+
+#text_to_speech_with_elevenlabs(input_text, output_filepath="elevenlabs_testing_autoplay.mp3")
+
+def synthesize_speech_bytes(text_response, engines=None):
+    """
+    Synthesize one piece of text to audio bytes (MP3, or WAV from the local engine)
+    engines limits and orders the engines tried (default: selected per text)
+    """
+    path = cached_audio_path(text_response, engines)
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+# Cache writes of streamed speech happen after the audio is out, off the request path
+_cache_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts_cache_write")
+
+def stream_speech(text_response, engines=None):
+    """
+    Yield the audio for text_response as it arrives from the engine, without waiting for
+    the whole clip (a cached clip is yielded in one piece). The complete clip is written
+    to the TTS cache in the background afterwards.
+    """
+    if not text_response or text_response.strip() == "":
+        return
+    if engines is None:
+        engines = select_tts_engines(text_response)
+    if not engines:
+        print("No text-to-speech engine available (set ELEVENLABS_API_KEY or PIPER_VOICE, or install gTTS)")
+        return
+    key, path = _cache_lookup(engines[0], text_response)
+    if path is not None:
+        with open(path, "rb") as f:
+            yield f.read()
+        return
+
+    synthesis = HedgedSynthesis(text_response, engines)
+    start = time.perf_counter()
+    first_audio = None
+    for chunk in synthesis.stream():
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+            record_span("tts_first_audio", first_audio, start, engine=synthesis.engine.name)
+        yield chunk
+    record_span("tts", time.perf_counter() - start, start, engine=synthesis.engine.name,
+                chars=len(text_response), hedged=synthesis.hedged, stream=True)
+    if synthesis.engine is not engines[0]:
+        key = tts_cache_key(text_response, *synthesis.engine.cache_tag(), synthesis.engine.name)
+    _cache_writer.submit(bind(_cache_store), synthesis.engine, key, synthesis.audio())
+
+def prewarm_audio_cache(texts):
+    """
+    Synthesize fixed messages ahead of time so they are served from the TTS cache.
+    Whole messages and their individual sentences are both warmed, matching the
+    blocking and the sentence-streaming voice paths.
+    """
+    for text in texts:
+        for piece in [text] + SENTENCE_END.split(text):
+            if piece.strip():
+                cached_audio_path(piece.strip())
+
+
+#Step3: Sentence-level streaming synthesis
+# Speak each sentence as soon as the streamed doctor response completes it,
+# instead of waiting for the whole answer and then synthesizing it in one call.
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+# Streamed voice is synthesized inside the "llm" queue event, so the "tts" queue limit never
+# applies to it; this pool, shared by all sessions, holds it to the same TTS_CONCURRENCY instead
+_tts_executor = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts_stream")
+
+def _stream_chunk(audio, first):
+    """
+    One piece of the voice stream. MP3 frames concatenate as they are; WAV pieces are
+    joined into one open-ended WAV stream the way Gradio streams WAV files: the first
+    keeps its header with the lengths set to "unknown", later ones drop theirs.
+    """
+    if audio[:4] != b"RIFF":
+        return audio
+    data = audio.find(b"data", 12)
+    if data < 0:
+        return audio
+    if not first:
+        return audio[data + 8:]
+    return audio[:4] + b"\xff\xff\xff\xff" + audio[8:data + 4] + b"\xff\xff\xff\xff" + audio[data + 8:]
+
+def _complete_wav(audio):
+    """Write the real lengths into the header of an open-ended WAV stream, so file players accept it"""
+    data = audio.find(b"data", 12)
+    if data < 0:
+        return audio
+    return (audio[:4] + (len(audio) - 8).to_bytes(4, "little") + audio[8:data + 4]
+            + (len(audio) - data - 8).to_bytes(4, "little") + audio[data + 8:])
+
+class _SentenceAudio:
+    """Audio of one sentence, appended by a TTS worker while the pipeline reads it"""
+
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.chunks = []
+        self.done = False
+        self.started = False
+        self.cancelled = False
+        self.changed = threading.Condition()
+
+    def put(self, chunk):
+        with self.changed:
+            if self.cancelled:
+                return
+            self.chunks.append(chunk)
+            self.changed.notify_all()
+
+    def cancel(self):
+        """The text this audio speaks was discarded; the worker stops and nothing more is kept"""
+        with self.changed:
+            self.cancelled = True
+            self.chunks = []
+            self.changed.notify_all()
+
+    def close(self):
+        with self.changed:
+            self.done = True
+            self.changed.notify_all()
+
+    def take(self):
+        """Chunks that arrived since the last call, and whether the sentence is complete"""
+        with self.changed:
+            chunks, self.chunks = self.chunks, []
+            return chunks, self.done
+
+    def wait(self, timeout=None):
+        """Block until more audio arrives or the sentence is complete"""
+        with self.changed:
+            if not self.chunks and not self.done:
+                self.changed.wait(timeout)
+
+class SentenceAudioPipeline:
+    """
+    Turns a growing response text into a stream of audio chunks.
+    Sentences are synthesized on a worker pool; each sentence's audio is forwarded as the
+    engine streams it, in the original sentence order.
+    One response is spoken by one engine (picked for its first sentence), and only
+    engines with the same audio format are used as fallbacks, so the stream stays playable.
+    """
+
+    def __init__(self, synthesize=None):
+        self.synthesize = synthesize
+        self.engines = None
+        self.consumed = 0
+        self.pending = deque()
+        self.started = False
+        # Bumped whenever the response text is replaced; audio of older generations is dropped
+        self.generation = 0
+        self.scheduled_text = ""
+        # The current generation's audio as one stream, for saving the whole answer afterwards
+        self.clip = []
+        self.closed = False
+
+    def _schedule(self, sentence):
+        sentence = sentence.strip()
+        if not sentence or self.closed:
+            return
+        if not self.synthesize and self.engines is None:
+            engines = select_tts_engines(sentence)
+            self.engines = [engine for engine in engines if engine.extension == engines[0].extension] if engines else []
+        audio = _SentenceAudio(self.generation)
+        self.pending.append(audio)
+        _tts_executor.submit(bind(self._speak), sentence, audio)
+
+    def _speak(self, sentence, audio):
+        try:
+            if audio.cancelled:
+                # Discarded while it waited for a worker
+                return
+            if self.synthesize:
+                chunk = self.synthesize(sentence)
+                if chunk:
+                    audio.put(chunk)
+            else:
+                speech = stream_speech(sentence, self.engines)
+                try:
+                    for chunk in speech:
+                        if audio.cancelled:
+                            break
+                        audio.put(chunk)
+                finally:
+                    # Stops the engine too when the sentence was discarded midway
+                    speech.close()
+        except Exception as e:
+            print(f"Audio generation error: {e}")  # Shows up in the app / Spaces logs
+        finally:
+            audio.close()
+
+    def _discard(self):
+        """Drop the audio of every sentence not played yet and start a new generation"""
+        self.generation += 1
+        for audio in self.pending:
+            audio.cancel()
+        self.pending.clear()
+        self.consumed = 0
+        self.scheduled_text = ""
+        self.clip = []
+
+    def close(self):
+        """Nobody is listening any more: cancel the sentences not spoken yet and schedule no more"""
+        self.closed = True
+        self._discard()
+
+    def feed(self, text):
+        """Pass the full response so far; newly completed sentences start synthesizing"""
+        if not text.startswith(self.scheduled_text):
+            # The response was replaced (e.g. by an error message): its old sentences must not be spoken
+            self._discard()
+        new_text = text[self.consumed:]
+        parts = SENTENCE_END.split(new_text)
+        for sentence in parts[:-1]:
+            self._schedule(sentence)
+        self.consumed = len(text) - len(parts[-1])
+        self.scheduled_text = text[:self.consumed]
+
+    def finish(self, text):
+        """Flush whatever trailing text did not end with punctuation"""
+        self.feed(text)
+        self._schedule(text[self.consumed:])
+        self.consumed = len(text)
+        self.scheduled_text = text
+
+    def ready_chunks(self):
+        """Audio that has arrived so far, in order and joined into one chunk, without blocking"""
+        out = []
+        while self.pending:
+            sentence = self.pending[0]
+            if sentence.generation != self.generation:
+                self.pending.popleft()
+                continue
+            chunks, done = sentence.take()
+            for chunk in chunks:
+                if not sentence.started:
+                    self.clip.append(_stream_chunk(chunk, first=not self.clip))
+                    chunk = _stream_chunk(chunk, first=not self.started)
+                    sentence.started = self.started = True
+                else:
+                    self.clip.append(chunk)
+                out.append(chunk)
+            if not done:
+                break
+            self.pending.popleft()
+        return [b''.join(out)] if out else []
+
+    async def remaining_chunks(self):
+        """Wait for and yield the rest of the audio in order, as it arrives"""
+        while True:
+            for chunk in self.ready_chunks():
+                yield chunk
+            if not self.pending:
+                return
+            await asyncio.to_thread(self.pending[0].wait, 1.0)
+
+    def save_clip(self):
+        """
+        Write the audio streamed so far (the current response only) to a scratch file
+        and return its path, or None if nothing was spoken
+        """
+        audio = b''.join(self.clip)
+        if not audio:
+            return None
+        wav = audio[:4] == b"RIFF"
+        if wav:
+            audio = _complete_wav(audio)
+        path = _scratch.new_path(suffix=".wav" if wav else ".mp3")
+        try:
+            with span("file_write", target="scratch"):
+                with open(path, "wb") as f:
+                    f.write(audio)
+        finally:
+            # Same lifetime as request_audio_file: safe for SCRATCH_MIN_AGE, swept later
+            _scratch.release(path)
+        return path
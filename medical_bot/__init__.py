@@ -0,0 +1,7 @@
+"""
+Backend shared by the local app and the Hugging Face Spaces app: vision diagnosis
+(brain_of_the_doctor), speech to text (voice_of_the_patient, stt_backends) and text
+to speech (voice_of_the_doctor), plus their caches and connection pools.
+Deployment differences are selected with medical_bot.config.
+"""
+from medical_bot.config import DeploymentProfile, get_profile, select_profile
@@ -0,0 +1,150 @@
+import io
+import logging
+import os
+import shutil
+
+from pydub import AudioSegment
+from pydub.silence import detect_leading_silence, detect_silence
+
+# Preprocessing applied to recordings before they are transcribed.
+# Browsers record 44.1/48 kHz stereo WAV, but Whisper works on 16 kHz mono, so
+# most of that upload is wasted. Recordings are trimmed of leading and trailing
+# silence, downmixed, resampled and re-encoded to a compact format first.
+#
+# FLAC/Ogg/MP3 encoding goes through ffmpeg; without it the 16 kHz mono WAV is
+# uploaded instead, which is still several times smaller than the original.
+
+AUDIO_PREPROCESS = os.environ.get("AUDIO_PREPROCESS", "true").lower() not in ("0", "false", "no")
+AUDIO_TARGET_RATE = int(os.environ.get("AUDIO_TARGET_RATE", "16000"))
+AUDIO_UPLOAD_FORMAT = os.environ.get("AUDIO_UPLOAD_FORMAT", "flac").lower()
+AUDIO_SILENCE_THRESHOLD = float(os.environ.get("AUDIO_SILENCE_THRESHOLD", "-45"))
+AUDIO_SILENCE_PAD_MS = int(os.environ.get("AUDIO_SILENCE_PAD_MS", "200"))
+# Long recordings are cut into chunks of about STT_CHUNK_SECONDS at silence gaps;
+# neighbouring chunks share STT_CHUNK_OVERLAP_MS so no word is lost at a cut
+STT_CHUNK_SECONDS = float(os.environ.get("STT_CHUNK_SECONDS", "20"))
+STT_CHUNK_OVERLAP_MS = int(os.environ.get("STT_CHUNK_OVERLAP_MS", "1000"))
+
+# Shortest clip worth trimming down to; anything shorter is sent untrimmed
+_MIN_TRIMMED_MS = 300
+# Silence gaps shorter than this are not considered as chunk boundaries
+_MIN_GAP_MS = 300
+
+# pydub export arguments per upload format (all accepted by the Whisper API)
+_EXPORT_ARGS = {
+    "flac": {"format": "flac"},
+    "ogg": {"format": "ogg", "codec": "libopus", "bitrate": "24k"},
+    "mp3": {"format": "mp3", "bitrate": "32k"},
+    "wav": {"format": "wav"},
+}
+
+# Set once an export has failed because ffmpeg is not installed, so later requests
+# go straight to WAV; any other export failure only falls back for that clip
+_encoder_missing = False
+
+
+class PreparedAudio:
+    """A preprocessed recording ready to upload (segment is the processed pydub audio)"""
+
+    def __init__(self, filename, data, duration, original_bytes, segment=None):
+        self.filename = filename
+        self.data = data
+        self.duration = duration
+        self.original_bytes = original_bytes
+        self.segment = segment
+
+    def as_upload(self):
+        """(filename, bytes) pair accepted as a file by the GROQ SDK"""
+        return (self.filename, self.data)
+
+
+def trim_silence(segment, threshold=AUDIO_SILENCE_THRESHOLD, pad_ms=AUDIO_SILENCE_PAD_MS):
+    """Cut leading and trailing silence, keeping pad_ms on each side"""
+    start = detect_leading_silence(segment, silence_threshold=threshold)
+    end = len(segment) - detect_leading_silence(segment.reverse(), silence_threshold=threshold)
+    if end - start < _MIN_TRIMMED_MS:
+        # Nothing but silence (or a very short word); leave it to the recognizer
+        return segment
+    return segment[max(0, start - pad_ms):min(len(segment), end + pad_ms)]
+
+
+def export_segment(segment, upload_format=AUDIO_UPLOAD_FORMAT):
+    """Encode segment; returns (format, bytes), falling back to WAV when no encoder is available"""
+    global _encoder_missing
+    if upload_format != "wav" and not _encoder_missing:
+        buffer = io.BytesIO()
+        try:
+            segment.export(buffer, **_EXPORT_ARGS.get(upload_format, _EXPORT_ARGS["flac"]))
+            return upload_format, buffer.getvalue()
+        except Exception as e:
+            if isinstance(e, FileNotFoundError) or shutil.which(AudioSegment.converter) is None:
+                _encoder_missing = True
+            logging.warning(f"Cannot encode {upload_format} audio ({e}), uploading WAV instead")
+    buffer = io.BytesIO()
+    segment.export(buffer, format="wav")
+    return "wav", buffer.getvalue()
+
+
+def preprocess_audio(audio_filepath, upload_format=AUDIO_UPLOAD_FORMAT, target_rate=AUDIO_TARGET_RATE):
+    """
+    Trim, downmix to mono 16-bit, resample and re-encode a recording.
+    Returns a PreparedAudio, or None when preprocessing is disabled or the file cannot be decoded
+    (the caller then uploads the original file).
+    """
+    if not AUDIO_PREPROCESS or not audio_filepath:
+        return None
+    try:
+        original_bytes = os.path.getsize(audio_filepath)
+        segment = AudioSegment.from_file(audio_filepath)
+        segment = trim_silence(segment)
+        segment = segment.set_channels(1).set_frame_rate(target_rate).set_sample_width(2)
+        fmt, data = export_segment(segment, upload_format)
+    except Exception as e:
+        logging.warning(f"Audio preprocessing skipped: {e}")
+        return None
+
+    name = os.path.splitext(os.path.basename(audio_filepath))[0] or "audio"
+    filename = f"{name}.{fmt}"
+    if len(data) >= original_bytes:
+        # Already compact (e.g. a short MP3); re-encoding would only add bytes
+        with open(audio_filepath, "rb") as f:
+            data = f.read()
+        filename = os.path.basename(audio_filepath)
+    return PreparedAudio(filename, data, len(segment) / 1000.0, original_bytes, segment)
+
+
+def chunk_boundaries(segment, chunk_ms, threshold=AUDIO_SILENCE_THRESHOLD):
+    """
+    Cut points (ms) splitting segment into pieces of roughly chunk_ms.
+    Each cut goes in the middle of the silence gap nearest the ideal position, or at the
+    ideal position itself when the speech has no usable pause there.
+    """
+    # 10 ms steps keep silence detection cheap on multi-minute recordings
+    gaps = detect_silence(segment, min_silence_len=_MIN_GAP_MS, silence_thresh=threshold, seek_step=10)
+    candidates = [(start + end) // 2 for start, end in gaps]
+    cuts, start = [], 0
+    while len(segment) - start > chunk_ms * 1.25:
+        ideal = start + chunk_ms
+        window = [c for c in candidates if start + chunk_ms * 0.5 <= c <= start + chunk_ms * 1.25]
+        cut = min(window, key=lambda c: abs(c - ideal)) if window else ideal
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def split_for_transcription(prepared, chunk_seconds=STT_CHUNK_SECONDS, overlap_ms=STT_CHUNK_OVERLAP_MS,
+                            upload_format=AUDIO_UPLOAD_FORMAT):
+    """
+    Split a long PreparedAudio into encoded chunks at silence gaps.
+    Every chunk after the first also starts overlap_ms before its cut point.
+    Returns a list of PreparedAudio in playback order.
+    """
+    segment = prepared.segment
+    cuts = chunk_boundaries(segment, int(chunk_seconds * 1000))
+    bounds = list(zip([0] + cuts, cuts + [len(segment)]))
+    name = os.path.splitext(prepared.filename)[0]
+    chunks = []
+    for index, (start, end) in enumerate(bounds):
+        piece = segment[max(0, start - overlap_ms) if index else 0:end]
+        fmt, data = export_segment(piece, upload_format)
+        chunks.append(PreparedAudio(f"{name}_{index}.{fmt}", data, len(piece) / 1000.0, len(data), piece))
+    return chunks
@@ -0,0 +1,115 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from dotenv import load_dotenv
+
+from medical_bot.rate_limits import GROQ_RATE_LIMIT
+
+load_dotenv()
+
+# Shared, process-wide GROQ clients.
+# Building a new Groq() per request throws away the HTTP connection pool and pays
+# the TCP/TLS handshake on every diagnosis and every transcription. Clients created
+# here are cached per (api_key, base_url) and keep their connections warm.
+# With GROQ_RATE_LIMIT on, the SDK's own retries are off: rate_limits.py retries
+# against the shared per-model budgets instead.
+
+GROQ_POOL_MAX_CONNECTIONS = int(os.environ.get("GROQ_POOL_MAX_CONNECTIONS", "20"))
+GROQ_POOL_MAX_KEEPALIVE = int(os.environ.get("GROQ_POOL_MAX_KEEPALIVE", "10"))
+GROQ_POOL_KEEPALIVE_EXPIRY = float(os.environ.get("GROQ_POOL_KEEPALIVE_EXPIRY", "60"))
+GROQ_CONNECT_TIMEOUT = float(os.environ.get("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_READ_TIMEOUT = float(os.environ.get("GROQ_READ_TIMEOUT", "60"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Async clients hold connections bound to one event loop, so they are cached per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def pool_limits():
+    """Connection pool limits shared by every pooled client"""
+    return httpx.Limits(
+        max_connections=GROQ_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=GROQ_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def pool_timeout():
+    """Connect/read timeouts shared by every pooled client"""
+    return httpx.Timeout(GROQ_READ_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT)
+
+
+def _retry_kwargs():
+    return {"max_retries": 0} if GROQ_RATE_LIMIT else {}
+
+
+def _resolve_key(api_key, base_url):
+    # Fall back to the same environment variables the Groq SDK reads itself
+    api_key = api_key or os.environ.get("GROQ_API_KEY")
+    base_url = base_url or os.environ.get("GROQ_BASE_URL")
+    return api_key, base_url
+
+
+def get_groq_client(api_key=None, base_url=None):
+    """
+    Return the shared Groq client for this API key and base URL.
+    The first call builds the client; later calls reuse its warm connection pool.
+    """
+    key = _resolve_key(api_key, base_url)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Imported here so the SDK loads with the first request, not at app startup
+            from groq import Groq
+            http_client = httpx.Client(limits=pool_limits(), timeout=pool_timeout())
+            client = Groq(
+                api_key=key[0],
+                base_url=key[1],
+                timeout=pool_timeout(),
+                http_client=http_client,
+                **_retry_kwargs(),
+            )
+            _clients[key] = client
+        return client
+
+
+def get_async_groq_client(api_key=None, base_url=None):
+    """
+    Return the shared AsyncGroq client for this API key and base URL on the running event loop.
+    Must be called from inside a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    key = _resolve_key(api_key, base_url)
+
+    with _clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(key)
+        if client is None:
+            from groq import AsyncGroq
+            http_client = httpx.AsyncClient(limits=pool_limits(), timeout=pool_timeout())
+            client = AsyncGroq(
+                api_key=key[0],
+                base_url=key[1],
+                timeout=pool_timeout(),
+                http_client=http_client,
+                **_retry_kwargs(),
+            )
+            loop_clients[key] = client
+        return client
+
+
+def close_groq_clients():
+    """Close every pooled client (used on shutdown and in benchmarks)"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,105 @@
+import io
+import os
+
+from PIL import Image, ImageOps
+
+# Preprocessing applied before an image is sent to the vision model.
+# Phone photos are often 12+ megapixels; shipping them at full resolution produces
+# multi-megabyte data URLs without helping the model, so images are downscaled and
+# re-encoded to fit a byte budget while keeping JPEG quality above a floor.
+
+
+class PreprocessConfig:
+    """Settings for preprocess_image_bytes; defaults come from environment variables"""
+
+    def __init__(self, max_edge=None, target_bytes=None, min_quality=None, max_quality=None, center_crop=None):
+        self.max_edge = max_edge if max_edge is not None else int(os.environ.get("IMAGE_MAX_EDGE", "1568"))
+        self.target_bytes = target_bytes if target_bytes is not None else int(os.environ.get("IMAGE_TARGET_BYTES", "400000"))
+        self.min_quality = min_quality if min_quality is not None else int(os.environ.get("IMAGE_MIN_QUALITY", "60"))
+        self.max_quality = max_quality if max_quality is not None else int(os.environ.get("IMAGE_MAX_QUALITY", "85"))
+        # Fraction of width/height kept around the centre; 1.0 disables cropping
+        self.center_crop = center_crop if center_crop is not None else float(os.environ.get("IMAGE_CENTER_CROP", "1.0"))
+
+    def cache_tag(self):
+        """Short string that changes whenever a setting that affects the output changes"""
+        return f"{self.max_edge}:{self.target_bytes}:{self.min_quality}:{self.max_quality}:{self.center_crop}"
+
+
+DEFAULT_CONFIG = PreprocessConfig()
+
+_EXIF_ORIENTATION = 0x0112
+
+# Each downscale step when even the quality floor does not fit the budget
+_DOWNSCALE_STEP = 0.75
+_MAX_DOWNSCALE_STEPS = 6
+
+
+def prepare_image(img, config=DEFAULT_CONFIG):
+    """Orient, convert, crop and downscale a PIL image"""
+    # Phones store rotation in EXIF instead of rotating the pixels
+    if img.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+        img = ImageOps.exif_transpose(img)
+
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    if 0 < config.center_crop < 1:
+        width, height = img.size
+        crop_w, crop_h = int(width * config.center_crop), int(height * config.center_crop)
+        left, top = (width - crop_w) // 2, (height - crop_h) // 2
+        img = img.crop((left, top, left + crop_w, top + crop_h))
+
+    if config.max_edge and max(img.size) > config.max_edge:
+        scale = config.max_edge / max(img.size)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        # reducing_gap does a cheap box reduction first, then a bicubic pass for quality
+        img = img.resize(size, Image.BICUBIC, reducing_gap=1.0)
+    return img
+
+
+def _save_jpeg(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def encode_within_budget(img, config=DEFAULT_CONFIG):
+    """
+    Encode to JPEG at the highest quality that fits config.target_bytes.
+    Quality is binary searched down to config.min_quality; if even that is too big,
+    the image is downscaled and the search repeats.
+    """
+    for _ in range(_MAX_DOWNSCALE_STEPS + 1):
+        best = _save_jpeg(img, config.max_quality)
+        if not config.target_bytes or len(best) <= config.target_bytes:
+            return best
+
+        low, high = config.min_quality, config.max_quality - 1
+        best = None
+        while low <= high:
+            quality = (low + high) // 2
+            data = _save_jpeg(img, quality)
+            if len(data) <= config.target_bytes:
+                best, low = data, quality + 1
+            else:
+                high = quality - 1
+        if best is not None:
+            return best
+
+        width, height = img.size
+        if min(width, height) < 64:
+            break
+        img = img.resize((int(width * _DOWNSCALE_STEP), int(height * _DOWNSCALE_STEP)), Image.BICUBIC)
+
+    # Could not meet the budget without going below the quality floor; ship the floor
+    return _save_jpeg(img, config.min_quality)
+
+
+def preprocess_image_bytes(image_bytes, config=DEFAULT_CONFIG):
+    """Turn raw uploaded image bytes into a compact JPEG for the vision model"""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if config.max_edge and img.format == 'JPEG' and max(img.size) > config.max_edge:
+            # Let libjpeg decode at a reduced scale instead of decoding every pixel and shrinking later
+            scale = config.max_edge / max(img.size)
+            img.draft('RGB', (int(img.width * scale), int(img.height * scale)))
+        return encode_within_budget(prepare_image(img, config), config)
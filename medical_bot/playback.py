@@ -0,0 +1,127 @@
+import logging
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import threading
+
+from medical_bot.scratch_files import get_scratch_manager
+
+# Server-side playback.
+# The local app can also speak the doctor's answer through the speakers of the
+# machine it runs on. Playing a clip takes as long as the clip, so it happens on one
+# background player thread fed by a small queue: the request returns as soon as the
+# audio file exists. Whether to play at all is the deployment profile's play_audio
+# (off on Spaces, SERVER_PLAYBACK overrides it).
+
+PLAYBACK_QUEUE_SIZE = int(os.environ.get("PLAYBACK_QUEUE_SIZE", "4"))
+
+
+def player_command(path):
+    """Command that plays path on this machine, or None if no suitable player is installed"""
+    os_name = platform.system()
+    if os_name == "Darwin":  # macOS
+        candidates = [["afplay", path]]
+    elif os_name == "Windows":  # Windows (SoundPlayer only plays WAV)
+        candidates = [["powershell", "-c", f'(New-Object Media.SoundPlayer "{path}").PlaySync();']]
+    elif os_name == "Linux":  # Linux: aplay only understands WAV, MP3 needs a decoder
+        ffplay = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", path]
+        if path.lower().endswith(".wav"):
+            candidates = [["aplay", "-q", path], ["paplay", path], ffplay]
+        else:
+            candidates = [["mpg123", "-q", path], ffplay]
+    else:
+        return None
+    for command in candidates:
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+class AudioPlayer:
+    """
+    Plays audio files one after another on a daemon thread.
+    When more than max_queued clips are waiting the oldest one is dropped, so the
+    speakers never fall minutes behind the conversation.
+    """
+
+    def __init__(self, max_queued=PLAYBACK_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max(1, max_queued))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._scratch = get_scratch_manager()
+        self._missing = set()
+        self.played = 0
+        self.dropped = 0
+
+    def play(self, path):
+        """Queue path for playback and return immediately"""
+        self._start()
+        # Keep the scratch sweeper away from the file until it has been played
+        self._scratch.acquire(path)
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(path)
+                    break
+                except queue.Full:
+                    self._discard_oldest()
+
+    def _discard_oldest(self):
+        try:
+            stale = self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self.dropped += 1
+        self._scratch.release(stale)
+        self._queue.task_done()
+        logging.info("Playback queue full, skipped %s", stale)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio_player", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            try:
+                self._play(path)
+            except Exception as e:
+                logging.warning("Playback of %s failed: %s", path, e)
+            finally:
+                self._scratch.release(path)
+                self._queue.task_done()
+
+    def _play(self, path):
+        command = player_command(path)
+        if command is None:
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in self._missing:
+                # Warn once per format, e.g. a headless server without mpg123
+                self._missing.add(extension)
+                logging.warning("No audio player for %s files on %s, server-side playback skipped",
+                                extension or "these", platform.system())
+            return
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.played += 1
+
+    def wait(self):
+        """Block until every queued clip has been played (for scripts that exit afterwards)"""
+        self._queue.join()
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_audio_player():
+    """The process-wide audio player (its thread starts with the first clip)"""
+    global _player
+    if _player is None:
+        with _player_lock:
+            if _player is None:
+                _player = AudioPlayer()
+    return _player
@@ -0,0 +1,369 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from medical_bot.tracing import Counter, record_span, register
+
+# Client-side GROQ rate limiting.
+# GROQ gives every model a requests-per-minute and a tokens-per-minute budget and
+# answers 429 once one is spent. All GROQ calls go through the scheduler here:
+# - each model has token buckets for its RPM and TPM budgets; a call reserves its
+#   share before it is sent and waits its turn instead of failing,
+# - the x-ratelimit-* response headers keep the buckets in step with the server's
+#   own count (and pause the model when a budget is exhausted),
+# - 429 and 5xx answers (and dropped connections) are retried after the server's
+#   retry-after, or after a jittered exponential backoff.
+#
+# GROQ_RATE_LIMITS overrides the per-model budgets, e.g.
+# "llama3-8b-8192=30/6000,whisper-large-v3=20/0" (requests/tokens per minute, 0 = no limit);
+# "*" sets the budget of every model not listed.
+
+GROQ_RATE_LIMIT = os.environ.get("GROQ_RATE_LIMIT", "true").lower() not in ("0", "false", "no")
+GROQ_RATE_LIMITS = os.environ.get("GROQ_RATE_LIMITS", "")
+GROQ_MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "4"))
+GROQ_BACKOFF_BASE_MS = float(os.environ.get("GROQ_BACKOFF_BASE_MS", "500"))
+GROQ_BACKOFF_MAX_MS = float(os.environ.get("GROQ_BACKOFF_MAX_MS", "20000"))
+# A call that would have to wait longer than this for its turn fails right away
+GROQ_MAX_QUEUE_SECONDS = float(os.environ.get("GROQ_MAX_QUEUE_SECONDS", "60"))
+# Answer length assumed when reserving tokens; corrected from the reported usage afterwards
+GROQ_EXPECTED_COMPLETION_TOKENS = int(os.environ.get("GROQ_EXPECTED_COMPLETION_TOKENS", "400"))
+
+# Requests and tokens per minute (free tier); models not listed get DEFAULT_LIMITS
+MODEL_LIMITS = {
+    "meta-llama/llama-4-scout-17b-16e-instruct": (30, 30000),
+    "llama3-8b-8192": (30, 6000),
+    "whisper-large-v3": (20, 0),
+}
+DEFAULT_LIMITS = (30, 0)
+# Rough prompt cost of one attached image
+IMAGE_TOKENS = 1000
+
+GROQ_THROTTLED = register(Counter("medical_bot_groq_throttled_total",
+                                  "GROQ calls held back by the client-side rate limiter", "model"))
+GROQ_RETRIES = register(Counter("medical_bot_groq_retries_total",
+                                "GROQ calls retried after a 429, a 5xx or a dropped connection", "model"))
+
+
+class RateLimitWaitTooLong(Exception):
+    """The model's budget is booked further ahead than GROQ_MAX_QUEUE_SECONDS"""
+
+
+def parse_limits(spec):
+    """{model: (rpm, tpm)} from a "model=rpm/tpm,..." string"""
+    limits = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        model, _, values = item.strip().rpartition("=")
+        rpm, _, tpm = values.partition("/")
+        limits[model] = (int(rpm or 0), int(tpm or 0))
+    return limits
+
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value):
+    """Seconds from a header value like "7.66s", "2m59.56s", "250ms" or plain "12", else None"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Budget of capacity units per minute, refilled continuously"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take amount, going into debt if needed; seconds until the debt is paid off"""
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level * 60.0 / self.capacity)
+
+    def give_back(self, amount, now):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, limit, remaining, now):
+        """Adopt the server's count: its limit as capacity, and never more than it says remains"""
+        self._refill(now)
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+
+class ModelRateLimiter:
+    """Requests- and tokens-per-minute budgets of one GROQ model"""
+
+    def __init__(self, model, rpm, tpm):
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=0):
+        """Book one request and tokens; seconds the caller has to wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self.paused_until - now)
+            if self.requests:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens and tokens:
+                delay = max(delay, self.tokens.reserve(tokens, now))
+            return delay
+
+    def cancel(self, tokens=0):
+        """Return a booking that is not going to be sent"""
+        with self._lock:
+            now = time.monotonic()
+            if self.requests:
+                self.requests.give_back(1, now)
+            if self.tokens and tokens:
+                self.tokens.give_back(tokens, now)
+
+    def settle(self, reserved, used):
+        """Correct a token booking once the response reports the real usage"""
+        if not self.tokens or used is None:
+            return
+        with self._lock:
+            self.tokens.give_back(reserved - used, time.monotonic())
+
+    def pause(self, seconds):
+        """Hold every call to this model for seconds (after a 429)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def paused_for(self):
+        with self._lock:
+            return max(0.0, self.paused_until - time.monotonic())
+
+    def observe(self, headers):
+        """Update the budgets from GROQ's x-ratelimit-* response headers"""
+        # Tokens are counted per minute; GROQ's request counters cover the whole day,
+        # so they only matter once they run out
+        remaining_tokens = _header_number(headers, "x-ratelimit-remaining-tokens")
+        if self.tokens and remaining_tokens is not None:
+            with self._lock:
+                self.tokens.sync(_header_number(headers, "x-ratelimit-limit-tokens"), remaining_tokens,
+                                 time.monotonic())
+        remaining = _header_number(headers, "x-ratelimit-remaining-requests")
+        if remaining is not None and remaining <= 0:
+            # The reset header is the time until the budget is full again; hold off
+            # until one request's worth has come back
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests")) or 0.0
+            limit = _header_number(headers, "x-ratelimit-limit-requests")
+            self.pause(reset / limit if limit else reset)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests_left": round(self.requests.level, 1) if self.requests else None,
+                "tokens_left": round(self.tokens.level) if self.tokens else None,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_model_limiter(model):
+    """The shared rate limiter for model (created with its configured budgets)"""
+    limiter = _limiters.get(model)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model)
+            if limiter is None:
+                overrides = parse_limits(GROQ_RATE_LIMITS)
+                limits = overrides.get(model) or overrides.get("*") or MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+                limiter = ModelRateLimiter(model, *limits)
+                _limiters[model] = limiter
+    return limiter
+
+
+def rate_limit_stats():
+    """Budget left per model"""
+    return {model: limiter.stats() for model, limiter in list(_limiters.items())}
+
+
+def estimate_chat_tokens(messages, completion_tokens=GROQ_EXPECTED_COMPLETION_TOKENS):
+    """Rough size of a chat request: ~4 characters per token, a flat cost per image, plus the answer"""
+    chars, images = 0, 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                chars += len(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                images += 1
+    return chars // 4 + images * IMAGE_TOKENS + completion_tokens
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff: anywhere up to base * 2**attempt, capped"""
+    return random.uniform(0, min(GROQ_BACKOFF_MAX_MS, GROQ_BACKOFF_BASE_MS * 2 ** attempt)) / 1000.0
+
+
+def retry_delay(error, attempt):
+    """Seconds to wait before retrying after error, or None if it is not worth retrying"""
+    # Imported here: the SDK has already loaded if it raised
+    from groq import APIConnectionError
+    if isinstance(error, APIConnectionError):
+        # Dropped connection or timeout, as the SDK's own retries would have covered
+        return backoff_delay(attempt)
+    status = getattr(error, "status_code", None)
+    if status is None or (status != 429 and status < 500):
+        return None
+    response = getattr(error, "response", None)
+    retry_after = parse_duration(response.headers.get("retry-after")) if response is not None else None
+    if retry_after is not None:
+        # Spread out the callers that were told the same moment
+        return retry_after + random.uniform(0, GROQ_BACKOFF_BASE_MS / 1000.0)
+    return backoff_delay(attempt)
+
+
+def _book(limiter, tokens):
+    delay = limiter.reserve(tokens)
+    if delay > GROQ_MAX_QUEUE_SECONDS:
+        limiter.cancel(tokens)
+        raise RateLimitWaitTooLong(f"GROQ rate limit for {limiter.model} is booked {delay:.0f} s ahead")
+    if delay:
+        GROQ_THROTTLED.inc(limiter.model)
+    return delay
+
+
+def _after_error(limiter, error, attempt, waited):
+    """
+    Delay before the next attempt (a 429 pauses the whole model), or re-raise.
+    A 429 means "not yet": it is retried for as long as the call may queue
+    (GROQ_MAX_QUEUE_SECONDS); other errors get GROQ_MAX_RETRIES attempts.
+    """
+    delay = retry_delay(error, attempt)
+    rate_limited = getattr(error, "status_code", None) == 429
+    if delay is None:
+        raise error
+    if rate_limited and waited + delay > GROQ_MAX_QUEUE_SECONDS:
+        raise error
+    if not rate_limited and attempt >= GROQ_MAX_RETRIES:
+        raise error
+    GROQ_RETRIES.inc(limiter.model)
+    logging.warning("GROQ %s call failed (%s), retrying in %.1f s", limiter.model,
+                    getattr(error, "status_code", type(error).__name__), delay)
+    if rate_limited:
+        limiter.pause(delay)
+        return 0.0
+    return delay
+
+
+def _never_counted(error):
+    """
+    True if GROQ cannot have counted the failed request against the budget: a 429, or a
+    connection that was never made. After a read timeout or a 5xx it may have been.
+    """
+    if getattr(error, "status_code", None) == 429:
+        return True
+    import httpx
+    # The SDK raises APIConnectionError / APITimeoutError from the httpx exception
+    return isinstance(error.__cause__, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _usage_tokens(result):
+    usage = getattr(result, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def call_with_rate_limit(model, request, tokens=0):
+    """
+    Send request() - a GROQ `with_raw_response` call - within model's budget and return the parsed result.
+    Waits for its turn instead of failing, and retries 429 and 5xx answers and dropped connections.
+    """
+    if not GROQ_RATE_LIMIT:
+        return request().parse()
+    limiter = get_model_limiter(model)
+    attempt = 0
+    first_try = time.perf_counter()
+    while True:
+        start = time.perf_counter()
+        delay = _book(limiter, tokens)
+        while delay > 0:
+            time.sleep(delay)
+            delay = limiter.paused_for()
+        if time.perf_counter() - start > 0.001:
+            record_span("rate_limit_wait", time.perf_counter() - start, start, model=model, attempt=attempt)
+        try:
+            raw = request()
+        except Exception as e:
+            if _never_counted(e):
+                # Nothing was used by the failed attempt; the retry books again
+                limiter.cancel(tokens)
+            time.sleep(_after_error(limiter, e, attempt, time.perf_counter() - first_try))
+            attempt += 1
+            continue
+        result = raw.parse()
+        # Settle the estimate first so the server's remaining count has the last word
+        limiter.settle(tokens, _usage_tokens(result))
+        limiter.observe(raw.headers)
+        return result
+
+
+async def call_with_rate_limit_async(model, request, tokens=0):
+    """Async version of call_with_rate_limit; request() returns an awaitable"""
+    if not GROQ_RATE_LIMIT:
+        return await (await request()).parse()
+    limiter = get_model_limiter(model)
+    attempt = 0
+    first_try = time.perf_counter()
+    while True:
+        start = time.perf_counter()
+        delay = _book(limiter, tokens)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = limiter.paused_for()
+        if time.perf_counter() - start > 0.001:
+            record_span("rate_limit_wait", time.perf_counter() - start, start, model=model, attempt=attempt)
+        try:
+            raw = await request()
+        except Exception as e:
+            if _never_counted(e):
+                # Nothing was used by the failed attempt; the retry books again
+                limiter.cancel(tokens)
+            await asyncio.sleep(_after_error(limiter, e, attempt, time.perf_counter() - first_try))
+            attempt += 1
+            continue
+        result = await raw.parse()
+        # Settle the estimate first so the server's remaining count has the last word
+        limiter.settle(tokens, _usage_tokens(result))
+        limiter.observe(raw.headers)
+        return result
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Per-request scratch files.
+# Every request gets its own uniquely named file under SCRATCH_DIR, so concurrent
+# users never overwrite each other's audio. Files that are still in use are
+# reference counted; a background sweeper deletes the rest once they are older
+# than SCRATCH_MAX_AGE or when the directory grows past SCRATCH_MAX_BYTES.
+# Files handed out in the last SCRATCH_MIN_AGE seconds are never swept, even when
+# over budget: a reply's audio file is released when the event returns, before
+# Gradio has served it to the browser.
+
+SCRATCH_DIR = os.environ.get("SCRATCH_DIR", os.path.join(tempfile.gettempdir(), "medical_bot_scratch"))
+SCRATCH_MAX_AGE = float(os.environ.get("SCRATCH_MAX_AGE", "900"))
+SCRATCH_MAX_BYTES = int(os.environ.get("SCRATCH_MAX_BYTES", str(500 * 1024 * 1024)))
+SCRATCH_SWEEP_INTERVAL = float(os.environ.get("SCRATCH_SWEEP_INTERVAL", "60"))
+SCRATCH_MIN_AGE = float(os.environ.get("SCRATCH_MIN_AGE", "60"))
+
+
+class ScratchFileManager:
+    """Hands out unique scratch paths and cleans them up once they are no longer needed"""
+
+    def __init__(self, directory=SCRATCH_DIR, max_age=SCRATCH_MAX_AGE, max_bytes=SCRATCH_MAX_BYTES,
+                 sweep_interval=SCRATCH_SWEEP_INTERVAL, min_age=SCRATCH_MIN_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.min_age = min_age
+        self._refs = {}
+        # When each path was handed out (a hard-linked file keeps its source's mtime)
+        self._issued = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+        os.makedirs(directory, exist_ok=True)
+
+    def new_path(self, suffix=".mp3", prefix="audio_"):
+        """Reserve a unique path (the caller holds one reference until release)"""
+        path = os.path.join(self.directory, f"{prefix}{uuid.uuid4().hex}{suffix}")
+        with self._lock:
+            self._issued[path] = time.time()
+        self.acquire(path)
+        return path
+
+    def adopt(self, source_path, suffix=".mp3", prefix="audio_"):
+        """
+        Give a shared file (e.g. a cached MP3) its own scratch name.
+        A hard link costs no copy and keeps the data alive even if the source is evicted.
+        """
+        path = self.new_path(suffix=suffix, prefix=prefix)
+        try:
+            os.link(source_path, path)
+        except OSError:
+            # Different filesystem or no hard link support
+            shutil.copyfile(source_path, path)
+        return path
+
+    def acquire(self, path):
+        with self._lock:
+            self._refs[path] = self._refs.get(path, 0) + 1
+
+    def release(self, path, delete=False):
+        """Drop one reference; with delete=True the file is removed as soon as nobody holds it"""
+        with self._lock:
+            count = self._refs.get(path, 0) - 1
+            if count > 0:
+                self._refs[path] = count
+                return
+            self._refs.pop(path, None)
+        if delete:
+            self._remove(path)
+
+    @contextmanager
+    def scratch_file(self, suffix=".mp3", prefix="audio_", delete=True):
+        """Context manager yielding a scratch path that is released on exit"""
+        path = self.new_path(suffix=suffix, prefix=prefix)
+        try:
+            yield path
+        finally:
+            self.release(path, delete=delete)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def sweep(self):
+        """
+        Delete unreferenced files past max_age, then the oldest ones while over max_bytes.
+        Files younger than min_age are kept either way.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        with self._lock:
+            held = set(self._refs)
+            # Forget issue times once they no longer protect anything
+            self._issued = {path: issued for path, issued in self._issued.items() if now - issued < self.min_age}
+            fresh = set(self._issued)
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if path in held or path in fresh or now - mtime < self.min_age:
+                continue
+            if now - mtime > self.max_age or total > self.max_bytes:
+                self._remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def start_sweeper(self):
+        """Run sweep() every sweep_interval seconds on a daemon thread"""
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="scratch_sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception:
+                # Never let a transient filesystem error kill the sweeper
+                pass
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_scratch_manager():
+    """The process-wide scratch file manager (its sweeper starts on first use)"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ScratchFileManager()
+                _manager.start_sweeper()
+    return _manager
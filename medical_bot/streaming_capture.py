@@ -0,0 +1,289 @@
+import io
+import logging
+import os
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from pydub import AudioSegment
+
+from medical_bot.stt_backends import transcribe_clip
+
+# Streaming microphone capture.
+# Instead of waiting for recognizer.listen() to return the whole phrase, audio is
+# read in fixed-size frames and passed through a voice-activity detector. Every
+# time the patient pauses, the utterance so far is sent for transcription while
+# they keep talking, so the transcript is almost complete when they stop.
+#
+# replay_file() feeds a recording through the same pipeline, which lets the
+# streaming mode be exercised without a microphone.
+
+STREAM_SAMPLE_RATE = 16000
+STREAM_FRAME_MS = int(os.environ.get("STREAM_FRAME_MS", "30"))
+# A pause this long closes an utterance and sends it for transcription
+UTTERANCE_SILENCE_MS = int(os.environ.get("UTTERANCE_SILENCE_MS", "400"))
+# Utterances are cut here even without a pause, so none grows unbounded
+UTTERANCE_MAX_SECONDS = float(os.environ.get("UTTERANCE_MAX_SECONDS", "15"))
+# A pause this long after speech ends the recording (like recognizer.listen's pause threshold)
+STREAM_END_SILENCE_MS = int(os.environ.get("STREAM_END_SILENCE_MS", "1200"))
+VAD_AGGRESSIVENESS = int(os.environ.get("VAD_AGGRESSIVENESS", "2"))
+# Energy VAD: how far above the calibrated noise floor counts as speech
+VAD_MARGIN_DB = float(os.environ.get("VAD_MARGIN_DB", "12"))
+# Highest threshold calibration may set, so a calibration window that caught speech
+# cannot make the detector deaf to normal speech
+VAD_MAX_THRESHOLD_DBFS = float(os.environ.get("VAD_MAX_THRESHOLD_DBFS", "-30"))
+STREAM_STT_WORKERS = int(os.environ.get("STREAM_STT_WORKERS", "2"))
+
+# Audio kept from just before speech starts, so the first syllable is not clipped
+_PRE_ROLL_MS = 200
+# Utterances shorter than this are clicks or breaths, not words
+_MIN_UTTERANCE_MS = 250
+_SAMPLE_WIDTH = 2
+
+
+def frame_bytes(frame_ms=STREAM_FRAME_MS, sample_rate=STREAM_SAMPLE_RATE):
+    return int(sample_rate * frame_ms / 1000) * _SAMPLE_WIDTH
+
+
+def pcm_to_wav(pcm, sample_rate=STREAM_SAMPLE_RATE):
+    """Wrap 16-bit mono PCM in an in-memory WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(_SAMPLE_WIDTH)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class EnergyVAD:
+    """Voice-activity detection by frame loudness relative to a calibrated noise floor"""
+
+    def __init__(self, threshold_dbfs=-40.0, margin_db=VAD_MARGIN_DB, sample_rate=STREAM_SAMPLE_RATE,
+                 max_threshold_dbfs=VAD_MAX_THRESHOLD_DBFS):
+        self.threshold_dbfs = threshold_dbfs
+        self.margin_db = margin_db
+        self.max_threshold_dbfs = max_threshold_dbfs
+        self.sample_rate = sample_rate
+
+    def _dbfs(self, frame):
+        return AudioSegment(data=frame, sample_width=_SAMPLE_WIDTH, frame_rate=self.sample_rate, channels=1).dBFS
+
+    def calibrate(self, frames):
+        """Set the threshold from frames of background noise (like adjust_for_ambient_noise)"""
+        levels = [self._dbfs(frame) for frame in frames]
+        levels = [level for level in levels if level != float("-inf")]
+        if levels:
+            self.threshold_dbfs = min(max(levels) + self.margin_db, self.max_threshold_dbfs)
+
+    def is_speech(self, frame):
+        return self._dbfs(frame) > self.threshold_dbfs
+
+
+class WebRTCVAD:
+    """Wrapper around webrtcvad (optional dependency) with the EnergyVAD interface"""
+
+    def __init__(self, aggressiveness=VAD_AGGRESSIVENESS, sample_rate=STREAM_SAMPLE_RATE):
+        import webrtcvad
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+
+    def calibrate(self, frames):
+        pass
+
+    def is_speech(self, frame):
+        return self._vad.is_speech(frame, self.sample_rate)
+
+
+def make_vad():
+    """webrtcvad when installed (frames must be 10, 20 or 30 ms), otherwise the energy detector"""
+    try:
+        return WebRTCVAD()
+    except ImportError:
+        return EnergyVAD()
+
+
+class UtteranceSegmenter:
+    """
+    Groups frames into utterances separated by pauses.
+    push() returns the PCM of an utterance once a pause closes it, else None.
+    """
+
+    def __init__(self, vad, frame_ms=STREAM_FRAME_MS, silence_ms=UTTERANCE_SILENCE_MS,
+                 max_seconds=UTTERANCE_MAX_SECONDS):
+        self.vad = vad
+        self.frame_ms = frame_ms
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.max_frames = max(1, int(max_seconds * 1000 // frame_ms))
+        self.pre_roll = deque(maxlen=max(1, _PRE_ROLL_MS // frame_ms))
+        self.frames = []
+        self.trailing_silence = 0
+        self.heard_speech = False
+
+    def push(self, frame):
+        speech = self.vad.is_speech(frame)
+        if not self.frames:
+            if not speech:
+                self.pre_roll.append(frame)
+                self.trailing_silence += 1
+                return None
+            self.frames = list(self.pre_roll)
+            self.pre_roll.clear()
+
+        self.frames.append(frame)
+        self.heard_speech = self.heard_speech or speech
+        self.trailing_silence = 0 if speech else self.trailing_silence + 1
+        if self.trailing_silence >= self.silence_frames or len(self.frames) >= self.max_frames:
+            return self._close()
+        return None
+
+    def flush(self):
+        """The unfinished utterance at the end of the stream, if any"""
+        return self._close() if self.frames else None
+
+    def _close(self):
+        # Drop the pause itself; it only costs upload and decode time
+        keep = len(self.frames) - min(self.trailing_silence, len(self.frames))
+        frames, self.frames = self.frames[:keep], []
+        if len(frames) * self.frame_ms < _MIN_UTTERANCE_MS:
+            return None
+        return b"".join(frames)
+
+    def silence_ms(self):
+        """How long the stream has been quiet"""
+        return self.trailing_silence * self.frame_ms
+
+
+class StreamingTranscriber:
+    """
+    Transcribes utterances on a small worker pool as they are produced.
+    on_text(index, text) is called from a worker thread as each one finishes.
+    """
+
+    def __init__(self, transcribe=None, workers=STREAM_STT_WORKERS, on_text=None, sample_rate=STREAM_SAMPLE_RATE):
+        self.transcribe = transcribe or transcribe_clip
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream_stt")
+        self.on_text = on_text
+        self.sample_rate = sample_rate
+        self.futures = []
+
+    def submit(self, pcm):
+        index = len(self.futures)
+        duration = len(pcm) / (self.sample_rate * _SAMPLE_WIDTH)
+        clip = (f"utterance_{index}.wav", pcm_to_wav(pcm, self.sample_rate))
+        self.futures.append(self.executor.submit(self._run, index, clip, duration))
+
+    def _run(self, index, clip, duration):
+        text = (self.transcribe(clip, duration) or "").strip()
+        if self.on_text:
+            self.on_text(index, text)
+        return text
+
+    def result(self):
+        """Wait for every utterance and return the transcript in speaking order"""
+        texts = [future.result() for future in self.futures]
+        self.executor.shutdown(wait=False)
+        return " ".join(text for text in texts if text)
+
+
+def stream_transcribe(frames, vad=None, on_text=None, stop_on_pause=True, timeout=None, phrase_time_limit=None,
+                      frame_ms=STREAM_FRAME_MS, transcribe=None):
+    """
+    Run frames (16 kHz mono 16-bit PCM) through VAD segmentation and incremental transcription.
+    With stop_on_pause the capture ends after STREAM_END_SILENCE_MS of silence following speech;
+    timeout bounds the wait for speech to start and phrase_time_limit the total speaking time.
+    Returns the full transcript.
+    """
+    segmenter = UtteranceSegmenter(vad or make_vad(), frame_ms=frame_ms)
+    transcriber = StreamingTranscriber(transcribe=transcribe, on_text=on_text)
+    elapsed_ms, speech_started_ms = 0, None
+    for frame in frames:
+        elapsed_ms += frame_ms
+        utterance = segmenter.push(frame)
+        if utterance:
+            transcriber.submit(utterance)
+        if segmenter.heard_speech and speech_started_ms is None:
+            speech_started_ms = elapsed_ms
+        if speech_started_ms is None:
+            if timeout is not None and elapsed_ms >= timeout * 1000:
+                logging.info("No speech detected before timeout")
+                break
+            continue
+        if stop_on_pause and segmenter.silence_ms() >= STREAM_END_SILENCE_MS:
+            break
+        if phrase_time_limit is not None and elapsed_ms - speech_started_ms >= phrase_time_limit * 1000:
+            break
+
+    utterance = segmenter.flush()
+    if utterance:
+        transcriber.submit(utterance)
+    return transcriber.result()
+
+
+def microphone_frames(frame_ms=STREAM_FRAME_MS, calibrate_vad=None):
+    """Yield PCM frames from the default microphone (PyAudio via speech_recognition)"""
+    import speech_recognition as sr
+
+    samples = int(STREAM_SAMPLE_RATE * frame_ms / 1000)
+    with sr.Microphone(sample_rate=STREAM_SAMPLE_RATE, chunk_size=samples) as source:
+        if calibrate_vad is not None:
+            logging.info("Adjusting for ambient noise...")
+            calibrate_vad.calibrate([source.stream.read(samples) for _ in range(1000 // frame_ms)])
+        logging.info("Start speaking now...")
+        while True:
+            yield source.stream.read(samples)
+
+
+def load_pcm(audio_filepath):
+    """Decode a recording to 16 kHz mono 16-bit PCM"""
+    segment = AudioSegment.from_file(audio_filepath)
+    return segment.set_channels(1).set_frame_rate(STREAM_SAMPLE_RATE).set_sample_width(_SAMPLE_WIDTH).raw_data
+
+
+def pcm_frames(pcm, frame_ms=STREAM_FRAME_MS, realtime=True):
+    """
+    Slice PCM into microphone-sized frames.
+    With realtime=True frames are paced at the speed they would arrive from a microphone.
+    """
+    size = frame_bytes(frame_ms)
+    start = time.monotonic()
+    for index, offset in enumerate(range(0, len(pcm) - size + 1, size)):
+        if realtime:
+            delay = start + index * frame_ms / 1000 - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield pcm[offset:offset + size]
+
+
+def record_and_transcribe(timeout=20, phrase_time_limit=None, on_text=None):
+    """Capture from the microphone and return the transcript as soon as the patient stops"""
+    vad = make_vad()
+    frames = microphone_frames(calibrate_vad=vad)
+    try:
+        return stream_transcribe(frames, vad=vad, on_text=on_text, timeout=timeout,
+                                 phrase_time_limit=phrase_time_limit)
+    finally:
+        frames.close()
+
+
+def quietest_window(pcm, window_ms=500, sample_rate=STREAM_SAMPLE_RATE):
+    """The window_ms slice of pcm with the lowest loudness (the best guess at background noise)"""
+    size = frame_bytes(window_ms)
+    if len(pcm) <= size:
+        return pcm
+    step = frame_bytes(window_ms // 2)
+    windows = [pcm[offset:offset + size] for offset in range(0, len(pcm) - size + 1, step)]
+    return min(windows, key=lambda window: AudioSegment(data=window, sample_width=_SAMPLE_WIDTH,
+                                                       frame_rate=sample_rate, channels=1).rms)
+
+
+def replay_file(audio_filepath, realtime=True, on_text=None, transcribe=None):
+    """File-replay driver: run a recording through the streaming pipeline as if spoken live"""
+    pcm = load_pcm(audio_filepath)
+    vad = make_vad()
+    # Calibrate on the quietest half second: a recording may start with speech, where
+    # the microphone path gets a moment of ambient noise before the patient talks
+    vad.calibrate(list(pcm_frames(quietest_window(pcm), realtime=False)))
+    return stream_transcribe(pcm_frames(pcm, realtime=realtime), vad=vad, on_text=on_text,
+                             stop_on_pause=False, transcribe=transcribe)
@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Per-request latency tracing.
+# Each diagnosis (and each voice request) is a trace made of spans for the stages
+# it went through: audio preprocessing, STT, image encoding, the LLM call (with
+# time to first token), TTS synthesis and file writes. Finished traces are logged
+# as one JSON line, and every span also feeds a Prometheus histogram served on
+# METRICS_ROUTE, so the numbers can be scraped under production load.
+#
+# The active trace lives in a context variable: asyncio tasks and asyncio.to_thread
+# inherit it, plain executor submissions need bind(). Spans recorded outside a trace
+# still reach the histograms.
+
+TRACING = os.environ.get("TRACING", "true").lower() not in ("0", "false", "no")
+TRACE_LOG = os.environ.get("TRACE_LOG", "true").lower() not in ("0", "false", "no")
+# Empty disables the route
+METRICS_ROUTE = os.environ.get("METRICS_ROUTE", "/metrics")
+
+# Histogram buckets in seconds, from cache hits to slow long-audio transcriptions
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# One JSON object per line, without the app's log prefix, so log shippers can parse it as is
+_trace_logger = logging.getLogger("medical_bot.trace")
+if TRACE_LOG and not _trace_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _trace_logger.addHandler(_handler)
+    _trace_logger.setLevel(logging.INFO)
+    _trace_logger.propagate = False
+_current_trace = contextvars.ContextVar("medical_bot_trace", default=None)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a single label value"""
+
+    def __init__(self, name, help_text, label, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, seconds):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, (counts, total, count) in sorted(self._series.items()):
+                label = f'{self.label}="{label_value}"'
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{label}}} {total:.6f}")
+                lines.append(f"{self.name}_count{{{label}}} {count}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """Prometheus-style counter keyed by a single label value"""
+
+    def __init__(self, name, help_text, label):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_value, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{self.label}="{label_value}"}} {value}')
+        return "\n".join(lines)
+
+
+# Everything served on METRICS_ROUTE; modules add their own with register()
+_metrics = []
+
+
+def register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+STAGE_SECONDS = register(Histogram("medical_bot_stage_seconds", "Time spent per pipeline stage", "stage"))
+REQUEST_SECONDS = register(Histogram("medical_bot_request_seconds", "End-to-end time per traced request", "kind"))
+STAGE_ERRORS = register(Counter("medical_bot_stage_errors_total", "Pipeline stages that raised", "stage"))
+
+
+class Trace:
+    """Spans of one request; finish() logs it and records the end-to-end time"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans = []
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def add_span(self, stage, start, seconds, attrs):
+        with self._lock:
+            if not self.finished:
+                self.spans.append({"stage": stage, "start_ms": round((start - self.start) * 1000, 1),
+                                   "ms": round(seconds * 1000, 1), **attrs})
+
+    def finish(self, **attrs):
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+        seconds = time.perf_counter() - self.start
+        REQUEST_SECONDS.observe(self.kind, seconds)
+        if TRACE_LOG:
+            record = {"trace_id": self.trace_id, "kind": self.kind, "ts": round(self.wall_start, 3),
+                      "ms": round(seconds * 1000, 1), **attrs, "spans": self.spans}
+            _trace_logger.info(json.dumps(record, default=str))
+
+
+class _NullTrace:
+    """Stand-in when TRACING is off, so callers never need to check"""
+
+    trace_id = None
+
+    def add_span(self, stage, start, seconds, attrs):
+        pass
+
+    def finish(self, **attrs):
+        pass
+
+
+def start_trace(kind):
+    """Begin a trace and make it current for this task and the work it starts"""
+    if not TRACING:
+        return _NullTrace()
+    trace = Trace(kind)
+    _current_trace.set(trace)
+    return trace
+
+
+def activate(trace):
+    """Make trace current again, e.g. when an event generator resumes in a new step"""
+    if isinstance(trace, Trace):
+        _current_trace.set(trace)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+class _Span:
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes known only once the stage has run (e.g. cache hit, engine used)"""
+        self.attrs.update(attrs)
+
+
+def record_span(stage, seconds, start=None, trace=None, **attrs):
+    """Record an already measured duration (e.g. time to first token)"""
+    if not TRACING:
+        return
+    STAGE_SECONDS.observe(stage, seconds)
+    trace = trace or _current_trace.get()
+    if trace is not None:
+        trace.add_span(stage, start if start is not None else time.perf_counter() - seconds, seconds, attrs)
+
+
+@contextmanager
+def span(stage, **attrs):
+    """Time the enclosed block as one stage of the current trace"""
+    if not TRACING:
+        yield _Span(attrs)
+        return
+    # Bind the trace now: the block may resume in another context (async generators)
+    trace = _current_trace.get()
+    handle = _Span(attrs)
+    start = time.perf_counter()
+    try:
+        yield handle
+    except BaseException as e:
+        STAGE_ERRORS.inc(stage)
+        handle.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        record_span(stage, time.perf_counter() - start, start, trace, **handle.attrs)
+
+
+def bind(fn):
+    """fn wrapped to run in a copy of the caller's context, for executor.submit()"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in _metrics) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware answering GET METRICS_ROUTE with render_metrics()"""
+
+    def __init__(self, app, route=METRICS_ROUTE):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.route or scope.get("path") != self.route:
+            await self.app(scope, receive, send)
+            return
+        body = render_metrics().encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/plain; version=0.0.4; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+            (b"cache-control", b"no-store"),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def metrics_middleware():
+    """Value to add to demo.launch(app_kwargs={"middleware": ...})"""
+    from starlette.middleware import Middleware
+    return [Middleware(MetricsMiddleware)] if METRICS_ROUTE else []
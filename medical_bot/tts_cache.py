@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+# Disk cache of synthesized speech.
+# The app speaks the same canned sentences ("No image provided...", format errors)
+# many times a day; each clip (MP3, or WAV from the local engine) is stored under a
+# hash of the text and voice settings so repeats are served from disk instead of
+# another TTS round trip.
+
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "medical_bot_tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+
+
+def tts_cache_key(text, voice_id, model_id, output_format, engine):
+    """Cache key for one synthesized utterance"""
+    raw = "\x1f".join((text.strip(), voice_id, model_id, output_format, engine))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """
+    Size-bounded directory of audio files named by cache key.
+    File modification times track recency; the oldest files are removed when over budget.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.current_bytes = sum(size for _, size, _ in self._scan())
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(AUDIO_EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((name, stat.st_size, stat.st_mtime))
+        return entries
+
+    def path_for(self, key, extension="mp3"):
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get_path(self, key, extension="mp3"):
+        """Path of the cached audio for key, or None on a miss"""
+        path = self.path_for(key, extension)
+        try:
+            # Touch so eviction treats it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put_bytes(self, key, audio_bytes, extension="mp3"):
+        """Store audio for key and return its path"""
+        path = self.path_for(key, extension)
+        # Write then rename so readers never see a half-written file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio_bytes)
+        with self._lock:
+            # Re-storing a key replaces its file, so only the difference is new
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            self.current_bytes += len(audio_bytes) - replaced
+            if self.current_bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep):
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        self.current_bytes = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if self.current_bytes <= self.max_bytes:
+                break
+            path = os.path.join(self.directory, name)
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.current_bytes -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "directory": self.directory,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    """The process-wide TTS audio cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSAudioCache()
+    return _cache
@@ -0,0 +1,181 @@
+import logging
+from io import BytesIO
+from dotenv import load_dotenv
+import os
+from medical_bot.config import get_profile
+from medical_bot.stt_backends import GroqTranscriber, select_transcriber, transcribe_audio, transcribe_audio_async, transcribe_clip
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+#step1: Setup Audio recorder (portaudio)
+# The recording stays in memory: PCM is resampled to 16 kHz mono in-process and
+# uploaded as WAV, or as FLAC (speech_recognition's bundled encoder) once the WAV
+# would exceed RECORD_WAV_MAX_BYTES. An MP3 is only written when asked for one.
+RECORD_SAMPLE_RATE = int(os.environ.get("RECORD_SAMPLE_RATE", "16000"))
+RECORD_UPLOAD_FORMAT = os.environ.get("RECORD_UPLOAD_FORMAT", "auto").lower()
+RECORD_WAV_MAX_BYTES = int(os.environ.get("RECORD_WAV_MAX_BYTES", str(64 * 1024)))
+
+def encode_recording(audio_data, upload_format=RECORD_UPLOAD_FORMAT):
+    """
+    Turn speech_recognition AudioData into an upload-ready (filename, bytes) clip.
+    "wav" and "flac" force a format; "auto" picks WAV for short clips and FLAC for longer ones.
+    """
+    wav_data = audio_data.get_wav_data(convert_rate=RECORD_SAMPLE_RATE, convert_width=2)
+    if upload_format == "wav" or (upload_format == "auto" and len(wav_data) <= RECORD_WAV_MAX_BYTES):
+        return ("recording.wav", wav_data)
+    try:
+        return ("recording.flac", audio_data.get_flac_data(convert_rate=RECORD_SAMPLE_RATE, convert_width=2))
+    except Exception as e:
+        logging.warning(f"FLAC encoding failed ({e}), uploading WAV")
+        return ("recording.wav", wav_data)
+
+def record_audio(file_path=None, timeout=20, phrase_time_limit=None):
+    """
+    Simplified function to record audio from the microphone.
+
+    Args:
+    file_path (str): Optional path to also save the recording to. A .mp3 path is exported
+        through ffmpeg as before; any other path receives the upload bytes as-is.
+    timeout (int): Maximum time to wait for a phrase to start (in seconds).
+    phrase_time_limit (int): Maximum time for the phrase to be recorded (in seconds).
+
+    Returns:
+    (filename, bytes) clip ready for transcribe_clip, or None if recording failed.
+    """
+    if not get_profile().microphone:
+        # On Spaces the browser records through Gradio's microphone component
+        logging.info("Live recording handled by Gradio's browser interface")
+        return None
+
+    # Microphone support is only needed when recording locally, so load it on demand
+    import speech_recognition as sr
+    recognizer = sr.Recognizer()
+    
+    try:
+        with sr.Microphone() as source:
+            logging.info("Adjusting for ambient noise...")
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            logging.info("Start speaking now...")
+            
+            # Record the audio
+            audio_data = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            logging.info("Recording complete.")
+            
+        clip = encode_recording(audio_data)
+        if file_path and file_path.lower().endswith(".mp3"):
+            # Legacy MP3 output (needs ffmpeg); the upload still uses the in-memory clip
+            from pydub import AudioSegment
+            audio_segment = AudioSegment.from_wav(BytesIO(audio_data.get_wav_data()))
+            audio_segment.export(file_path, format="mp3", bitrate="128k")
+        elif file_path:
+            with open(file_path, "wb") as f:
+                f.write(clip[1])
+        if file_path:
+            logging.info(f"Audio saved to {file_path}")
+        return clip
+
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        return None
+
+def record_and_transcribe_audio(timeout=20, phrase_time_limit=None):
+    """Record one phrase and transcribe it without writing it to disk"""
+    clip = record_audio(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    return transcribe_clip(clip) if clip else ""
+
+audio_filepath="patient_voice_test.wav"
+#record_audio(file_path=audio_filepath)
+#record_and_transcribe_audio()
+
+#step1b: Streaming capture - each utterance is transcribed while the patient keeps talking,
+# so the transcript is ready almost as soon as they stop (see streaming_capture.py)
+def record_and_transcribe_streaming(timeout=20, phrase_time_limit=None, on_text=None):
+    from medical_bot.streaming_capture import record_and_transcribe
+    return record_and_transcribe(timeout=timeout, phrase_time_limit=phrase_time_limit, on_text=on_text)
+#record_and_transcribe_streaming(on_text=lambda index, text: print(text))
+
+#step2: Setup speech to text-STT-model for transcription
+load_dotenv()
+GROQ_API_KEY=os.environ.get("GROQ_API_KEY")
+
+stt_model = "whisper-large-v3"
+
+def transcribe_with_groq(stt_model, audio_filepath, GROQ_API_KEY):
+    """Transcribe audio file using GROQ Whisper model"""
+    try:
+        # Same rate-limited path as the app's transcriptions
+        return GroqTranscriber(model=stt_model, api_key=GROQ_API_KEY).transcribe(audio_filepath)
+    except Exception as e:
+        logging.error(f"Transcription error: {e}")
+        return "Unable to process audio. Please try again."
+
+async def transcribe_with_groq_async(stt_model, audio_filepath, GROQ_API_KEY):
+    """Async version of transcribe_with_groq"""
+    try:
+        return await GroqTranscriber(model=stt_model, api_key=GROQ_API_KEY).transcribe_async(audio_filepath)
+    except Exception as e:
+        logging.error(f"Transcription error: {e}")
+        return "Unable to process audio. Please try again."
+
+def _check_audio_input(audio_file_path):
+    """Return a user-facing message if the recording cannot be transcribed, else None"""
+    if audio_file_path is None:
+        return "No audio recorded. Please click the record button and speak into your microphone."
+
+    # Check if file exists and has content
+    if not os.path.exists(audio_file_path):
+        return "Audio file not found. Please try recording again."
+
+    if os.path.getsize(audio_file_path) == 0:
+        return "Empty audio file. Please record again and speak clearly."
+
+    # Get GROQ API key (not needed when the local Whisper engine takes the clip)
+    if not os.environ.get("GROQ_API_KEY") and select_transcriber(audio_file_path).name == "groq":
+        return "Audio transcription service not available. Please type your symptoms instead."
+
+    return None
+
+def get_audio_text(audio_file_path):
+    """
+    Main function to get text from audio file
+    Works with:
+    - Live recordings from Gradio's microphone interface
+    - Uploaded audio files
+    Problems come back as a message for the patient instead of an exception
+    """
+    try:
+        input_error = _check_audio_input(audio_file_path)
+        if input_error:
+            return input_error
+        # Transcribe with local Whisper for short clips when STT_BACKEND allows it, GROQ Whisper otherwise
+        text = transcribe_audio(audio_file_path)
+        
+        if text and text.strip():
+            logging.info(f"Transcription successful: {text[:50]}...")
+            return text
+        else:
+            return "Unable to transcribe audio. Please speak clearly and try recording again."
+            
+    except Exception as e:
+        logging.error(f"Audio processing error: {e}")
+        return "Error processing audio. Please try recording again or type your symptoms."
+
+
+async def get_audio_text_async(audio_file_path):
+    """Async version of get_audio_text"""
+    try:
+        input_error = _check_audio_input(audio_file_path)
+        if input_error:
+            return input_error
+
+        text = await transcribe_audio_async(audio_file_path)
+
+        if text and text.strip():
+            logging.info(f"Transcription successful: {text[:50]}...")
+            return text
+        else:
+            return "Unable to transcribe audio. Please speak clearly and try recording again."
+
+    except Exception as e:
+        logging.error(f"Audio processing error: {e}")
+        return "Error processing audio. Please try recording again or type your symptoms."
\ No newline at end of file
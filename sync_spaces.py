@@ -0,0 +1,60 @@
+"""
+Copy the medical_bot backend package into hf_spaces_deployment/.
+
+The Space is deployed from that folder on its own, so it carries a copy of the
+package; edit medical_bot/ at the repository root and run this afterwards.
+
+    python sync_spaces.py          # update the copy
+    python sync_spaces.py --check  # exit 1 if the copy is out of date
+"""
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(ROOT, "medical_bot")
+TARGET = os.path.join(ROOT, "hf_spaces_deployment", "medical_bot")
+
+
+def package_files(directory):
+    if not os.path.isdir(directory):
+        return set()
+    return {name for name in os.listdir(directory) if name.endswith(".py")}
+
+
+def differences(source_dir=SOURCE, target_dir=TARGET):
+    """(files missing or different in the copy, files only in the copy)"""
+    source, target = package_files(source_dir), package_files(target_dir)
+    changed = sorted(name for name in source
+                     if name not in target or not filecmp.cmp(os.path.join(source_dir, name),
+                                                              os.path.join(target_dir, name), shallow=False))
+    return changed, sorted(target - source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report differences")
+    args = parser.parse_args()
+
+    changed, stale = differences()
+
+    if args.check:
+        for name in changed:
+            print(f"out of date: hf_spaces_deployment/medical_bot/{name}")
+        for name in stale:
+            print(f"not in medical_bot/: hf_spaces_deployment/medical_bot/{name}")
+        sys.exit(1 if changed or stale else 0)
+
+    os.makedirs(TARGET, exist_ok=True)
+    for name in changed:
+        shutil.copyfile(os.path.join(SOURCE, name), os.path.join(TARGET, name))
+        print(f"copied {name}")
+    for name in stale:
+        os.remove(os.path.join(TARGET, name))
+        print(f"removed {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import asyncio
+
+from medical_bot.css_assets import StylesheetAsset, StylesheetMiddleware, build_stylesheet, minify_css
+
+
+def test_whitespace_and_repeated_rules_are_removed():
+    css = """
+    .card  >  .title , .x { color : Red ; margin: 0  auto ; }
+    .card>.title,.x{color:Red;margin:0 auto}
+    """
+    assert minify_css(css) == ".card>.title,.x{color:Red;margin:0 auto}"
+
+
+def test_adjacent_rules_with_one_selector_are_merged():
+    assert minify_css(".btn { color: blue; } .btn { padding: 1px; } .empty {}") == ".btn{color:blue;padding:1px}"
+
+
+def test_descendant_pseudo_class_space_is_kept():
+    assert minify_css(".card :hover { color: red }") == ".card :hover{color:red}"
+
+
+def test_strings_and_data_urls_are_left_alone():
+    css = ".bg { content: 'a,  b'; background: url(data:image/png;base64,AA==) ; color: red ! important }"
+    assert minify_css(css) == ".bg{content:'a,  b';background:url(data:image/png;base64,AA==);color:red!important}"
+
+
+def test_redefined_keyframes_keep_only_the_last():
+    css = "@keyframes spin { from { opacity: 0 } } @keyframes spin { to { opacity: 1 } }"
+    assert minify_css(css) == "@keyframes spin{to{opacity:1}}"
+
+
+def test_media_prelude_is_tightened():
+    assert minify_css("@media ( max-width : 768px ) { .btn { padding: 2px } }") == \
+        "@media (max-width:768px){.btn{padding:2px}}"
+
+
+def test_import_stays_first():
+    assert minify_css('.a { color: red } @import url("b.css");') == '@import url("b.css");.a{color:red}'
+
+
+def test_lightweight_theme_drops_costly_effects_and_unused_keyframes():
+    css = """
+    .spinner { animation: spin 1s infinite; color: red }
+    @keyframes spin { to { opacity: 1 } }
+    @keyframes glow { to { opacity: .5 } }
+    .glow { animation: glow 1s ease 1; backdrop-filter: blur(4px); }
+    a:hover { transform: scale(1.1); color: red; }
+    """
+    assert minify_css(css, lightweight=True) == \
+        ".spinner{color:red}@keyframes glow{to{opacity:.5}}.glow{animation:glow 1s ease 1}a:hover{color:red}"
+
+
+def test_built_asset_is_named_by_content(tmp_path):
+    source = tmp_path / "site.css"
+    source.write_text(".a { color: red }")
+    full, lite = build_stylesheet(str(source), theme="full"), build_stylesheet(str(source), theme="lightweight")
+
+    assert full.url == f"medical-assets/site.{full.hash}.css"
+    assert lite.filename.startswith("site.lite.")
+    assert b"prefers-reduced-motion" in full.content and b"prefers-reduced-motion" not in lite.content
+
+
+def serve(middleware, path, headers=()):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, None, send))
+    return sent
+
+
+def test_middleware_serves_the_asset_with_cache_headers():
+    asset = StylesheetAsset("site", ".a{color:red}")
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 404, "headers": []})
+
+    middleware = StylesheetMiddleware(app, [asset])
+
+    start, body = serve(middleware, "/" + asset.url, [(b"accept-encoding", b"gzip")])
+    headers = dict(start["headers"])
+    assert start["status"] == 200
+    assert headers[b"content-encoding"] == b"gzip" and body["body"] == asset.gzipped
+    assert b"immutable" in headers[b"cache-control"]
+
+    start, _ = serve(middleware, "/" + asset.url, [(b"if-none-match", headers[b"etag"])])
+    assert start["status"] == 304
+
+    assert serve(middleware, "/other.css")[0]["status"] == 404
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+from medical_bot.stt_backends import LocalWhisperTranscriber
+
+
+class BlockingBatches:
+    """Stands in for the Whisper model: records each batch and holds it until released"""
+
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, clips):
+        self.batches.append(list(clips))
+        self.started.set()
+        assert self.release.wait(5)
+        return [clip if clip != "broken" else ValueError("cannot decode") for clip in clips]
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    transcriber = LocalWhisperTranscriber(batch_size=4, batch_wait_ms=50)
+    model = BlockingBatches()
+    monkeypatch.setattr(transcriber, "_transcribe_batch", model)
+    transcriber.model = model
+    return transcriber
+
+
+def test_clips_arriving_together_share_a_batch(transcriber):
+    transcriber.model.release.set()
+    futures = [transcriber.submit(f"clip {i}") for i in range(3)]
+
+    assert [future.result(timeout=5) for future in futures] == ["clip 0", "clip 1", "clip 2"]
+    assert transcriber.model.batches == [["clip 0", "clip 1", "clip 2"]]
+
+
+def test_undecodable_clip_fails_only_its_own_request(transcriber):
+    transcriber.model.release.set()
+    good, broken = transcriber.submit("clip"), transcriber.submit("broken")
+
+    assert good.result(timeout=5) == "clip"
+    with pytest.raises(ValueError):
+        broken.result(timeout=5)
+
+
+def test_caller_cancelled_mid_batch_does_not_stop_the_worker(transcriber):
+    async def scenario():
+        cancelled = asyncio.ensure_future(transcriber.transcribe_async("left"))
+        kept = asyncio.ensure_future(transcriber.transcribe_async("stayed"))
+        assert await asyncio.to_thread(transcriber.model.started.wait, 5)
+        # The client disconnects while its clip is being decoded
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        transcriber.model.release.set()
+        return await asyncio.wait_for(kept, 5)
+
+    assert asyncio.run(scenario()) == "stayed"
+    # The worker survived and serves the next transcription
+    assert transcriber.submit("next").result(timeout=5) == "next"
+
+
+def test_clip_cancelled_while_queued_is_skipped(transcriber):
+    first = transcriber.submit("first")
+    assert transcriber.model.started.wait(5)
+    # Waits behind the running batch, then its caller gives up
+    queued = transcriber.submit("abandoned")
+    assert queued.cancel()
+    transcriber.model.release.set()
+
+    assert first.result(timeout=5) == "first"
+    assert transcriber.submit("next").result(timeout=5) == "next"
+    assert all("abandoned" not in batch for batch in transcriber.model.batches)
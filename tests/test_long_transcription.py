@@ -0,0 +1,59 @@
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from medical_bot.audio_preprocessing import PreparedAudio, chunk_boundaries, split_for_transcription
+from medical_bot.stt_backends import merge_transcripts
+
+
+def test_overlapping_words_are_dropped_once():
+    chunks = ["I have had a rash on my arm", "on my arm for three days", "three days and it itches."]
+    assert merge_transcripts(chunks) == "I have had a rash on my arm for three days and it itches."
+
+
+def test_overlap_ignores_case_and_punctuation():
+    assert merge_transcripts(["It started Monday.", "monday, then it spread"]) == "It started Monday. then it spread"
+
+
+def test_longest_overlap_wins():
+    assert merge_transcripts(["it hurts it hurts", "it hurts it hurts a lot"]) == "it hurts it hurts a lot"
+
+
+def test_no_overlap_and_empty_chunks():
+    assert merge_transcripts(["my knee hurts", "", None, "when I walk"]) == "my knee hurts when I walk"
+
+
+def test_overlap_is_bounded():
+    # A repeat longer than max_overlap_words is not treated as overlap
+    assert merge_transcripts(["a b c", "a b c d"], max_overlap_words=2) == "a b c a b c d"
+
+
+def speech(ms):
+    return Sine(220).to_audio_segment(duration=ms, volume=-10)
+
+
+def test_cuts_land_in_the_silence_nearest_the_target():
+    # Pauses at 4.5 s and 9.5 s; 5 s chunks should be cut inside them
+    segment = speech(4000) + AudioSegment.silent(1000) + speech(4000) + AudioSegment.silent(1000) + speech(4000)
+    cuts = chunk_boundaries(segment, 5000)
+
+    assert len(cuts) == 2
+    assert 4000 <= cuts[0] <= 5000
+    assert 9000 <= cuts[1] <= 10000
+
+
+def test_speech_without_pauses_is_cut_at_the_target():
+    assert chunk_boundaries(speech(12000), 5000) == [5000, 10000]
+
+
+def test_short_recording_is_not_split():
+    assert chunk_boundaries(speech(6000), 5000) == []
+
+
+def test_chunks_overlap_and_cover_the_recording():
+    segment = speech(12000).set_frame_rate(16000)
+    prepared = PreparedAudio("symptoms.wav", b"", len(segment) / 1000.0, 0, segment)
+
+    chunks = split_for_transcription(prepared, chunk_seconds=5, overlap_ms=1000, upload_format="wav")
+
+    assert [chunk.filename for chunk in chunks] == ["symptoms_0.wav", "symptoms_1.wav", "symptoms_2.wav"]
+    assert [round(chunk.duration, 1) for chunk in chunks] == [5.0, 6.0, 3.0]
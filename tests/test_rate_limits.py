@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from medical_bot import rate_limits
+from medical_bot.rate_limits import ModelRateLimiter
+
+MODEL = "llama3-8b-8192"
+BOOKED_TOKENS = 500
+USED_TOKENS = 300
+SERVER_REMAINING_TOKENS = 5600
+
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def rate_limited():
+    response = httpx.Response(429, headers={"retry-after": "0"}, request=REQUEST)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def server_error():
+    return InternalServerError("Internal error", response=httpx.Response(500, request=REQUEST), body=None)
+
+
+def sdk_error(error_class, cause):
+    """The SDK raises its connection errors from the httpx exception"""
+    try:
+        raise error_class(request=REQUEST) from cause
+    except error_class as error:
+        return error
+
+
+def answer():
+    headers = httpx.Headers({
+        "x-ratelimit-limit-tokens": "6000",
+        "x-ratelimit-remaining-tokens": str(SERVER_REMAINING_TOKENS),
+        "x-ratelimit-remaining-requests": "100",
+    })
+    result = SimpleNamespace(usage=SimpleNamespace(total_tokens=USED_TOKENS))
+    return SimpleNamespace(headers=headers, parse=lambda: result)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    # Slow request refill (6 rpm) so the levels barely move while the test runs
+    limiter = ModelRateLimiter(MODEL, rpm=6, tpm=6000)
+    monkeypatch.setattr(rate_limits, "GROQ_RATE_LIMIT", True)
+    monkeypatch.setattr(rate_limits, "GROQ_BACKOFF_BASE_MS", 0)
+    monkeypatch.setattr(rate_limits, "get_model_limiter", lambda model: limiter)
+    return limiter
+
+
+def assert_levels(limiter, requests=5, tokens=SERVER_REMAINING_TOKENS):
+    # By default: the 429 attempt was handed back, so only the successful request is booked,
+    # and the server's remaining-tokens count wins over the settled estimate (6000 - 300)
+    assert limiter.requests.level == pytest.approx(requests, abs=0.05)
+    assert limiter.tokens.level == pytest.approx(tokens, abs=5)
+
+
+def failing_then_answer(error):
+    responses = [error, answer()]
+
+    def request():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return request
+
+
+def test_rate_limited_then_success_books_once(limiter):
+    result = rate_limits.call_with_rate_limit(MODEL, failing_then_answer(rate_limited()), tokens=BOOKED_TOKENS)
+
+    assert result.usage.total_tokens == USED_TOKENS
+    assert_levels(limiter)
+
+
+def test_rate_limited_then_success_books_once_async(limiter):
+    responses = [rate_limited(), answer()]
+
+    async def request():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        parse = response.parse
+
+        async def parse_async():
+            return parse()
+        return SimpleNamespace(headers=response.headers, parse=parse_async)
+
+    result = asyncio.run(rate_limits.call_with_rate_limit_async(MODEL, request, tokens=BOOKED_TOKENS))
+
+    assert result.usage.total_tokens == USED_TOKENS
+    assert_levels(limiter)
+
+
+@pytest.mark.parametrize("error", [
+    rate_limited(),
+    sdk_error(APIConnectionError, httpx.ConnectError("connection refused")),
+    sdk_error(APITimeoutError, httpx.ConnectTimeout("connect timed out")),
+], ids=["429", "connect error", "connect timeout"])
+def test_attempt_that_never_reached_groq_is_refunded(limiter, error):
+    rate_limits.call_with_rate_limit(MODEL, failing_then_answer(error), tokens=BOOKED_TOKENS)
+
+    assert_levels(limiter)
+
+
+@pytest.mark.parametrize("error", [
+    server_error(),
+    sdk_error(APITimeoutError, httpx.ReadTimeout("read timed out")),
+    sdk_error(APIConnectionError, httpx.RemoteProtocolError("server disconnected")),
+], ids=["500", "read timeout", "dropped response"])
+def test_attempt_groq_may_have_counted_keeps_its_booking(limiter, error):
+    rate_limits.call_with_rate_limit(MODEL, failing_then_answer(error), tokens=BOOKED_TOKENS)
+
+    # Both requests stay booked; the server's count is above the local estimate, so the
+    # estimate (6000 - 500 - 500 + 200 settled) is kept
+    assert_levels(limiter, requests=4, tokens=5200)
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from medical_bot.response_cache import MemoryResponseCache, SQLiteResponseCache, response_cache_key
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemoryResponseCache(**kwargs)
+        return SQLiteResponseCache(path=str(tmp_path / "responses.sqlite3"), **kwargs)
+    return make
+
+
+def test_key_ignores_whitespace_and_case():
+    assert response_cache_key("I have  a Rash\n", "model") == response_cache_key("i have a rash", "model")
+
+
+def test_key_depends_on_image_and_model():
+    keys = {
+        response_cache_key("rash", "model"),
+        response_cache_key("rash", "model", "aW1hZ2U="),
+        response_cache_key("rash", "model", "b3RoZXI="),
+        response_cache_key("rash", "other-model"),
+    }
+    assert len(keys) == 4
+
+
+def test_stored_answer_is_returned(make_cache):
+    cache = make_cache(max_entries=10, ttl=60)
+    assert cache.get("key") is None
+    cache.put("key", "With what I see, I think you have eczema.")
+
+    assert cache.get("key") == "With what I see, I think you have eczema."
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+
+
+def test_expired_answer_is_a_miss(make_cache):
+    cache = make_cache(max_entries=10, ttl=-1)
+    cache.put("key", "old answer")
+
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_dropped(make_cache):
+    cache = make_cache(max_entries=2, ttl=60)
+    cache.put("a", "first")
+    time.sleep(0.01)
+    cache.put("b", "second")
+    time.sleep(0.01)
+    assert cache.get("a") == "first"
+    time.sleep(0.01)
+    cache.put("c", "third")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("first", "third")
+    assert cache.stats()["entries"] == 2
+
+
+def test_sqlite_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    SQLiteResponseCache(path=path, ttl=60).put("key", "answer")
+
+    assert SQLiteResponseCache(path=path, ttl=60).get("key") == "answer"
@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from medical_bot.scratch_files import ScratchFileManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return ScratchFileManager(directory=str(tmp_path), max_age=100, max_bytes=250, min_age=10)
+
+
+def write(path, size, age=0):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    past = time.time() - age
+    os.utime(path, (past, past))
+
+
+def backdate_issue(manager, path, age):
+    manager._issued[path] = time.time() - age
+
+
+def test_paths_are_unique_and_kept_by_suffix(manager):
+    paths = {manager.new_path(suffix=".wav") for _ in range(50)}
+    assert len(paths) == 50
+    assert all(path.endswith(".wav") for path in paths)
+
+
+def test_expired_unreferenced_files_are_swept(manager):
+    path = manager.new_path()
+    write(path, 10, age=200)
+    backdate_issue(manager, path, 200)
+    manager.release(path)
+
+    assert manager.sweep() == 1
+    assert not os.path.exists(path)
+
+
+def test_held_files_survive_the_sweep(manager):
+    path = manager.new_path()
+    write(path, 10, age=200)
+    backdate_issue(manager, path, 200)
+
+    assert manager.sweep() == 0
+    manager.release(path)
+    assert manager.sweep() == 1
+
+
+def test_fresh_files_survive_even_over_budget(manager):
+    # Released as soon as the event returned, but Gradio has not served it yet
+    path = manager.new_path()
+    write(path, 1000)
+    manager.release(path)
+
+    assert manager.sweep() == 0
+    assert os.path.exists(path)
+
+
+def test_freshly_issued_link_to_an_old_file_survives(manager, tmp_path):
+    # A hard link keeps its source's old mtime; the issue time protects it
+    source = tmp_path / "cached.mp3"
+    write(source, 10, age=200)
+    path = manager.adopt(str(source))
+    manager.release(path)
+    os.remove(source)
+
+    assert manager.sweep() == 0
+    assert os.path.exists(path)
+
+
+def test_oldest_files_go_first_when_over_budget(manager):
+    paths = []
+    for age in (50, 40, 30):
+        path = manager.new_path()
+        write(path, 100, age=age)
+        backdate_issue(manager, path, age)
+        manager.release(path)
+        paths.append(path)
+
+    assert manager.sweep() == 1
+    assert [os.path.exists(path) for path in paths] == [False, True, True]
+
+
+def test_scratch_file_is_deleted_on_exit(manager):
+    with manager.scratch_file(suffix=".wav") as path:
+        write(path, 10)
+    assert not os.path.exists(path)
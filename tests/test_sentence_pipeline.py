@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+from medical_bot import app_pipeline
+from medical_bot.config import select_profile
+from medical_bot.session_limits import TTS_CONCURRENCY
+from medical_bot.voice_of_the_doctor import SentenceAudioPipeline
+
+
+class GatedSynthesis:
+    """Fake TTS: returns the sentence as its audio, once the gate is open"""
+
+    def __init__(self, open_gate=True):
+        self.gate = threading.Event()
+        if open_gate:
+            self.gate.set()
+        self.spoken = []
+        self.lock = threading.Lock()
+
+    def __call__(self, sentence):
+        assert self.gate.wait(5)
+        with self.lock:
+            self.spoken.append(sentence)
+        return sentence.encode() + b"|"
+
+
+def drain(speaker):
+    async def collect():
+        return b"".join([chunk async for chunk in speaker.remaining_chunks()])
+    return asyncio.run(collect())
+
+
+def test_sentences_are_spoken_in_order_as_they_complete():
+    synthesis = GatedSynthesis()
+    speaker = SentenceAudioPipeline(synthesize=synthesis)
+    speaker.feed("First sentence. Second one")
+    # Only the completed sentence is scheduled while the answer streams
+    assert speaker.consumed == len("First sentence. ")
+    speaker.finish("First sentence. Second one is done.")
+
+    assert drain(speaker) == b"First sentence.|Second one is done.|"
+
+
+def test_replaced_response_drops_the_old_audio():
+    synthesis = GatedSynthesis(open_gate=False)
+    speaker = SentenceAudioPipeline(synthesize=synthesis)
+    speaker.feed("The old answer. ")
+    # The answer is replaced (e.g. by an error message) before its audio was played
+    speaker.finish("Something went wrong.")
+    synthesis.gate.set()
+
+    assert drain(speaker) == b"Something went wrong.|"
+    assert speaker.generation == 1
+
+
+def test_close_cancels_sentences_still_waiting_for_a_worker():
+    synthesis = GatedSynthesis(open_gate=False)
+    speaker = SentenceAudioPipeline(synthesize=synthesis)
+    sentences = [f"Sentence number {i}." for i in range(TTS_CONCURRENCY + 4)]
+    speaker.finish(" ".join(sentences))
+
+    speaker.close()
+    speaker.feed(" ".join(sentences) + " More text. ")
+    synthesis.gate.set()
+    time.sleep(0.2)
+
+    assert drain(speaker) == b""
+    # At most the sentences already running on a worker were synthesized
+    assert len(synthesis.spoken) <= TTS_CONCURRENCY
+
+
+async def long_answer(audio_filepath, image_file):
+    text = ""
+    for i in range(TTS_CONCURRENCY + 4):
+        text += f"Sentence number {i}. "
+        yield "", text, None
+
+
+def test_closing_the_voice_event_closes_its_pipeline(monkeypatch):
+    select_profile("spaces")
+    synthesis = GatedSynthesis(open_gate=False)
+    speakers = []
+
+    def pipeline():
+        speakers.append(SentenceAudioPipeline(synthesize=synthesis))
+        return speakers[-1]
+
+    monkeypatch.setattr(app_pipeline, "process_inputs", long_answer)
+    monkeypatch.setattr(app_pipeline, "SentenceAudioPipeline", pipeline)
+
+    async def disconnect_early():
+        event = app_pipeline.process_inputs_with_voice(None, None)
+        async for outputs in event:
+            if outputs[1].count(".") == TTS_CONCURRENCY + 4:
+                break
+        # What Gradio does when the client goes away
+        await event.aclose()
+
+    asyncio.run(disconnect_early())
+    synthesis.gate.set()
+    time.sleep(0.2)
+
+    assert speakers[0].closed and not speakers[0].pending
+    assert len(synthesis.spoken) <= TTS_CONCURRENCY
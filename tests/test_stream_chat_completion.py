@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from medical_bot import brain_of_the_doctor
+from medical_bot.response_cache import NullResponseCache
+
+TOKENS = ["With what I see, ", "I think you have ", "a mild rash."]
+
+
+class FakeStream:
+    """Stands in for groq's AsyncStream: yields chunks and records close()"""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.closed = False
+
+    async def __aiter__(self):
+        for i, token in enumerate(TOKENS):
+            if i == self.fail_after:
+                raise ConnectionError("stream broke")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    holder = {}
+
+    async def open_stream(model, request, tokens=0):
+        return holder["stream"]
+
+    monkeypatch.setattr(brain_of_the_doctor, "_response_cache", NullResponseCache())
+    monkeypatch.setattr(brain_of_the_doctor, "_require_api_key", lambda: "test-key")
+    monkeypatch.setattr(brain_of_the_doctor, "get_async_groq_client", lambda api_key: None)
+    monkeypatch.setattr(brain_of_the_doctor, "call_with_rate_limit_async", open_stream)
+    return holder
+
+
+def run(stream, fail_after=None, take=None):
+    stream["stream"] = FakeStream(fail_after)
+
+    async def consume():
+        received = []
+        tokens = brain_of_the_doctor.stream_chat_completion_async("rash", "llama3-8b-8192")
+        try:
+            async for token in tokens:
+                received.append(token)
+                if len(received) == take:
+                    break
+        finally:
+            await tokens.aclose()
+        return received
+
+    return asyncio.run(consume()), stream["stream"]
+
+
+def test_complete_stream_is_closed(stream):
+    received, fake = run(stream)
+    assert received == TOKENS
+    assert fake.closed
+
+
+def test_stream_abandoned_by_the_consumer_is_closed(stream):
+    received, fake = run(stream, take=1)
+    assert received == TOKENS[:1]
+    assert fake.closed
+
+
+def test_broken_stream_is_closed(stream):
+    with pytest.raises(ConnectionError):
+        run(stream, fail_after=2)
+    assert stream["stream"].closed
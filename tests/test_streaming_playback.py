@@ -0,0 +1,72 @@
+import asyncio
+import io
+import wave
+
+from medical_bot import app_pipeline, voice_of_the_doctor
+from medical_bot.config import select_profile
+from medical_bot.voice_of_the_doctor import SentenceAudioPipeline
+
+ANSWER = "With what I see, I think you have a mild rash. Keep it clean and see a doctor if it spreads."
+
+
+def sentence_wav(sentence):
+    """A short WAV clip per sentence, as the local engine would return it"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(16000)
+        clip.writeframes(b"\x01\x00" * (10 * len(sentence)))
+    return buffer.getvalue()
+
+
+class RecordingPlayer:
+    def __init__(self):
+        self.paths = []
+
+    def play(self, path):
+        self.paths.append(path)
+
+
+async def fake_process_inputs(audio_filepath, image_file):
+    yield "my arm itches", "", None
+    for end in range(10, len(ANSWER), 10):
+        yield "my arm itches", ANSWER[:end], None
+    yield "my arm itches", ANSWER, None
+
+
+async def collect(event):
+    return [outputs async for outputs in event]
+
+
+def test_streamed_answer_is_played_on_the_server(monkeypatch):
+    profile = select_profile("local")
+    monkeypatch.setattr(profile, "play_audio", True)
+    player = RecordingPlayer()
+    monkeypatch.setattr(voice_of_the_doctor, "get_audio_player", lambda: player)
+    monkeypatch.setattr(app_pipeline, "process_inputs", fake_process_inputs)
+    monkeypatch.setattr(app_pipeline, "SentenceAudioPipeline", lambda: SentenceAudioPipeline(synthesize=sentence_wav))
+
+    outputs = asyncio.run(collect(app_pipeline.process_inputs_with_voice(None, None)))
+
+    streamed = b"".join(chunk for *_, chunk in outputs if chunk)
+    assert streamed
+    assert len(player.paths) == 1
+    with wave.open(player.paths[0], "rb") as clip:
+        # Both sentences, in one file whose header matches its length
+        expected = sum(10 * len(sentence) for sentence in voice_of_the_doctor.SENTENCE_END.split(ANSWER))
+        assert clip.getnframes() == expected
+        assert clip.readframes(expected) == b"\x01\x00" * expected
+
+
+def test_streamed_answer_is_not_played_when_playback_is_off(monkeypatch):
+    profile = select_profile("spaces")
+    monkeypatch.setattr(profile, "play_audio", False)
+    player = RecordingPlayer()
+    monkeypatch.setattr(voice_of_the_doctor, "get_audio_player", lambda: player)
+    monkeypatch.setattr(app_pipeline, "process_inputs", fake_process_inputs)
+    monkeypatch.setattr(app_pipeline, "SentenceAudioPipeline", lambda: SentenceAudioPipeline(synthesize=sentence_wav))
+
+    asyncio.run(collect(app_pipeline.process_inputs_with_voice(None, None)))
+
+    assert player.paths == []
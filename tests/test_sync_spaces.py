@@ -0,0 +1,23 @@
+import sync_spaces
+
+
+def test_spaces_copy_matches_medical_bot():
+    # hf_spaces_deployment/ is deployed on its own with a copy of the package;
+    # after editing medical_bot/ run `python sync_spaces.py`
+    changed, stale = sync_spaces.differences()
+    assert changed == [], f"out of date in hf_spaces_deployment/medical_bot: {changed}"
+    assert stale == [], f"not in medical_bot/: {stale}"
+
+
+def test_differences_reports_edits_and_leftovers(tmp_path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    (source / "same.py").write_text("x = 1\n")
+    (target / "same.py").write_text("x = 1\n")
+    (source / "edited.py").write_text("x = 2\n")
+    (target / "edited.py").write_text("x = 1\n")
+    (source / "new.py").write_text("")
+    (target / "removed.py").write_text("")
+
+    assert sync_spaces.differences(str(source), str(target)) == (["edited.py", "new.py"], ["removed.py"])
@@ -0,0 +1,46 @@
+import os
+
+from medical_bot.tts_cache import TTSAudioCache, tts_cache_key
+
+
+def key(text):
+    return tts_cache_key(text, "voice", "model", "mp3_22050_32", "elevenlabs")
+
+
+def test_hit_and_miss(tmp_path):
+    cache = TTSAudioCache(directory=str(tmp_path), max_bytes=10_000)
+
+    assert cache.get_path(key("hello")) is None
+    path = cache.put_bytes(key("hello"), b"audio")
+
+    assert cache.get_path(key("hello")) == path
+    assert open(path, "rb").read() == b"audio"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_restoring_a_key_does_not_count_its_bytes_twice(tmp_path):
+    cache = TTSAudioCache(directory=str(tmp_path), max_bytes=10_000)
+    for _ in range(5):
+        cache.put_bytes(key("hello"), b"x" * 100)
+    cache.put_bytes(key("hello"), b"x" * 60)
+
+    assert cache.current_bytes == 60
+    assert cache.current_bytes == sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+
+
+def test_oldest_entries_are_evicted_over_budget(tmp_path):
+    cache = TTSAudioCache(directory=str(tmp_path), max_bytes=250)
+    paths = []
+    for i in range(3):
+        paths.append(cache.put_bytes(key(f"clip {i}"), b"x" * 100))
+        os.utime(paths[-1], (1000 + i, 1000 + i))
+
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[1]) and os.path.exists(paths[2])
+    assert cache.current_bytes == 200
+
+
+def test_existing_files_are_counted_at_startup(tmp_path):
+    TTSAudioCache(directory=str(tmp_path)).put_bytes(key("hello"), b"x" * 100)
+
+    assert TTSAudioCache(directory=str(tmp_path)).current_bytes == 100
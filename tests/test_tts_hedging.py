@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from medical_bot.tts_backends import HedgedSynthesis, SpeechEngine, synthesize_hedged
+
+TEXT = "Keep the rash clean and dry."
+
+
+class StubEngine(SpeechEngine):
+    """Answers after delay seconds (or once released), or fails"""
+
+    def __init__(self, name, delay, prior_overhead=0.5, error=None):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.prior_overhead = prior_overhead
+        self.error = error
+        self.release = threading.Event()
+        self.calls = 0
+
+    def cache_tag(self):
+        return (self.name, "stub", self.extension)
+
+    def stream(self, text):
+        self.calls += 1
+        self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        yield f"{self.name}:{text}".encode()
+
+
+@pytest.fixture
+def engines():
+    created = []
+    yield created
+    for engine in created:
+        engine.release.set()
+
+
+def test_fast_primary_is_not_hedged(engines):
+    primary, backup = StubEngine("primary", 0.0), StubEngine("backup", 0.0)
+    engines += [primary, backup]
+
+    engine, audio, hedged = synthesize_hedged(TEXT, [primary, backup], hedge_after_ms=200)
+
+    assert (engine, hedged, backup.calls) == (primary, False, 0)
+    assert audio == f"primary:{TEXT}".encode()
+
+
+def test_slow_primary_loses_to_the_hedge_and_learns_it(engines):
+    primary, backup = StubEngine("primary", 5.0, prior_overhead=0.01), StubEngine("backup", 0.0)
+    engines += [primary, backup]
+
+    engine, audio, hedged = synthesize_hedged(TEXT, [primary, backup], hedge_after_ms=50)
+
+    assert (engine, hedged) == (backup, True)
+    # The loser ran longer than its model expected, so its estimate goes up
+    assert primary.samples == 1
+    assert primary.expected_seconds(len(TEXT)) >= 0.05
+
+
+def test_hedge_cut_short_does_not_look_fast(engines):
+    # The primary answers just after the hedge launched; the hedge only ran a few ms
+    primary, backup = StubEngine("primary", 0.08), StubEngine("backup", 5.0, prior_overhead=0.5)
+    engines += [primary, backup]
+    before = backup.expected_seconds(len(TEXT))
+
+    engine, _, hedged = synthesize_hedged(TEXT, [primary, backup], hedge_after_ms=50)
+
+    assert (engine, hedged) == (primary, True)
+    assert backup.samples == 0
+    assert backup.expected_seconds(len(TEXT)) == before
+
+
+def test_failed_engine_falls_back_to_the_next(engines):
+    broken, backup = StubEngine("broken", 0.0, error=RuntimeError("quota")), StubEngine("backup", 0.0)
+    engines += [broken, backup]
+
+    synthesis = HedgedSynthesis(TEXT, [broken, backup], hedge_after_ms=0)
+
+    assert b"".join(synthesis.stream()) == f"backup:{TEXT}".encode()
+    assert synthesis.engine is backup
+
+
+def test_every_engine_failing_raises_the_last_error(engines):
+    first = StubEngine("first", 0.0, error=RuntimeError("first down"))
+    second = StubEngine("second", 0.0, error=RuntimeError("second down"))
+    engines += [first, second]
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="second down"):
+        synthesize_hedged(TEXT, [first, second], hedge_after_ms=0)
+    assert time.perf_counter() - start < 2
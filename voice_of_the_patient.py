@@ -1,81 +0,0 @@
-import logging
-import speech_recognition as sr
-from pydub import AudioSegment
-from io import BytesIO
-from dotenv import load_dotenv
-import os
-from groq import Groq
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-#step1: Setup Audio recorder (ffmpeg & portaudio)
-
-def record_audio(file_path, timeout=20, phrase_time_limit=None):
-    """
-    Simplified function to record audio from the microphone and save it as an MP3 file.
-
-    Args:
-    file_path (str): Path to save the recorded audio file.
-    timeout (int): Maximum time to wait for a phrase to start (in seconds).
-    phrase_time_lfimit (int): Maximum time for the phrase to be recorded (in seconds).
-    """
-    recognizer = sr.Recognizer()
-    
-    try:
-        with sr.Microphone() as source:
-            logging.info("Adjusting for ambient noise...")
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            logging.info("Start speaking now...")
-            
-            # Record the audio
-            audio_data = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-            logging.info("Recording complete.")
-            
-            # Convert the recorded audio to an MP3 file
-            wav_data = audio_data.get_wav_data()
-            audio_segment = AudioSegment.from_wav(BytesIO(wav_data))
-            audio_segment.export(file_path, format="mp3", bitrate="128k")
-            
-            logging.info(f"Audio saved to {file_path}")
-
-    except Exception as e:
-        logging.error(f"An error occurred: {e}")
-
-audio_filepath="patient_voice_test.mp3"
-#record_audio(file_path=audio_filepath)
-
-#step2: Setup speech to text-STT-model for transcription
-load_dotenv()
-GROQ_API_KEY=os.environ.get("GROQ_API_KEY")
-
-stt_model = "whisper-large-v3"
-def transcribe_with_groq(stt_model, audio_filepath, GROQ_API_KEY):
-    client=Groq(api_key=GROQ_API_KEY)
-    
-    audio_file=open(audio_filepath, "rb")
-    transcription=client.audio.transcriptions.create(
-        model=stt_model,
-        file=audio_file,
-        language="en"
-    )
-
-    return transcription.text
-#transcribe_with_groq(stt_model, audio_filepath, GROQ_API_KEY)
-
-# Universal function for Hugging Face Spaces compatibility
-def get_audio_text(audio_filepath):
-    """Universal audio transcription function that works for both local and Spaces"""
-    try:
-        # Use GROQ API for transcription
-        client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-        
-        with open(audio_filepath, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-large-v3",
-                file=audio_file,
-                language="en"
-            )
-        
-        return transcription.text
-    except Exception as e:
-        return "Sorry, I couldn't transcribe the audio. Please try recording again."